@@ -1,4 +1,8 @@
-from typing import Dict, List, Tuple
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from spec_repair.interfaces.idiscriminator import IDiscriminator
 from spec_repair.interfaces.ilearner import ILearner
@@ -14,7 +18,94 @@ from spec_repair.interfaces.iheuristic_manager import IHeuristicManager
 from spec_repair.components.heuristic_managers.no_filter_heuristic_manager import NoFilterHeuristicManager
 from spec_repair.interfaces.irecorder import IRecorder
 from spec_repair.components.recorders.unique_recorder import UniqueRecorder
+from spec_repair.components.subsumption_pruner import SubsumptionPruner
 from spec_repair.loggers.spec_logger import SpecLogger
+from spec_repair.config import CHECKPOINT_INTERVAL
+from spec_repair.util.file_util import read_pickle, write_pickle_atomically
+
+# Bumped whenever the checkpointed search state changes shape
+CHECKPOINT_VERSION = 1
+
+
+@dataclass
+class TaskExpansion:
+    """
+    Everything one BFS task produces before touching the shared search state:
+    either the alternative tasks (when learning found nothing), or every learned
+    spec paired with the oracle's verdict on it (None/[] meaning it is a repair).
+    """
+    alt_tasks: Optional[List[Tuple[ISpecification, RepairData]]] = None
+    checked_specs: List[Tuple[ISpecification, RepairData, Optional[List[Tuple[CounterTrace, RepairData]]]]] = \
+        field(default_factory=list)
+
+
+def expand_task(
+        spec: ISpecification,
+        data: RepairData,
+        learners: Dict[str, ILearner],
+        oracle: IOracle,
+        discriminator: IDiscriminator,
+        mitigator: IMitigator,
+        oracle_workers: int = 1
+) -> TaskExpansion:
+    """
+    The expensive half of a BFS step (learning, realisability checks and
+    alternative task preparation). It reads nothing from the orchestration
+    manager, recorders or logger, which is what lets it run in a worker process.
+
+    With oracle_workers > 1, up to that many learned specs are checked by the
+    oracle at once (see check_learned_specs).
+    """
+    learning_strategy: str = discriminator.get_learning_strategy(spec, data)
+    learner = learners[learning_strategy]
+    expansion = TaskExpansion()
+    # Each learned spec is checked as soon as the learner yields it, which with
+    # a streaming learner overlaps the checks with the rest of the learning
+    expansion.checked_specs = check_learned_specs(learner.learn_new_iter(spec, data), oracle, oracle_workers)
+    if not expansion.checked_specs:
+        return TaskExpansion(alt_tasks=mitigator.prepare_alternative_learning_tasks(spec, data))
+    return expansion
+
+
+def check_learned_specs(
+        learned_tasks: Iterable[Tuple[ISpecification, RepairData]],
+        oracle: IOracle,
+        oracle_workers: int = 1
+) -> List[Tuple[ISpecification, RepairData, Optional[List[Tuple[CounterTrace, RepairData]]]]]:
+    """
+    Every learned spec paired with the oracle's verdict on it, in the order
+    they were learned.
+
+    The checks of one task's specs are independent, so with oracle_workers > 1
+    they run in a thread pool of that size. The oracle names counter-traces
+    after a counter it bumps once per counter-strategy, which concurrent checks
+    would bump in whatever order they finish. So the counter-traces are
+    renumbered afterwards, in learning order, from the counter's value before
+    the checks: names come out exactly as if the checks had run one by one.
+    Synthesis itself only runs concurrently when the oracle has more than one
+    JVM to synthesise in (see SpectraSynthesisService); the rest of each check
+    (e.g. counter-trace filtering with clingo) overlaps either way.
+    """
+    if oracle_workers <= 1:
+        return [(learned_spec, learned_data, oracle.is_valid_or_counter_arguments(learned_spec, learned_data))
+                for learned_spec, learned_data in learned_tasks]
+
+    first_cs_id = oracle.get_counter_strategy_count()
+    with ThreadPoolExecutor(max_workers=oracle_workers) as executor:
+        submitted = [(learned_spec, learned_data,
+                      executor.submit(oracle.is_valid_or_counter_arguments, learned_spec, learned_data))
+                     for learned_spec, learned_data in learned_tasks]
+        checked_specs = [(learned_spec, learned_data, future.result())
+                         for learned_spec, learned_data, future in submitted]
+    cs_id = first_cs_id
+    for _, _, counter_examples_with_data in checked_specs:
+        if counter_examples_with_data is None:
+            continue
+        for counter_example, _ in counter_examples_with_data:
+            counter_example.set_cs_id(cs_id)
+        cs_id += 1
+    oracle.set_counter_strategy_count(cs_id)
+    return checked_specs
 
 
 class BFSRepairOrchestrator:
@@ -28,8 +119,14 @@ class BFSRepairOrchestrator:
             hm: IHeuristicManager = NoFilterHeuristicManager(),
             recorder: IRecorder[ISpecification] = UniqueRecorder(),
             intermediate_recorder: IRecorder[ISpecification] = UniqueRecorder(),
-            logger: SpecLogger = SpecLogger("./main/spec_repair.log")
+            logger: SpecLogger = SpecLogger("./main/spec_repair.log"),
+            oracle_workers: int = 1
     ):
+        """
+        :param oracle_workers: how many of a task's learned specs the oracle may
+            check at once. Each check is a synthesis, so size this (and the
+            oracle's synthesis service) to the memory of the host.
+        """
         self._learners = learners
         self._oracle = oracle
         self._discriminator = discriminator
@@ -39,6 +136,10 @@ class BFSRepairOrchestrator:
         self._recorder = recorder
         self._intermediate_recorder = intermediate_recorder
         self._logger = logger
+        self._oracle_workers = oracle_workers
+        self._checkpoint_file: Optional[str] = None
+        self._checkpoint_interval: float = CHECKPOINT_INTERVAL
+        self._pruner: Optional[SubsumptionPruner] = None
         self._initialise_repair()
 
     @property
@@ -54,43 +155,178 @@ class BFSRepairOrchestrator:
     def _initialise_repair(self):
         # Counter for recording counter-traces
         self._ct_cnt = 0
+        # Size the final recorder must reach for repair_bfs to stop early
+        self._repairs_wanted: Optional[int] = None
+        # Tasks dropped by the subsumption pruner, each the root of a subtree
+        self._pruned_cnt = 0
         self._hm.reset()
+        self._share_heuristic_manager()
+
+    def _share_heuristic_manager(self):
         for learner in self._learners.values():
             learner._hm = self._hm
         self._mitigator._hm = self._hm
         self._oracle._hm = self._hm
 
+    def set_checkpoint(self, checkpoint_file: str, interval: float = CHECKPOINT_INTERVAL):
+        """
+        Save the search state to checkpoint_file every `interval` seconds (at
+        the end of a task), so that a run that dies can pick up where it left
+        off: repair_bfs resumes from the file when it exists, and deletes it
+        once the search is over.
+        """
+        self._checkpoint_file = checkpoint_file
+        self._checkpoint_interval = interval
+
+    def set_subsumption_pruner(self, pruner: Optional[SubsumptionPruner]):
+        """
+        Drop every task that a recorded repair makes pointless (see
+        SubsumptionPruner) before it reaches the learner. Only use it when the
+        non-maximal repairs are of no interest: they are no longer all found.
+        """
+        self._pruner = pruner
+
+    def _start_repair(
+            self,
+            og_spec: ISpecification,
+            og_data: RepairData,
+            max_repairs: Optional[int]
+    ):
+        if self._checkpoint_file and os.path.exists(self._checkpoint_file):
+            self._restore_checkpoint(og_spec, og_data)
+        else:
+            self._initialise_repair()
+            self._om.initialise_learning_tasks(og_spec, og_data)
+            self._repairs_wanted = None if max_repairs is None else len(self._recorder) + max_repairs
+        if self._pruner is not None:
+            self._pruner.update(self._recorder.get_all_values())
+        self._last_checkpoint_time = time.monotonic()
+
+    @staticmethod
+    def _run_identity(og_spec: ISpecification, og_data: RepairData) -> str:
+        return f"{og_spec.to_str()}\n{og_data.trace}\n{og_data.learning_type}"
+
+    def _search_state(self) -> dict:
+        # Everything the rest of the search depends on. The learners,
+        # discriminator and mitigator keep no state between tasks beyond the
+        # heuristic manager, and the logger only appends to its file.
+        return {
+            "om": self._om,
+            "recorder": self._recorder,
+            "intermediate_recorder": self._intermediate_recorder,
+            "hm": self._hm,
+            "ct_cnt": self._ct_cnt,
+            "oracle_ct_cnt": self._oracle.get_counter_strategy_count(),
+            "repairs_wanted": self._repairs_wanted,
+            "pruned_cnt": self._pruned_cnt,
+        }
+
+    def _save_checkpoint(self):
+        if not self._checkpoint_file:
+            return
+        write_pickle_atomically(self._checkpoint_file, {
+            "version": CHECKPOINT_VERSION,
+            "run": self._run_identity(*self._og_task),
+            "state": self._search_state(),
+        })
+        self._last_checkpoint_time = time.monotonic()
+
+    def _checkpoint_if_due(self):
+        if self._checkpoint_file and time.monotonic() - self._last_checkpoint_time >= self._checkpoint_interval:
+            self._save_checkpoint()
+
+    def _restore_checkpoint(self, og_spec: ISpecification, og_data: RepairData):
+        checkpoint = read_pickle(self._checkpoint_file)
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Checkpoint {self._checkpoint_file} was written by an incompatible version")
+        if checkpoint["run"] != self._run_identity(og_spec, og_data):
+            raise ValueError(f"Checkpoint {self._checkpoint_file} is of a repair of another spec or trace; "
+                             f"delete it to start this repair afresh")
+        state = checkpoint["state"]
+        self._om = state["om"]
+        self._recorder = state["recorder"]
+        self._intermediate_recorder = state["intermediate_recorder"]
+        self._hm = state["hm"]
+        self._share_heuristic_manager()
+        self._ct_cnt = state["ct_cnt"]
+        self._oracle.set_counter_strategy_count(state["oracle_ct_cnt"])
+        self._repairs_wanted = state["repairs_wanted"]
+        self._pruned_cnt = state.get("pruned_cnt", 0)
+        print(f"Resumed repair from checkpoint {self._checkpoint_file}")
+
+    def _finish_repair(self):
+        if self._pruner is not None:
+            print(f"Subsumption pruning cut {self._pruned_cnt} subtree{'s' if self._pruned_cnt != 1 else ''} "
+                  f"against {len(self._pruner)} recorded repair{'s' if len(self._pruner) != 1 else ''}")
+        if self._checkpoint_file and os.path.exists(self._checkpoint_file):
+            os.remove(self._checkpoint_file)
+
     def repair_bfs(
             self,
             og_spec: ISpecification,
-            og_data: RepairData
+            og_data: RepairData,
+            max_repairs: Optional[int] = None
     ):
-        self._initialise_repair()
-        self._om.initialise_learning_tasks(og_spec, og_data)
-
-        while self._om.has_next():
-            spec, data = self._om.get_next()
-            learning_strategy: str = self._discriminator.get_learning_strategy(spec, data)
-            learner = self._learners[learning_strategy]
-            learned_tasks: List[Tuple[ISpecification, RepairData]] = learner.learn_new(spec, data)
-            if not learned_tasks:
-                alt_tasks: List[Tuple[ISpecification, RepairData]] = self._mitigator.prepare_alternative_learning_tasks(
-                    spec,
-                    data)
-                for alt_spec, alt_data in alt_tasks:
-                    self._om.enqueue_new_tasks(alt_spec, alt_data, prev=(spec, data))
+        """
+        :param max_repairs: stop as soon as this many new repairs have been
+            recorded, rather than exploring the whole search space. Best used
+            with a best-first orchestration manager, so that the first repairs
+            found are the most promising ones.
+
+        The oracle is closed once the search is over, even if it fails.
+        """
+        self._og_task = (og_spec, og_data)
+        try:
+            self._start_repair(og_spec, og_data, max_repairs)
+
+            while self._om.has_next() and not self._has_enough_repairs():
+                spec, data = self._om.get_next()
+                if self._is_pruned(spec):
+                    continue
+                expansion = expand_task(spec, data, self._learners, self._oracle, self._discriminator,
+                                        self._mitigator, self._oracle_workers)
+                self._merge_expansion(spec, data, expansion)
+                self._checkpoint_if_due()
+            self._finish_repair()
+        finally:
+            self._oracle.close()
+
+    def _has_enough_repairs(self) -> bool:
+        return self._repairs_wanted is not None and len(self._recorder) >= self._repairs_wanted
+
+    def _is_pruned(self, spec: ISpecification) -> bool:
+        # Checked when the task leaves the queue rather than when it joins it,
+        # so that it is checked against every repair recorded in the meantime
+        if self._pruner is None or not self._pruner.is_dominated(spec):
+            return False
+        self._pruned_cnt += 1
+        return True
+
+    def _merge_expansion(
+            self,
+            spec: ISpecification,
+            data: RepairData,
+            expansion: TaskExpansion
+    ):
+        """
+        The cheap half of a BFS step: feeds one task's expansion back into the
+        orchestration manager, recorders and logger, in the order it was learned.
+        """
+        if expansion.alt_tasks is not None:
+            for alt_spec, alt_data in expansion.alt_tasks:
+                self._om.enqueue_new_tasks(alt_spec, alt_data, prev=(spec, data))
+            return
+        for learned_spec, data, counter_examples_with_data in expansion.checked_specs:
+            if not counter_examples_with_data:
+                learned_id = self._recorder.add(learned_spec)
+                if self._pruner is not None:
+                    self._pruner.add(learned_spec)
+                self._om.connect_leaf_node(learned_spec, learned_id, prev=(spec, data))
+                self._logger.record(learned_id, learned_spec, data, "Learned")
             else:
-                for learned_spec, data in learned_tasks:
-                    counter_examples_with_data: List[Tuple[CounterTrace, RepairData]] = self._oracle.is_valid_or_counter_arguments(
-                        learned_spec, data)
-                    if not counter_examples_with_data:
-                        learned_id = self._recorder.add(learned_spec)
-                        self._om.connect_leaf_node(learned_spec, learned_id, prev=(spec, data))
-                        self._logger.record(learned_id, learned_spec, data, "Learned")
-                    else:
-                        intermediate_id = self._intermediate_recorder.add(learned_spec)
-                        self._logger.record(intermediate_id, learned_spec, data, "Intermediate")
-                        for counter_example, data in counter_examples_with_data:
-                            new_spec, new_data = self._mitigator.prepare_learning_task(spec, data, learned_spec,
-                                                                                       counter_example)
-                            self._om.enqueue_new_tasks(new_spec, new_data, prev=(spec, data), failed_spec=learned_spec)
+                intermediate_id = self._intermediate_recorder.add(learned_spec)
+                self._logger.record(intermediate_id, learned_spec, data, "Intermediate")
+                for counter_example, data in counter_examples_with_data:
+                    new_spec, new_data = self._mitigator.prepare_learning_task(spec, data, learned_spec,
+                                                                               counter_example)
+                    self._om.enqueue_new_tasks(new_spec, new_data, prev=(spec, data), failed_spec=learned_spec)
@@ -26,9 +26,11 @@ afterwards. The builder owns both objects, so it can wire them together directly
 once both exist.
 """
 import os
+from functools import partial
 from typing import Callable, Dict, Iterable, Optional
 
 from main.bfs_repair_orchestrator import BFSRepairOrchestrator
+from main.parallel_bfs_repair_orchestrator import ParallelBFSRepairOrchestrator
 from spec_repair.components.discriminators.spectra_discriminator import SpectraDiscriminator
 from spec_repair.components.heuristic_managers.no_filter_heuristic_manager import NoFilterHeuristicManager
 from spec_repair.components.learners.optimising_final_spec_learner import OptimisingSpecLearner
@@ -36,6 +38,8 @@ from spec_repair.components.mitigators.learning_type_spec_mitigator import Learn
 from spec_repair.components.mitigators.mitigation_strategies import complete_counter_traces, \
     finish_here_return_nothing, move_one_to_guarantee_weakening
 from spec_repair.components.oracles.spectra_gr1_oracle import SpectraGR1Oracle
+from spec_repair.components.orchestration_managers.orchestration_manager_best_first import \
+    OrchestrationManagerBestFirst, TaskScorer
 from spec_repair.components.orchestration_managers.orchestration_manager_semantic_equivalence import \
     OrchestrationManagerSemanticEquivalence
 from spec_repair.components.orchestration_managers.orchestration_manager_semantic_equivalence_aw_merge import \
@@ -43,7 +47,11 @@ from spec_repair.components.orchestration_managers.orchestration_manager_semanti
 from spec_repair.components.orchestration_managers.orchestration_manager_syntactic_equivalence import \
     OrchestrationManagerSyntacticEquivalence
 from spec_repair.components.recorders.unique_spec_recorder import UniqueSpecRecorder
+from spec_repair.components.subsumption_pruner import SubsumptionPruner
+from spec_repair.config import CHECKPOINT_INTERVAL, DEFAULT_CACHE_DIR
 from spec_repair.enums import Learning
+from spec_repair.util.disk_cache import enable_disk_cache
+from spec_repair.wrappers.spectra_synthesis_service import SpectraSynthesisService
 from spec_repair.interfaces.idiscriminator import IDiscriminator
 from spec_repair.interfaces.iheuristic_manager import IHeuristicManager
 from spec_repair.interfaces.ilearner import ILearner
@@ -80,6 +88,13 @@ class BFSRepairOrchestratorBuilder:
         self._flat_debug_dir: Optional[str] = None
         self._log_file: Optional[str] = None
         self._on_record: Optional[OnRecord] = None
+        self._workers: Optional[int] = None
+        self._stream_solutions = False
+        self._checkpoint: Optional[tuple] = None
+        self._oracle_workers = 1
+        self._prune_subsumed = False
+        self._max_deadlock_completions: Optional[int] = None
+        self._disk_cache_dir: Optional[str] = None
 
     # ---------------- presets ----------------
 
@@ -121,6 +136,18 @@ class BFSRepairOrchestratorBuilder:
         builder._mitigation = {Learning.GUARANTEE_WEAKENING: complete_counter_traces}
         return builder
 
+    @classmethod
+    def best_first(cls, scorer: Optional[TaskScorer] = None) -> "BFSRepairOrchestratorBuilder":
+        """
+        Both weakening directions, specs deduped by semantic equivalence,
+        exploring the queued task scorer ranks best first (see
+        OrchestrationManagerBestFirst). Pair with repair_bfs(max_repairs=...)
+        to stop at the first few repairs.
+        """
+        builder = cls()
+        builder._om = OrchestrationManagerBestFirst(scorer) if scorer is not None else OrchestrationManagerBestFirst()
+        return builder
+
     # ---------------- overrides ----------------
 
     def with_heuristic_manager(self, hm: IHeuristicManager) -> "BFSRepairOrchestratorBuilder":
@@ -182,6 +209,70 @@ class BFSRepairOrchestratorBuilder:
         self._on_record = on_record
         return self
 
+    def with_workers(self, workers: int) -> "BFSRepairOrchestratorBuilder":
+        """
+        Expand up to `workers` queued tasks at a time in separate processes
+        (see ParallelBFSRepairOrchestrator). Without this, the search runs
+        sequentially in the calling process.
+        """
+        self._workers = workers
+        return self
+
+    def streaming_solutions(self) -> "BFSRepairOrchestratorBuilder":
+        """
+        Check each learned spec as soon as ILASP reports it, instead of once
+        every search of the learning step has finished (see
+        OptimisingSpecLearner.learn_new_iter).
+        """
+        self._stream_solutions = True
+        return self
+
+    def with_oracle_workers(self, oracle_workers: int) -> "BFSRepairOrchestratorBuilder":
+        """
+        Check up to `oracle_workers` learned specs of a task at once. Unless an
+        oracle is given too, the default oracle of a sequential search gets a
+        SpectraSynthesisService with that many JVMs, one per concurrent
+        synthesis, so size it to the memory of the host. With `with_workers`,
+        each worker synthesises in its own JVM instead, and only the rest of
+        the checks overlaps.
+        """
+        self._oracle_workers = oracle_workers
+        return self
+
+    def pruning_subsumed_tasks(self) -> "BFSRepairOrchestratorBuilder":
+        """
+        Skip tasks that can only lead to non-maximal repairs (see
+        SubsumptionPruner), for runs whose repairs are filtered for maximality.
+        """
+        self._prune_subsumed = True
+        return self
+
+    def with_max_deadlock_completions(self, max_alternatives: int) -> "BFSRepairOrchestratorBuilder":
+        """
+        Hand guarantee weakening at most `max_alternatives` ways of completing
+        the deadlocks of a task's counter-traces (see complete_counter_traces),
+        for deadlock-heavy specs where every completion becomes a task.
+        """
+        self._max_deadlock_completions = max_alternatives
+        return self
+
+    def with_disk_cache(self, cache_dir: str = DEFAULT_CACHE_DIR) -> "BFSRepairOrchestratorBuilder":
+        """
+        Cache Spectra, clingo and ILASP results in cache_dir across runs (see
+        enable_disk_cache). Caching is process-wide, and is turned on by build().
+        """
+        self._disk_cache_dir = cache_dir
+        return self
+
+    def with_checkpoint(self, checkpoint_file: str,
+                        interval: float = CHECKPOINT_INTERVAL) -> "BFSRepairOrchestratorBuilder":
+        """
+        Save the search state to checkpoint_file every `interval` seconds, and
+        resume from it when it is there (see BFSRepairOrchestrator.set_checkpoint).
+        """
+        self._checkpoint = (checkpoint_file, interval)
+        return self
+
     # ---------------- build ----------------
 
     def _build_recorders(self):
@@ -207,6 +298,14 @@ class BFSRepairOrchestratorBuilder:
                 intermediate = UniqueSpecRecorder(sem_equivalence=self._sem_equivalence)
         return recorder, intermediate
 
+    def _build_mitigation(self) -> Dict:
+        mitigation = dict(self._mitigation)
+        if self._max_deadlock_completions is not None \
+                and mitigation.get(Learning.GUARANTEE_WEAKENING) is complete_counter_traces:
+            mitigation[Learning.GUARANTEE_WEAKENING] = partial(complete_counter_traces,
+                                                               max_alternatives=self._max_deadlock_completions)
+        return mitigation
+
     def build(self) -> BFSRepairOrchestrator:
         hm = self._hm if self._hm is not None else NoFilterHeuristicManager()
         for flag in self._enabled:
@@ -216,25 +315,44 @@ class BFSRepairOrchestratorBuilder:
         # heuristic manager to its own, so passing `hm` here just keeps the
         # learners consistent before the first repair rather than mattering later.
         learners: Dict[str, ILearner] = {
-            name: OptimisingSpecLearner(heuristic_manager=hm) for name in self._learner_names
+            name: OptimisingSpecLearner(heuristic_manager=hm, stream_solutions=self._stream_solutions)
+            for name in self._learner_names
         }
         recorder, intermediate_recorder = self._build_recorders()
 
         logger_kwargs = {"filename": self._log_file} if self._log_file else {}
         logger = SpecLogger(**logger_kwargs)
 
-        repairer = BFSRepairOrchestrator(
+        parallel_kwargs = {"workers": self._workers} if self._workers is not None else {}
+        orchestrator_cls = ParallelBFSRepairOrchestrator if self._workers is not None else BFSRepairOrchestrator
+        oracle = self._oracle
+        if oracle is None:
+            # Workers get a pickled copy of the oracle, which synthesises in
+            # the worker's own JVM, so the service is only of use here
+            synthesis_service = SpectraSynthesisService(workers=self._oracle_workers) \
+                if self._oracle_workers > 1 and self._workers is None else None
+            oracle = SpectraGR1Oracle(synthesis_service=synthesis_service)
+        repairer = orchestrator_cls(
             learners,
-            self._oracle if self._oracle is not None else SpectraGR1Oracle(),
+            oracle,
             self._discriminator if self._discriminator is not None else SpectraDiscriminator(),
-            LearningTypeSpecMitigator(self._mitigation),
+            LearningTypeSpecMitigator(self._build_mitigation()),
             om=self._om if self._om is not None else OrchestrationManagerSemanticEquivalence(),
             hm=hm,
             recorder=recorder,
             intermediate_recorder=intermediate_recorder,
             logger=logger,
+            oracle_workers=self._oracle_workers,
+            **parallel_kwargs,
         )
 
+        if self._checkpoint is not None:
+            repairer.set_checkpoint(*self._checkpoint)
+        if self._prune_subsumed:
+            repairer.set_subsumption_pruner(SubsumptionPruner())
+        if self._disk_cache_dir is not None:
+            enable_disk_cache(self._disk_cache_dir)
+
         if self._on_record is not None:
             on_record = self._on_record
             logger.set_on_record(lambda idx, spec, data: on_record(repairer, idx, spec, data))
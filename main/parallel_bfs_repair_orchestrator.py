@@ -0,0 +1,135 @@
+"""
+Process-parallel variant of BFSRepairOrchestrator.
+
+Almost all of a BFS step is spent in ILASP, clingo and Spectra, and none of
+that work reads the search state: the orchestration manager, recorders and
+logger are only touched once a task's learned specs have been checked. So each
+step is split in two (see `expand_task` and `_merge_expansion`): a batch of
+queued tasks is expanded concurrently by a pool of worker processes, and the
+expansions are merged back one at a time, in queue order, in this process.
+
+Worker processes are started with the "spawn" method, since every one of them
+boots its own JVM (the import side effect of spec_repair.wrappers.jvm) and a
+forked JVM is not usable. Each worker also writes its temporary .spectra/.lp/
+.las files to a private directory, so that concurrent runs cannot clobber each
+other's scratch files.
+
+Merging in queue order keeps the search identical to the sequential one, with
+two caveats:
+  - counter-traces are named after the oracle's counter-strategy counter, which
+    lives in each worker. They are renumbered on merge from this process's
+    oracle, so names stay unique and match a sequential run.
+  - each worker holds its own copy of the heuristic manager. Heuristic managers
+    that keep state across tasks will see only the tasks of their own worker.
+"""
+import atexit
+import multiprocessing
+import pickle
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from main.bfs_repair_orchestrator import BFSRepairOrchestrator, TaskExpansion, expand_task
+from spec_repair.components.heuristic_managers.no_filter_heuristic_manager import NoFilterHeuristicManager
+from spec_repair.components.orchestration_managers.orchestration_manager_semantic_equivalence import \
+    OrchestrationManagerSemanticEquivalence
+from spec_repair.components.recorders.unique_recorder import UniqueRecorder
+from spec_repair.components.repair_data import RepairData
+from spec_repair.interfaces.idiscriminator import IDiscriminator
+from spec_repair.interfaces.iheuristic_manager import IHeuristicManager
+from spec_repair.interfaces.ilearner import ILearner
+from spec_repair.interfaces.imitigator import IMitigator
+from spec_repair.interfaces.ioracle import IOracle
+from spec_repair.interfaces.iorchestration_manager import IOrchestrationManager
+from spec_repair.interfaces.irecorder import IRecorder
+from spec_repair.interfaces.ispecification import ISpecification
+from spec_repair.loggers.spec_logger import SpecLogger
+from spec_repair.util.file_util import set_temp_dir
+
+# Components of the worker process, set once by _initialise_worker
+_worker_components: Optional[Tuple[Dict[str, ILearner], IOracle, IDiscriminator, IMitigator, int]] = None
+
+
+def _initialise_worker(pickled_components: bytes):
+    global _worker_components
+    temp_dir = tempfile.mkdtemp(prefix="spec_repair_worker_")
+    atexit.register(shutil.rmtree, temp_dir, ignore_errors=True)
+    set_temp_dir(temp_dir)
+    _worker_components = pickle.loads(pickled_components)
+
+
+def _expand_in_worker(task: Tuple[ISpecification, RepairData]) -> TaskExpansion:
+    learners, oracle, discriminator, mitigator, oracle_workers = _worker_components
+    spec, data = task
+    return expand_task(spec, data, learners, oracle, discriminator, mitigator, oracle_workers)
+
+
+class ParallelBFSRepairOrchestrator(BFSRepairOrchestrator):
+    def __init__(
+            self,
+            learners: Dict[str, ILearner],
+            oracle: IOracle,
+            discriminator: IDiscriminator,
+            mitigator: IMitigator,
+            om: IOrchestrationManager = OrchestrationManagerSemanticEquivalence(),
+            hm: IHeuristicManager = NoFilterHeuristicManager(),
+            recorder: IRecorder[ISpecification] = UniqueRecorder(),
+            intermediate_recorder: IRecorder[ISpecification] = UniqueRecorder(),
+            logger: SpecLogger = SpecLogger("./main/spec_repair.log"),
+            workers: Optional[int] = None,
+            oracle_workers: int = 1
+    ):
+        super().__init__(learners, oracle, discriminator, mitigator, om, hm, recorder, intermediate_recorder,
+                         logger, oracle_workers)
+        self._workers = workers if workers is not None else multiprocessing.cpu_count()
+
+    def repair_bfs(
+            self,
+            og_spec: ISpecification,
+            og_data: RepairData,
+            max_repairs: Optional[int] = None
+    ):
+        self._og_task = (og_spec, og_data)
+        try:
+            self._start_repair(og_spec, og_data, max_repairs)
+
+            # Pickled after _start_repair, so every worker starts from the same
+            # (freshly reset, or restored) heuristic manager as the components here.
+            pickled_components = pickle.dumps((self._learners, self._oracle, self._discriminator, self._mitigator,
+                                               self._oracle_workers))
+            with ProcessPoolExecutor(max_workers=self._workers,
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_initialise_worker,
+                                     initargs=(pickled_components,)) as executor:
+                while self._om.has_next() and not self._has_enough_repairs():
+                    batch = [(spec, data) for spec, data in self._om.get_next_batch(self._workers)
+                             if not self._is_pruned(spec)]
+                    for (spec, data), expansion in zip(batch, executor.map(_expand_in_worker, batch)):
+                        self._merge_expansion(spec, data, expansion)
+                        if self._has_enough_repairs():
+                            break
+                    # Only between batches: mid-batch, the rest of the batch has
+                    # already left the queue but is not merged yet
+                    self._checkpoint_if_due()
+            self._finish_repair()
+        finally:
+            self._oracle.close()
+
+    def _merge_expansion(
+            self,
+            spec: ISpecification,
+            data: RepairData,
+            expansion: TaskExpansion
+    ):
+        # Mirrors SpectraGR1Oracle.is_valid_or_counter_arguments: the counter
+        # goes up once per counter-strategy found, even if all of its
+        # counter-traces were then filtered out.
+        for _, _, counter_examples_with_data in expansion.checked_specs:
+            if counter_examples_with_data is None:
+                continue
+            cs_id = self._oracle.get_counter_strategy_count()
+            for counter_example, _ in counter_examples_with_data:
+                counter_example.set_cs_id(cs_id)
+            self._oracle.set_counter_strategy_count(cs_id + 1)
+        super()._merge_expansion(spec, data, expansion)
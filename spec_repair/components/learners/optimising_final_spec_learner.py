@@ -1,10 +1,15 @@
 import re
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from copy import copy, deepcopy
-from typing import Set, List, Tuple, Optional
+from queue import Queue
+from typing import Iterator, Set, List, Tuple, Optional
 
 from spec_repair.interfaces.ilearner import ILearner
-from spec_repair.components.new_spec_encoder import NewSpecEncoder
+from spec_repair.components.new_spec_encoder import NewSpecEncoder, ILASPSharedEncoding
+from spec_repair.config import ILASP_TIMEOUT
 from spec_repair.components.repair_data import RepairData
 from spec_repair.model.adaptation_learned import Adaptation
 from spec_repair.model.counter_trace import CounterTrace, complete_cts_from_ct
@@ -16,15 +21,23 @@ from spec_repair.components.heuristic_managers.no_filter_heuristic_manager impor
 from spec_repair.helpers.parsers.ilasp_interpreter import ILASPInterpreter
 from spec_repair.model.spectra_specification import SpectraSpecification
 
-from spec_repair.wrappers.asp_wrappers import get_violations, run_ILASP
+from spec_repair.wrappers.asp_wrappers import get_violations, run_ILASP, stream_ILASP
+
+# What learn_new gives up on a task for, returning the tasks of _tasks_after_failure
+_LEARNING_FAILURES = (NoWeakeningException, NoViolationException, DeadlockRequiredException,
+                      subprocess.TimeoutExpired)
+# Put on the results queue by each search of stream_possible_adaptations when it ends
+_SEARCH_DONE = object()
 
 
 class OptimisingSpecLearner(ILearner):
     def __init__(
             self,
             heuristic_manager: IHeuristicManager = NoFilterHeuristicManager(),
+            stream_solutions: bool = False,
     ):
         self._hm = heuristic_manager
+        self._stream_solutions = stream_solutions
         self.spec_encoder = NewSpecEncoder(heuristic_manager)
 
     # TODO: consider returning "data" instead of empty list when no learning is possible
@@ -37,44 +50,97 @@ class OptimisingSpecLearner(ILearner):
             possible_adaptations: List[List[Adaptation]] = self.find_possible_adaptations(spec, data.trace, data.counter_traces, data.learning_type)
             if self._hm:
                 possible_adaptations = self._hm.select_possible_learning_adaptations(possible_adaptations)
-            new_specs = []
-            new_repair_datas = []
-            for adaptations in possible_adaptations:
-                new_spec = deepcopy(spec).integrate_multiple(adaptations)
-                new_specs.append(new_spec)
-                new_repair_data = deepcopy(data)
-                new_repair_data.learning_steps += 1
-                new_repair_data.adaptation_history.append(adaptations)
-                new_repair_datas.append(new_repair_data)
-            new_tasks = [(new_spec, new_repair_data) for new_spec, new_repair_data in zip(new_specs, new_repair_datas)]
-            return new_tasks
-        except NoWeakeningException as e:
+            return [self._new_task(spec, data, adaptations) for adaptations in possible_adaptations]
+        except _LEARNING_FAILURES as e:
+            return self._tasks_after_failure(spec, data, e)
+
+    def learn_new_iter(
+            self,
+            spec: SpectraSpecification,
+            data: RepairData
+    ) -> Iterator[Tuple[SpectraSpecification, RepairData]]:
+        """
+        learn_new, one task at a time. With stream_solutions, each task is
+        yielded as soon as ILASP prints the solution it comes from (see
+        stream_possible_adaptations), so it can be checked while ILASP is still
+        looking for the rest. The heuristic manager selects among all the
+        solutions streamed so far every time a new one arrives, and only the
+        solutions it newly selects are yielded: a manager that chooses one
+        solution (e.g. ChooseFirstHeuristicManager) yields a single task.
+        """
+        if not self._stream_solutions:
+            yield from self.learn_new(spec, data)
+            return
+        try:
+            solutions: List[List[Adaptation]] = []
+            yielded: Set[int] = set()
+            for adaptations in self.stream_possible_adaptations(spec, data.trace, data.counter_traces, data.learning_type):
+                solutions.append(adaptations)
+                selected = self._hm.select_possible_learning_adaptations(list(solutions)) if self._hm else [adaptations]
+                for selected_adaptations in selected:
+                    # Managers select from the solutions they are given, which stay alive in solutions
+                    if id(selected_adaptations) not in yielded:
+                        yielded.add(id(selected_adaptations))
+                        yield self._new_task(spec, data, selected_adaptations)
+        except _LEARNING_FAILURES as e:
+            yield from self._tasks_after_failure(spec, data, e)
+
+    @staticmethod
+    def _new_task(spec: SpectraSpecification, data: RepairData, adaptations: List[Adaptation]) \
+            -> Tuple[SpectraSpecification, RepairData]:
+        new_spec = deepcopy(spec).integrate_multiple(adaptations)
+        new_repair_data = deepcopy(data)
+        new_repair_data.learning_steps += 1
+        new_repair_data.adaptation_history.append(adaptations)
+        return new_spec, new_repair_data
+
+    @staticmethod
+    def _tasks_after_failure(spec: SpectraSpecification, data: RepairData, e: Exception) \
+            -> List[Tuple[SpectraSpecification, RepairData]]:
+        if isinstance(e, NoWeakeningException):
             print(f"Weakening failed: NoWeakeningException thrown and {e}")
             return []
-        except NoViolationException as e:
+        if isinstance(e, NoViolationException):
             if not data.trace and not data.counter_traces and data.learning_type == Learning.GUARANTEE_WEAKENING:
                 print(f"No violation trace given, no counter-traces and spec is unrealisable, so will move straight to extracting counter strategies.")
                 return [(spec, data)]
             else:
                 print(f"Weakening failed: NoViolationException thrown and {e}")
                 return []
-        except DeadlockRequiredException as e:
+        if isinstance(e, DeadlockRequiredException):
             print(f"Weakening failed: DeadlockRequiredException thrown and {e}")
             return []
-        except subprocess.TimeoutExpired as e:
+        if isinstance(e, subprocess.TimeoutExpired):
             # run_ILASP's hypothesis search can time out on a large enough
             # spec (e.g. ColorSort) without being genuinely stuck - treat it
             # like the other "this branch didn't pan out" cases above rather
             # than crashing the whole BFS run.
             print(f"Weakening failed: ILASP timed out and {e}")
             return []
+        raise e
 
     def find_possible_adaptations(self, spec: SpectraSpecification, trace, cts, learning_type) -> List[
         List[Adaptation]]:
         violations = self.get_spec_violations(spec, trace, cts, learning_type)
-        con_adaptations = self.find_consequent_exception_adaptations(spec, trace, cts, learning_type, violations)
-        ant_adaptations = self.find_antecedent_exception_adaptations(spec, trace, cts, learning_type, violations)
-        ev_adaptations = self.find_eventualisation_adaptations(spec, trace, cts, learning_type, violations)
+        # The three searches are independent ILASP runs, so they run side by side
+        # under one deadline: a learning step takes as long as its slowest search
+        # rather than the sum of all three. The shared encoding is done here
+        # first, which also leaves the spec's unrealisable cores memoised before
+        # the searches' mode biases ask for them.
+        shared = self.spec_encoder.encode_ILASP_shared(spec, trace, cts, violations, learning_type)
+        deadline = time.monotonic() + ILASP_TIMEOUT
+        heuristic_managers = [
+            self._antecedent_exception_hm(),
+            self._consequent_exception_hm(),
+            self._eventualisation_hm(),
+        ]
+        with ThreadPoolExecutor(max_workers=len(heuristic_managers)) as executor:
+            futures = [
+                executor.submit(self._find_adaptations_with_shared_encoding,
+                                spec, shared, violations, learning_type, hm, deadline)
+                for hm in heuristic_managers
+            ]
+        ant_adaptations, con_adaptations, ev_adaptations = [future.result() for future in futures]
         adaptations = ant_adaptations + con_adaptations + ev_adaptations
         # adaptations = self.find_all_exception_adaptations(spec, trace, cts, learning_type, violations)
         if not adaptations:
@@ -89,6 +155,83 @@ class OptimisingSpecLearner(ILearner):
         useful_adaptations: List[List[Adaptation]] = filter_useful_adaptations(adaptations)
         return useful_adaptations
 
+    def stream_possible_adaptations(self, spec: SpectraSpecification, trace, cts, learning_type) \
+            -> Iterator[List[Adaptation]]:
+        """
+        The adaptations of find_possible_adaptations, yielded while the three
+        searches are still running. filter_useful_adaptations needs every
+        solution to find the best score, so it is applied online instead: a
+        solution is yielded unless one with a better score (among eventualisations,
+        or among the other adaptations) has been seen before it. ILASP reports
+        each search's solutions best first, so the only solutions this lets
+        through that find_possible_adaptations would not are those beaten by a
+        solution another search finds later.
+
+        A search that fails the way learn_new gives up on (e.g. times out)
+        after others have produced solutions only ends the stream; before that,
+        or for any other error, its error is raised.
+        """
+        violations = self.get_spec_violations(spec, trace, cts, learning_type)
+        shared = self.spec_encoder.encode_ILASP_shared(spec, trace, cts, violations, learning_type)
+        deadline = time.monotonic() + ILASP_TIMEOUT
+        heuristic_managers = [
+            self._antecedent_exception_hm(),
+            self._consequent_exception_hm(),
+            self._eventualisation_hm(),
+        ]
+        results: Queue = Queue()
+        stop = threading.Event()
+
+        def search(hm: IHeuristicManager):
+            try:
+                ilasp = self.spec_encoder.encode_ILASP_with_heuristic(spec, shared, violations, learning_type, hm)
+                for solution in ILASPInterpreter.iter_learned_possible_adaptations(stream_ILASP(ilasp, deadline=deadline)):
+                    if stop.is_set():
+                        # Leaving the loop closes the stream, which stops ILASP
+                        break
+                    results.put(solution)
+            except Exception as e:
+                results.put(e)
+            finally:
+                results.put(_SEARCH_DONE)
+
+        for hm in heuristic_managers:
+            threading.Thread(target=search, args=(hm,), daemon=True).start()
+
+        best_score = {True: float("inf"), False: float("inf")}
+        error: Optional[Exception] = None
+        n_yielded = 0
+        running = len(heuristic_managers)
+        try:
+            while running:
+                result = results.get()
+                if result is _SEARCH_DONE:
+                    running -= 1
+                elif isinstance(result, Exception):
+                    error = error or result
+                else:
+                    score, adaptations = result
+                    is_eventualisation = all(adaptation.type == "ev_temp_op" for adaptation in adaptations)
+                    if score <= best_score[is_eventualisation]:
+                        best_score[is_eventualisation] = score
+                        n_yielded += 1
+                        yield adaptations
+        finally:
+            stop.set()
+
+        if error is not None:
+            if not n_yielded or not isinstance(error, _LEARNING_FAILURES):
+                raise error
+            print(f"Stopped streaming solutions early: {error!r}")
+        elif not n_yielded:
+            if learning_type == Learning.ASSUMPTION_WEAKENING:
+                raise NoAssumptionWeakeningException(
+                    f"No {learning_type.exp_type_str()} weakening produces realizable spec (las file UNSAT)"
+                )
+            else:
+                raise NoWeakeningException(
+                    f"No {learning_type.exp_type_str()} weakening produces realizable spec (las file UNSAT)")
+
     def find_all_exception_adaptations(self, spec, trace, cts, learning_type, violations) -> List[Tuple[int, List[Adaptation]]]:
         hm = deepcopy(self._hm)
         hm.set_enabled("ANTECEDENT_WEAKENING")
@@ -97,30 +240,55 @@ class OptimisingSpecLearner(ILearner):
         return self.find_adaptations_with_heuristic(spec, trace, cts, learning_type, violations, hm)
 
     def find_antecedent_exception_adaptations(self, spec, trace, cts, learning_type, violations) -> List[Tuple[int, List[Adaptation]]]:
+        return self.find_adaptations_with_heuristic(spec, trace, cts, learning_type, violations,
+                                                    self._antecedent_exception_hm())
+
+    def find_consequent_exception_adaptations(self, spec, trace, cts, learning_type, violations) -> List[Tuple[int, List[Adaptation]]]:
+        return self.find_adaptations_with_heuristic(spec, trace, cts, learning_type, violations,
+                                                    self._consequent_exception_hm())
+
+    def find_eventualisation_adaptations(self, spec, trace, cts, learning_type, violations) -> List[Tuple[int, List[Adaptation]]]:
+        return self.find_adaptations_with_heuristic(spec, trace, cts, learning_type, violations,
+                                                    self._eventualisation_hm())
+
+    def _antecedent_exception_hm(self) -> IHeuristicManager:
         hm = deepcopy(self._hm)
         hm.set_enabled("ANTECEDENT_WEAKENING")
         hm.set_disabled("CONSEQUENT_WEAKENING")
         hm.set_disabled("INVARIANT_TO_RESPONSE_WEAKENING")
-        return self.find_adaptations_with_heuristic(spec, trace, cts, learning_type, violations, hm)
+        return hm
 
-    def find_consequent_exception_adaptations(self, spec, trace, cts, learning_type, violations) -> List[Tuple[int, List[Adaptation]]]:
+    def _consequent_exception_hm(self) -> IHeuristicManager:
         hm = deepcopy(self._hm)
         hm.set_disabled("ANTECEDENT_WEAKENING")
         hm.set_enabled("CONSEQUENT_WEAKENING")
         hm.set_disabled("INVARIANT_TO_RESPONSE_WEAKENING")
-        return self.find_adaptations_with_heuristic(spec, trace, cts, learning_type, violations, hm)
+        return hm
 
-    def find_eventualisation_adaptations(self, spec, trace, cts, learning_type, violations) -> List[Tuple[int, List[Adaptation]]]:
+    def _eventualisation_hm(self) -> IHeuristicManager:
         hm = deepcopy(self._hm)
         hm.set_disabled("ANTECEDENT_WEAKENING")
         hm.set_disabled("CONSEQUENT_WEAKENING")
         hm.set_enabled("INVARIANT_TO_RESPONSE_WEAKENING")
-        return self.find_adaptations_with_heuristic(spec, trace, cts, learning_type, violations, hm)
+        return hm
 
     def find_adaptations_with_heuristic(self, spec, trace, cts, learning_type, violations, hm):
-        self.spec_encoder.set_heuristic_manager(hm)
-        ilasp: str = self.spec_encoder.encode_ILASP(spec, trace, cts, violations, learning_type)
-        output: str = run_ILASP(ilasp)
+        shared = self.spec_encoder.encode_ILASP_shared(spec, trace, cts, violations, learning_type)
+        return self._find_adaptations_with_shared_encoding(spec, shared, violations, learning_type, hm)
+
+    def _find_adaptations_with_shared_encoding(
+            self,
+            spec,
+            shared: ILASPSharedEncoding,
+            violations,
+            learning_type,
+            hm: IHeuristicManager,
+            deadline: Optional[float] = None
+    ) -> List[Tuple[int, List[Adaptation]]]:
+        # hm is passed down rather than set on the shared encoder, as several
+        # searches run at once
+        ilasp: str = self.spec_encoder.encode_ILASP_with_heuristic(spec, shared, violations, learning_type, hm)
+        output: str = run_ILASP(ilasp, deadline=deadline)
         adaptations: Optional[
             List[Tuple[int, List[Adaptation]]]] = ILASPInterpreter.extract_learned_possible_adaptations(output)
         if not adaptations:
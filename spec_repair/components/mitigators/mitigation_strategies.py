@@ -1,6 +1,6 @@
 import re
-from copy import deepcopy, copy
-from typing import List, Tuple, Set, Any, cast
+from copy import deepcopy
+from typing import List, Tuple, Set, Any, cast, Optional, FrozenSet
 
 from spec_repair.interfaces.ispecification import ISpecification
 from spec_repair.components.new_spec_encoder import NewSpecEncoder
@@ -59,42 +59,54 @@ def move_all_to_guarantee_weakening(
 def complete_counter_traces(
         spec: ISpecification,
         data: RepairData,
+        max_alternatives: Optional[int] = None,
 ) -> List[Tuple[
     ISpecification, RepairData]]:
-    ctss: Set[Tuple[CounterTrace, ...]] = {tuple(data.counter_traces)}
-    unchanged = False
+    """
+    One guarantee weakening task per way of completing the deadlocked
+    counter-traces the violation requires to be completed, or only the first
+    max_alternatives of them (fewest atoms set first). Use functools.partial to
+    set max_alternatives on the strategy handed to a mitigator.
+
+    The sets of counter-traces are worked off a stack: each set is checked for
+    the deadlocks it requires once, and replaced by its completions, or kept
+    once it requires none. A set reached along several completion orders is
+    only stacked once.
+    """
+    initial_cts: Tuple[CounterTrace, ...] = tuple(data.counter_traces)
+    worklist: List[Tuple[CounterTrace, ...]] = [initial_cts]
+    seen: Set[FrozenSet[CounterTrace]] = {frozenset(initial_cts)}
+    ctss: List[Tuple[CounterTrace, ...]] = []
     try:
-        while not unchanged:
-            unchanged = True
-            for cts in deepcopy(ctss):
-                asp: str = NewSpecEncoder.encode_ASP(cast(SpectraSpecification, spec), data.trace, list(cts))
-                violations = get_violations(asp, exp_type=Learning.GUARANTEE_WEAKENING.exp_type())
-                if not violations:
-                    raise NoViolationException("Violation trace is not violating!")
-                deadlock_required = re.findall(r"entailed\((counter_strat_\d*_\d*)\)", ''.join(violations))
-                if deadlock_required:
-                    set_cts = set(cts)
-                    for i, ct in enumerate(copy(cts)):
-                        if ct.is_deadlock() and ct.get_name() in deadlock_required:
-                            new_set_cts = copy(set_cts)
-                            new_set_cts.remove(ct)
-                            ctss |= set([tuple(new_set_cts | {complete_ct}) for complete_ct in
-                                         complete_cts_from_ct(ct, spec, deadlock_required)])
-                            unchanged = False
-                    if not unchanged:
-                        ctss.remove(cts)
+        while worklist and (max_alternatives is None or len(ctss) < max_alternatives):
+            cts = worklist.pop()
+            asp: str = NewSpecEncoder.encode_ASP(cast(SpectraSpecification, spec), data.trace, list(cts))
+            violations = get_violations(asp, exp_type=Learning.GUARANTEE_WEAKENING.exp_type())
+            if not violations:
+                raise NoViolationException("Violation trace is not violating!")
+            deadlock_required = re.findall(r"entailed\((counter_strat_\d*_\d*)\)", ''.join(violations))
+            to_complete = [i for i, ct in enumerate(cts) if ct.is_deadlock() and ct.get_name() in deadlock_required]
+            if not to_complete:
+                ctss.append(cts)
+                continue
+            completed_ctss = [tuple(dict.fromkeys(cts[:i] + (complete_ct,) + cts[i + 1:]))
+                              for i in to_complete for complete_ct in complete_cts_from_ct(cts[i], spec, deadlock_required)]
+            # Depth first, so that a capped run reaches complete sets after a few checks
+            for completed_cts in reversed(completed_ctss):
+                if frozenset(completed_cts) not in seen:
+                    seen.add(frozenset(completed_cts))
+                    worklist.append(completed_cts)
     except NoViolationException as e:
         # The trace violates neither the assumptions nor (here) the guarantees
         # of this spec - there is nothing left to weaken along this branch, so
         # give up on it gracefully instead of crashing the whole BFS search.
         print(f"Weakening failed: NoViolationException thrown and {e}")
         return []
-    possible_cts_list = [list(cts) for cts in ctss]
     alternative_learning_tasks: List[Tuple[ISpecification, Any]] = []
-    for possible_cts in possible_cts_list:
+    for possible_cts in ctss:
         new_spec = deepcopy(spec)
         new_data = deepcopy(data)
-        new_data.counter_traces = possible_cts
+        new_data.counter_traces = list(possible_cts)
         new_data.learning_type = Learning.GUARANTEE_WEAKENING
         alternative_learning_tasks.append((new_spec, new_data))
     return alternative_learning_tasks
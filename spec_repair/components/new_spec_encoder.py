@@ -1,8 +1,12 @@
 from __future__ import annotations
+import logging
 import re
 from collections import defaultdict
-from typing import List, Optional, TYPE_CHECKING
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
+from spec_repair.config import PRUNING_DEPENDENCY_DEPTH
 from spec_repair.interfaces.ispecification import ISpecification
 from spec_repair.enums import Learning, When
 from spec_repair.interfaces.iheuristic_manager import IHeuristicManager
@@ -11,11 +15,24 @@ from spec_repair.ltl_types import GR1FormulaType, GR1AtomType
 from spec_repair.util.asp_trace_util import trace_list_to_asp_form, trace_list_to_ilasp_form, \
     create_atom_signature_asp
 from spec_repair.util.formula_string_util import parse_formula_str
+from spec_repair.util.ltl_formula_util import get_disjuncts_from_disjunction
 from spec_repair.wrappers.spectra_toolbox import run_all_unrealisable_cores
 from spec_repair.components.spec_generator import SpecGenerator
 
 if TYPE_CHECKING:
     from spec_repair.model.counter_trace import CounterTrace
+    from spec_repair.model.spectra_atom import SpectraAtom
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class ILASPSharedEncoding:
+    trace_ilasp: str
+    ct_list_ilasp: str
+    sub_spec: ISpecification
+    exp_names_to_learn: List[str]
+    signature_string: str
 
 
 class NewSpecEncoder:
@@ -53,34 +70,58 @@ class NewSpecEncoder:
     def encode_ILASP(self, spec: ISpecification, trace: List[str], ct_list: List[CounterTrace],
                      violations: list[str],
                      learning_type: Learning):
-        mode_declaration = self._create_mode_bias(spec, violations, learning_type)
+        shared = self.encode_ILASP_shared(spec, trace, ct_list, violations, learning_type)
+        return self.encode_ILASP_with_heuristic(spec, shared, violations, learning_type, self._hm)
+
+    @staticmethod
+    def encode_ILASP_shared(spec: ISpecification, trace: List[str], ct_list: List[CounterTrace],
+                            violations: list[str],
+                            learning_type: Learning) -> ILASPSharedEncoding:
+        """
+        The parts of encode_ILASP that do not depend on the heuristic manager,
+        so that searches differing only in the weakenings they allow can share them.
+        """
         trace_asp = trace_list_to_asp_form(trace)
-        trace_ilasp = trace_list_to_ilasp_form(trace_asp, learning=Learning.ASSUMPTION_WEAKENING)
-        ct_list_ilasp: str = ''.join([cs_trace.get_ilasp_form(learning=learning_type) for cs_trace in ct_list])
-        sub_spec = spec.extract_sub_specification(
-            lambda x: x['type'] == learning_type.formula_type()
-        )
         if learning_type == Learning.ASSUMPTION_WEAKENING:
             exp_names_to_learn = get_violated_expression_names_of_type(violations, learning_type.exp_type_str())
         else:
             exp_names_to_learn = get_unrealisable_core_expression_names(spec)
             # exp_names_to_learn = get_expression_names_of_type(violations, learning_type.exp_type_str())
-        expressions_to_weaken = sub_spec.to_asp(learning_names=exp_names_to_learn, for_clingo=False, hm=self._hm)
-        signature_string = create_atom_signature_asp(spec.get_atoms())
-        las = SpecGenerator.generate_ilasp(mode_declaration, expressions_to_weaken, signature_string, trace_ilasp,
-                                           ct_list_ilasp)
+        return ILASPSharedEncoding(
+            trace_ilasp=trace_list_to_ilasp_form(trace_asp, learning=Learning.ASSUMPTION_WEAKENING),
+            ct_list_ilasp=''.join([cs_trace.get_ilasp_form(learning=learning_type) for cs_trace in ct_list]),
+            sub_spec=spec.extract_sub_specification_of_type(learning_type.formula_type()),
+            exp_names_to_learn=exp_names_to_learn,
+            signature_string=create_atom_signature_asp(spec.get_atoms()),
+        )
+
+    def encode_ILASP_with_heuristic(self, spec: ISpecification, shared: ILASPSharedEncoding,
+                                    violations: list[str],
+                                    learning_type: Learning,
+                                    hm: IHeuristicManager) -> str:
+        """encode_ILASP under hm, from the output of encode_ILASP_shared. Safe to call from several threads."""
+        mode_declaration = self._create_mode_bias(spec, violations, learning_type, hm)
+        # to_asp configures the spec's own ASP formatter for the call, so each
+        # caller formats its own (cheap, formula-sharing) copy
+        sub_spec = deepcopy(shared.sub_spec)
+        expressions_to_weaken = sub_spec.to_asp(learning_names=shared.exp_names_to_learn, for_clingo=False, hm=hm)
+        las = SpecGenerator.generate_ilasp(mode_declaration, expressions_to_weaken, shared.signature_string,
+                                           shared.trace_ilasp, shared.ct_list_ilasp)
         return las
 
-    def _create_mode_bias(self, spec: ISpecification, violations: list[str], learning_type) -> str:
+    def _create_mode_bias(self, spec: ISpecification, violations: list[str], learning_type,
+                          hm: Optional[IHeuristicManager] = None) -> str:
+        if hm is None:
+            hm = self._hm
         output = "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n" \
                  "%% Mode Declaration\n" \
                  "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n\n"
 
-        if self._hm.is_enabled("ANTECEDENT_WEAKENING"):
+        if hm.is_enabled("ANTECEDENT_WEAKENING"):
             output += f"#modeh(antecedent_exception(const(expression_v), const(index), var(time), var(trace))).\n"
-        if self._hm.is_enabled("CONSEQUENT_WEAKENING"):
+        if hm.is_enabled("CONSEQUENT_WEAKENING"):
             output += f"#modeh(consequent_exception(const(expression_v), var(time), var(trace))).\n"
-        if self._hm.is_enabled("INVARIANT_TO_RESPONSE_WEAKENING"):
+        if hm.is_enabled("INVARIANT_TO_RESPONSE_WEAKENING"):
             output += f"#modeh(ev_temp_op(const(expression_v))).\n"
 
         restriction = ", (positive)"
@@ -88,31 +129,40 @@ class NewSpecEncoder:
         output += f"#modeb(2,holds_at(const(usable_atom), var(time), var(trace)){restriction}).\n"
         output += f"#modeb(2,not_holds_at(const(usable_atom), var(time), var(trace)){restriction}).\n"
 
-        atoms = sorted(spec.get_atoms())
-        for atom in atoms:
-            output += f"#constant(usable_atom,{atom.name}).\n"
-        # TODO: find a way to provide the correct end index value
-        if self._hm.is_enabled("ANTECEDENT_WEAKENING"):
-            # Index number multiplies the search space, so we limit it to the maximum number of disjuncts in the antecedent
-            output += f"#constant(index,0..{max(0, spec.get_max_disjuncts_in_antecedent() - 1)}).\n"
-        for temp_op in ["current", "next", "prev", "eventually"]:
-            output += f"#constant(temp_op_v,{temp_op}).\n"
-
         # This determines which rules can be weakened.
         if learning_type == Learning.GUARANTEE_WEAKENING:
             formula_names = get_unrealisable_core_expression_names(spec)
             # formula_names = get_expression_names_of_type(violations, learning_type.exp_type_str())
         elif not violations:
-            formula_names = spec.filter(lambda x: x['type'] == GR1FormulaType.ASM)["name"]
+            formula_names = spec.get_formula_names(GR1FormulaType.ASM)
         else:
             formula_names = get_violated_expression_names_of_type(violations, learning_type.exp_type_str())
 
+        all_atoms = sorted(spec.get_atoms())
+        all_temp_ops = ["current", "next", "prev", "eventually"]
+        max_index = max(0, spec.get_max_disjuncts_in_antecedent() - 1)
+        if hm.is_enabled("PRUNE_HYPOTHESIS_SPACE"):
+            atoms, temp_ops, index = self._pruned_hypothesis_space(spec, formula_names, hm, all_atoms)
+            log.debug("Hypothesis space pruned to %d/%d usable_atom, %d/%d temp_op_v, %d/%d index",
+                      len(atoms), len(all_atoms), len(temp_ops), len(all_temp_ops), index + 1, max_index + 1)
+        else:
+            atoms, temp_ops, index = all_atoms, all_temp_ops, max_index
+
+        for atom in atoms:
+            output += f"#constant(usable_atom,{atom.name}).\n"
+        # TODO: find a way to provide the correct end index value
+        if hm.is_enabled("ANTECEDENT_WEAKENING"):
+            # Index number multiplies the search space, so we limit it to the maximum number of disjuncts in the antecedent
+            output += f"#constant(index,0..{index}).\n"
+        for temp_op in temp_ops:
+            output += f"#constant(temp_op_v,{temp_op}).\n"
+
         for name in formula_names:
             output += f"#constant(expression_v, {name}).\n"
 
         output += f"#bias(\"\n"
         output += f":- constraint.\n"
-        if self._hm.is_enabled("ANTECEDENT_WEAKENING"):
+        if hm.is_enabled("ANTECEDENT_WEAKENING"):
             output += f":- head(antecedent_exception(_,_,V1,V2)), body(timepoint_of_op(_,V3,_,V4)), (V1, V2) != (V3, V4).\n"
             output += f":- head(antecedent_exception(_,_,_,V1)), body(holds_at(_,_,V2)), V1 != V2.\n"
             output += f":- head(antecedent_exception(_,_,_,V1)), body(not_holds_at(_,_,V2)), V1 != V2.\n"
@@ -120,7 +170,7 @@ class NewSpecEncoder:
             output += f":- body(holds_at(_, _, _)), body(not_holds_at(_, _, _)).\n"
             output += f":- body(not_holds_at(_, _, _)), body(holds_at(_, _, _)).\n"
             output += f":- body(not_holds_at(E1, _, _)), body(not_holds_at(E2, _, _)), E1 != E2.\n"
-        if self._hm.is_enabled("CONSEQUENT_WEAKENING"):
+        if hm.is_enabled("CONSEQUENT_WEAKENING"):
             output += f":- head(consequent_exception(_,V1,V2)), body(timepoint_of_op(_,V3,_,V4)), (V1, V2) != (V3, V4).\n"
             output += f":- head(consequent_exception(_,_,V1)), body(holds_at(_,_,V2)), V1 != V2.\n"
             output += f":- head(consequent_exception(_,_,V1)), body(not_holds_at(_,_,V2)), V1 != V2.\n"
@@ -135,37 +185,74 @@ class NewSpecEncoder:
         output += f":- body(not_holds_at(_,V1,V2)), not body(timepoint_of_op(_,_,V1,V2)).\n"
         output += f":- body(holds_at(A1,_,_)), body(not_holds_at(A2,_,_)), A1 == A2.\n"
 
-        if self._hm.is_enabled("ANTECEDENT_WEAKENING"):
+        if hm.is_enabled("ANTECEDENT_WEAKENING"):
             # It makes little sense to learn a "NEXT" atom within an antecedent
             output += f":- head(antecedent_exception(_,_,_,_)), body(timepoint_of_op(next,_,_,_)).\n"
             # Learning eventually expressions doesn't make sense within the antecedent of a formula
             output += f":- head(antecedent_exception(_,_,_,_)), body(timepoint_of_op(eventually,_,_,_)).\n"
-            if not self._hm.is_enabled("INCLUDE_PREV"):
+            if not hm.is_enabled("INCLUDE_PREV"):
                 output += f":- head(antecedent_exception(_,_,_,_)), body(timepoint_of_op(prev,_,_,_)).\n"
-        if self._hm.is_enabled("CONSEQUENT_WEAKENING"):
+        if hm.is_enabled("CONSEQUENT_WEAKENING"):
             # It makes little sense to learn a "PREV" atom within a consequent
             output += f":- head(consequent_exception(_,_,_)), body(timepoint_of_op(prev,_,_,_)).\n"
             # This is already taken care of by the INVARIANT_TO_RESPONSE_WEAKENING behaviour
             output += f":- head(consequent_exception(_,_,_)), body(timepoint_of_op(eventually,_,_,_)).\n"
-            if not self._hm.is_enabled("INCLUDE_NEXT"):
+            if not hm.is_enabled("INCLUDE_NEXT"):
                 output += f":- head(consequent_exception(_,_,_)), body(timepoint_of_op(next,_,_,_)).\n"
-        if self._hm.is_enabled("INVARIANT_TO_RESPONSE_WEAKENING"):
+        if hm.is_enabled("INVARIANT_TO_RESPONSE_WEAKENING"):
             output += f":- head(ev_temp_op(_)), body(timepoint_of_op(_,_,_,_)).\n"
             output += f":- head(ev_temp_op(_)), body(holds_at(_,_,_)).\n"
             output += f":- head(ev_temp_op(_)), body(not_holds_at(_,_,_)).\n"
         if learning_type == Learning.ASSUMPTION_WEAKENING:
             sys_atom_names = [atom.name for atom in atoms if atom.atom_type == GR1AtomType.SYS]
             for sys_atom_name in sys_atom_names:
-                if self._hm.is_enabled("ANTECEDENT_WEAKENING"):
+                if hm.is_enabled("ANTECEDENT_WEAKENING"):
                     output += f":- head(antecedent_exception(_,_,_,_)), body(timepoint_of_op(next,_,_,_)), body(holds_at({sys_atom_name },_,_)).\n"
                     output += f":- head(antecedent_exception(_,_,_,_)), body(timepoint_of_op(next,_,_,_)), body(not_holds_at({sys_atom_name},_,_)).\n"
-                if self._hm.is_enabled("CONSEQUENT_WEAKENING"):
+                if hm.is_enabled("CONSEQUENT_WEAKENING"):
                     output += f":- head(consequent_exception(_,_,_)), body(timepoint_of_op(next,_,_,_)), body(holds_at({sys_atom_name},_,_)).\n"
                     output += f":- head(consequent_exception(_,_,_)), body(timepoint_of_op(next,_,_,_)), body(not_holds_at({sys_atom_name},_,_)).\n"
 
         output += "\").\n\n"
         return output
 
+    @staticmethod
+    def _pruned_hypothesis_space(spec: ISpecification, formula_names: List[str], hm: IHeuristicManager,
+                                 atoms: List[SpectraAtom]) -> Tuple[List[SpectraAtom], List[str], int]:
+        """
+        The usable atoms, temporal operators and largest disjunct index when the
+        search is restricted to the formulas being weakened:
+
+        - atoms: those in the formulas being weakened, plus those sharing a
+          formula with them, PRUNING_DEPENDENCY_DEPTH formulas deep (the cone of
+          influence). This is the one restriction that may lose solutions.
+        - temporal operators: those the bias constraints below let a learned
+          body use at all under hm; the others only ever yield rejected rules.
+        - index: bounded by the disjuncts of the formulas being weakened rather
+          than of the whole spec.
+        """
+        atoms_by_formula = {
+            row.name: {atom.name for atom in atoms if re.search(rf"\b{re.escape(atom.name)}\b", row.formula.to_spot_str())}
+            for row in spec.get_formula_rows()
+        }
+        usable = set().union(*(atoms_by_formula.get(name, set()) for name in formula_names))
+        for _ in range(PRUNING_DEPENDENCY_DEPTH):
+            usable = usable.union(*(formula_atoms for formula_atoms in atoms_by_formula.values()
+                                    if formula_atoms & usable))
+
+        temp_ops = ["current"]
+        if hm.is_enabled("CONSEQUENT_WEAKENING") and hm.is_enabled("INCLUDE_NEXT"):
+            temp_ops.append("next")
+        if hm.is_enabled("ANTECEDENT_WEAKENING") and hm.is_enabled("INCLUDE_PREV"):
+            temp_ops.append("prev")
+
+        max_disjuncts = max(
+            [len(get_disjuncts_from_disjunction(spec.get_formula(name).antecedent)) for name in formula_names
+             if name in atoms_by_formula],
+            default=0
+        )
+        return [atom for atom in atoms if atom.name in usable], temp_ops, max(0, max_disjuncts - 1)
+
     def set_heuristic_manager(self, heuristic_manager):
         self._hm = heuristic_manager
 
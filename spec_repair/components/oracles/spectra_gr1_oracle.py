@@ -1,6 +1,6 @@
 import re
 from copy import deepcopy
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Set, Tuple
 
 from spec_repair.interfaces.ioracle import IOracle
 from spec_repair.components.new_spec_encoder import NewSpecEncoder
@@ -12,34 +12,69 @@ from spec_repair.model.spectra_specification import SpectraSpecification
 from spec_repair.util.file_util import generate_temp_filename, write_to_file
 from spec_repair.wrappers.spectra_toolbox import synthesise_extract_counter_strategies, \
     synthesise_check_realisability_only, run_all_unrealisable_cores
-from spec_repair.wrappers.asp_wrappers import get_violations
+from spec_repair.wrappers.asp_wrappers import run_clingo
+from spec_repair.wrappers.spectra_synthesis_service import SpectraSynthesisService
 
 
-def filter_counter_traces(cts: List[CounterTrace], spec: SpectraSpecification) -> List[CounterTrace]:
+def filter_counter_traces(cts: List[CounterTrace], spec: SpectraSpecification, batched: bool = False) -> List[CounterTrace]:
+    """
+    The counter-traces that violate no guarantee outside the spec's
+    unrealisable cores. With batched, they are all checked in one clingo call
+    rather than one call each; both ways read the same violations, so they keep
+    the same counter-traces.
+    """
     unrealisable_cores = set(get_unrealisable_core_expression_names(spec))
+    if batched and len(cts) > 1:
+        violated_guarantees_per_ct = violated_guarantees_of_counter_traces(cts, spec)
+        if violated_guarantees_per_ct is not None:
+            return [ct for ct in cts if not violated_guarantees_per_ct[ct.get_name()] - unrealisable_cores]
     filtered_cts = []
     for ct in cts:
-        asp: str = NewSpecEncoder.encode_ASP(spec, [""], [ct])
-        violations = get_violations(asp)
-        if not violations:
+        violated_guarantees_per_ct = violated_guarantees_of_counter_traces([ct], spec)
+        # No answer set means no violation
+        if violated_guarantees_per_ct is None or not violated_guarantees_per_ct[ct.get_name()] - unrealisable_cores:
             filtered_cts.append(ct)
-        else:
-            pattern = r'violation_holds\(\s*([^,]+),'
-            violated_expressions = set(re.findall(pattern, violations[0]))
-            guarantees = set(re.findall(r'guarantee\(\s*([^)]+)\s*\)', violations[0]))
-            violated_guarantees = violated_expressions.intersection(guarantees)
-            if not violated_guarantees - unrealisable_cores:
-                filtered_cts.append(ct)
     return filtered_cts
 
+
+def violated_guarantees_of_counter_traces(
+        cts: List[CounterTrace],
+        spec: SpectraSpecification
+) -> Optional[Dict[str, Set[str]]]:
+    """
+    Encodes all counter-traces into a single program and solves it once,
+    instead of once per counter-trace. The background knowledge evaluates every
+    trace independently (all its rules are per trace name), so the one answer
+    set holds each trace's violations side by side.
+    Returns None if the joint program has no answer set, so that the caller
+    can fall back to checking the counter-traces one by one.
+    """
+    asp: str = NewSpecEncoder.encode_ASP(spec, [""], cts)
+    output = "\n".join(run_clingo(asp))
+    if "Answer:" not in output:
+        return None
+    guarantees = set(re.findall(r'guarantee\(\s*([^)]+)\s*\)', output))
+    violated_guarantees_per_ct: Dict[str, Set[str]] = {ct.get_name(): set() for ct in cts}
+    for expression, trace_name in re.findall(r'violation_holds\(\s*([^,]+),[^,]+,\s*([^)\s]+)\s*\)', output):
+        if expression in guarantees and trace_name in violated_guarantees_per_ct:
+            violated_guarantees_per_ct[trace_name].add(expression)
+    return violated_guarantees_per_ct
+
 def get_unrealisable_core_expression_names(spec: SpectraSpecification) -> List[str]:
     unrealisable_cores = run_all_unrealisable_cores(spec.to_str(is_to_compile=True))
     return list(set().union(*unrealisable_cores))
 
 class SpectraGR1Oracle(IOracle):
-    def __init__(self):
+    def __init__(self, batch_ct_filtering: bool = False, synthesis_service: Optional[SpectraSynthesisService] = None):
         self._ct_cnt = 0
         self._hm = None
+        # Check all counter-traces of a counter-strategy in one clingo call
+        # (see violated_guarantees_of_counter_traces)
+        self._batch_ct_filtering = batch_ct_filtering
+        # Synthesise in a pool of warm JVMs rather than this process's own. A
+        # pickled oracle's service loses its pool: the copy synthesises in its
+        # own process's JVM, one synthesis at a time (see SpectraSynthesisService.submit)
+        self._synthesis_service = synthesis_service
 
     def is_valid_or_counter_arguments(
             self,
@@ -49,7 +84,8 @@ class SpectraGR1Oracle(IOracle):
         counter_strategy = self._synthesise_and_check(new_spec)
         if counter_strategy:
             all_counter_traces = cts_from_cs(counter_strategy, cs_id=self._ct_cnt)
-            possible_counter_traces = filter_counter_traces(all_counter_traces, new_spec)
+            possible_counter_traces = filter_counter_traces(all_counter_traces, new_spec,
+                                                            batched=self._batch_ct_filtering)
             if self._hm:
                 possible_counter_traces = self._hm.select_counter_traces(possible_counter_traces)
             self._ct_cnt += 1
@@ -58,6 +94,16 @@ class SpectraGR1Oracle(IOracle):
         else:
             return None
 
+    def get_counter_strategy_count(self) -> int:
+        return self._ct_cnt
+
+    def set_counter_strategy_count(self, count: int):
+        self._ct_cnt = count
+
+    def close(self):
+        if self._synthesis_service is not None:
+            self._synthesis_service.close()
+
     @staticmethod
     def is_realisable(
             spec: SpectraSpecification
@@ -89,6 +135,11 @@ class SpectraGR1Oracle(IOracle):
         Uses Spectra under the hood to check whether specifcation is realisable.
         If it is, nothing is returned. Otherwise, it returns a CounterStrategy.
         """
+        if self._synthesis_service is not None:
+            result = self._synthesis_service.synthesise(spec.to_str(is_to_compile=True))
+            if result.realizable is None:
+                raise Exception(result.output)
+            return result.counter_strategy
         output = self._synthesise(spec)
         if re.search("Result: Specification is unrealizable", output):
             return SpectraCSParser.from_str(output)
@@ -1,9 +1,8 @@
-import re
 from copy import deepcopy
 from typing import Optional, List, Tuple
 
 from spec_repair.interfaces.ioracle import IOracle
-from spec_repair.components.new_spec_encoder import NewSpecEncoder
+from spec_repair.components.oracles.spectra_gr1_oracle import filter_counter_traces
 from spec_repair.components.repair_data import RepairData
 from spec_repair.model.counter_strategy import CounterStrategy
 from spec_repair.model.counter_trace import cts_from_cs, CounterTrace
@@ -11,38 +10,17 @@ from spec_repair.helpers.formatters.spot_specification_formatter import SpotSpec
 from spec_repair.helpers.parsers.strix_cs_parser import StrixCSParser
 from spec_repair.model.spectra_specification import SpectraSpecification
 from spec_repair.util.file_util import generate_temp_filename, write_to_file
-from spec_repair.wrappers.spectra_toolbox import synthesise_extract_counter_strategies, run_all_unrealisable_cores
-from spec_repair.wrappers.asp_wrappers import get_violations
+from spec_repair.wrappers.spectra_toolbox import synthesise_extract_counter_strategies
 from spec_repair.wrappers.strix import Strix, StrixResult, OutputFormat, LabelEncoding
 
 from spec_repair.ltl_types import GR1AtomType
 
 
-def filter_counter_traces(cts: List[CounterTrace], spec: SpectraSpecification) -> List[CounterTrace]:
-    unrealisable_cores = set(get_unrealisable_core_expression_names(spec))
-    filtered_cts = []
-    for ct in cts:
-        asp: str = NewSpecEncoder.encode_ASP(spec, [""], [ct])
-        violations = get_violations(asp)
-        if not violations:
-            filtered_cts.append(ct)
-        else:
-            pattern = r'violation_holds\(\s*([^,]+),'
-            violated_expressions = set(re.findall(pattern, violations[0]))
-            guarantees = set(re.findall(r'guarantee\(\s*([^)]+)\s*\)', violations[0]))
-            violated_guarantees = violated_expressions.intersection(guarantees)
-            if not violated_guarantees - unrealisable_cores:
-                filtered_cts.append(ct)
-    return filtered_cts
-
-def get_unrealisable_core_expression_names(spec: SpectraSpecification) -> List[str]:
-    unrealisable_cores = run_all_unrealisable_cores(spec.to_str(is_to_compile=True))
-    return list(set().union(*unrealisable_cores))
-
 class StrixGR1RevisedOracle(IOracle):
-    def __init__(self, strix_path: Optional[str] = None):
+    def __init__(self, strix_path: Optional[str] = None, batch_ct_filtering: bool = False):
         self._ct_cnt = 0
         self._hm = None
+        self._batch_ct_filtering = batch_ct_filtering
         if strix_path:
             self._strix: Strix = Strix(binary=strix_path)
         else:
@@ -56,7 +34,8 @@ class StrixGR1RevisedOracle(IOracle):
         counter_strategy = self._synthesise_and_check(new_spec)
         if counter_strategy:
             all_counter_traces = cts_from_cs(counter_strategy, cs_id=self._ct_cnt)
-            possible_counter_traces = filter_counter_traces(all_counter_traces, new_spec)
+            possible_counter_traces = filter_counter_traces(all_counter_traces, new_spec,
+                                                            batched=self._batch_ct_filtering)
             if self._hm:
                 possible_counter_traces = self._hm.select_counter_traces(possible_counter_traces)
             self._ct_cnt += 1
@@ -65,6 +44,12 @@ class StrixGR1RevisedOracle(IOracle):
         else:
             return None
 
+    def get_counter_strategy_count(self) -> int:
+        return self._ct_cnt
+
+    def set_counter_strategy_count(self, count: int):
+        self._ct_cnt = count
+
     def is_realisable(
             self,
             spec: SpectraSpecification
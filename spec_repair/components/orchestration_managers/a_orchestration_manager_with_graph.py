@@ -11,12 +11,17 @@ from spec_repair.components.repair_data import RepairData
 from spec_repair.enums import Learning
 from spec_repair.interfaces.irecorder import IRecorder
 from spec_repair.components.recorders.unique_recorder import UniqueRecorder
+from spec_repair.model.counter_trace import CounterTrace
+from spec_repair.util.intern_table import InternTable
 
 RED = "#ff4444"
 GREEN = "#44ff44"
 BLUE = "#4444ff"
 YELLOW = "#ffff44"
 
+# Interned by identity like every other adaptation list, so it is stored once
+SWITCH_TO_GUARANTEE_WEAKENING = ["Switch to Guarantee Weakening"]
+
 
 def parse_ct(text):
     # Remove CT( and )
@@ -28,9 +33,22 @@ def parse_ct(text):
 
 
 class AOrchestrationManagerWithStackAndGraph(IOrchestrationManager, ABC):
+    """
+    Keeps the search graph compact: node and edge attributes only hold ids
+    into intern tables of the spec texts, counter-traces and adaptations they
+    refer to (see InternTable), and export_graph renders them into the strings
+    the graph used to carry.
+    """
+
     def __init__(self):
         self._stack: Deque[Tuple[ISpecification, Any]] = deque()
         self._graph = nx.MultiDiGraph()
+        # Specs are kept as their text, taken when they join the graph: the
+        # graph then holds no spec objects, and a spec changed afterwards is
+        # still exported as it was. Adaptation lists compare by identity.
+        self._specs: InternTable[str] = InternTable()
+        self._counter_traces: InternTable[CounterTrace] = InternTable()
+        self._adaptations: InternTable[list] = InternTable(key=id)
 
     def _reset(self):
         self._stack.clear()
@@ -43,6 +61,50 @@ class AOrchestrationManagerWithStackAndGraph(IOrchestrationManager, ABC):
         self._reset()
         self.enqueue_new_tasks(spec, data, prev=None)
 
+    def _add_task_node(
+            self,
+            task_id: int,
+            spec: ISpecification,
+            color: str,
+            counter_traces: list[CounterTrace],
+            learning_type: Learning
+    ):
+        self._graph.add_node(
+            task_id,
+            spec=self._specs.intern(spec.to_str()),
+            color=color,
+            data=([self._counter_traces.intern(ct) for ct in counter_traces], learning_type)
+        )
+
+    def export_graph(self) -> nx.MultiDiGraph:
+        """
+        A copy of the search graph with every attribute rendered to text, for
+        drawing or saving it.
+        """
+        ct_str = self._counter_traces.render(lambda ct: ct.print_multi_line())
+        adaptation_strs = self._adaptations.render(lambda adaptations: [str(a) for a in adaptations])
+        graph = nx.MultiDiGraph()
+        for node, attrs in self._graph.nodes(data=True):
+            attrs = dict(attrs)
+            if "spec" in attrs:
+                attrs["spec"] = self._specs[attrs["spec"]]
+            if "data" in attrs:
+                ct_ids, learning_type = attrs["data"]
+                attrs["data"] = ([ct_str(ct_id) for ct_id in ct_ids], str(learning_type))
+            graph.add_node(node, **attrs)
+        for u, v, attrs in self._graph.edges(data=True):
+            attrs = dict(attrs)
+            if "failed_spec" in attrs:
+                attrs["failed_spec"] = self._specs[attrs["failed_spec"]]
+            if "last_adaptation" in attrs:
+                # A fresh list per edge, as callers may edit the exported graph
+                attrs["last_adaptation"] = list(adaptation_strs(attrs["last_adaptation"]))
+            for key in ("before_deadlock_completion", "after_deadlock_completion"):
+                if key in attrs:
+                    attrs[key] = ct_str(attrs[key])
+            graph.add_edge(u, v, **attrs)
+        return graph
+
     def _add_edge_data_to_graph(
             self,
             data: RepairData,
@@ -58,21 +120,21 @@ class AOrchestrationManagerWithStackAndGraph(IOrchestrationManager, ABC):
                     self._graph.add_edge(
                         prev_task_id,
                         task_id,
-                        failed_spec=failed_spec.to_str(),
-                        last_adaptation=[str(adaptation) for adaptation in prev_data.adaptation_history[-1]]
+                        failed_spec=self._specs.intern(failed_spec.to_str()),
+                        last_adaptation=self._adaptations.intern(prev_data.adaptation_history[-1])
                     )
                 else:  # happens at the start of guarantee weakening from unrealisable spec, after counter example generation
                     self._graph.add_edge(
                         prev_task_id,
                         task_id,
-                        failed_spec=failed_spec.to_str(),
+                        failed_spec=self._specs.intern(failed_spec.to_str()),
                         details="Generating first counter-example"
                     )
             elif prev_data.learning_type == Learning.ASSUMPTION_WEAKENING and data.learning_type == Learning.GUARANTEE_WEAKENING:
                 self._graph.add_edge(
                     prev_task_id,
                     task_id,
-                    last_adaptation=["Switch to Guarantee Weakening"]
+                    last_adaptation=self._adaptations.intern(SWITCH_TO_GUARANTEE_WEAKENING)
                 )
             else:
                 ct1 = prev_data.counter_traces[-1].print_one_line()
@@ -82,15 +144,15 @@ class AOrchestrationManagerWithStackAndGraph(IOrchestrationManager, ABC):
                     self._graph.add_edge(
                         prev_task_id,
                         task_id,
-                        before_deadlock_completion=prev_data.counter_traces[-1].print_multi_line(),
-                        after_deadlock_completion=data.counter_traces[-1].print_multi_line(),
+                        before_deadlock_completion=self._counter_traces.intern(prev_data.counter_traces[-1]),
+                        after_deadlock_completion=self._counter_traces.intern(data.counter_traces[-1]),
                         deadlock_completion=list(difference)
                     )
                 else:
                     self._graph.add_edge(
                         prev_task_id,
                         task_id,
-                        last_adaptation=[str(adaptation) for adaptation in prev_data.adaptation_history[-1]]
+                        last_adaptation=self._adaptations.intern(prev_data.adaptation_history[-1])
                     )
 
     def connect_leaf_node(
@@ -101,11 +163,11 @@ class AOrchestrationManagerWithStackAndGraph(IOrchestrationManager, ABC):
     ):
         prev_id = self._get_task_id(*prev)
         prev_spec, prev_data = prev
-        self._graph.add_node(f"#{unique_id}", spec=spec.to_str(), color=BLUE)
+        self._graph.add_node(f"#{unique_id}", spec=self._specs.intern(spec.to_str()), color=BLUE)
         self._graph.add_edge(
             prev_id,
             f"#{unique_id}",
-            last_adaptation=[str(adaptation) for adaptation in prev_data.adaptation_history[-1]]
+            last_adaptation=self._adaptations.intern(prev_data.adaptation_history[-1])
         )
 
     def has_next(self) -> bool:
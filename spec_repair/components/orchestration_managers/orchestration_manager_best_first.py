@@ -0,0 +1,111 @@
+"""
+Best-first variant of OrchestrationManagerSemanticEquivalence.
+
+The other orchestration managers hand tasks out in the order they were queued,
+so BFSRepairOrchestrator explores every branch one learning step at a time and
+the first repair found is simply the first one at the shallowest depth. Here
+the queue is a heap ordered by a scorer, which sees each queued task and
+returns its priority (lower goes first), so the search follows whichever
+branch looks most promising. Together with the orchestrator's max_repairs,
+that gives a good repair quickly instead of the full BFS closure.
+
+Ties are broken by queue order, so with a constant scorer the search is the
+same as OrchestrationManagerSemanticEquivalence's.
+"""
+import heapq
+from typing import Any, Callable, Iterator, List, Tuple
+
+from spec_repair.components.orchestration_managers.orchestration_manager_semantic_equivalence import \
+    OrchestrationManagerSemanticEquivalence
+from spec_repair.components.repair_data import RepairData
+from spec_repair.enums import Learning
+from spec_repair.interfaces.ispecification import ISpecification
+from spec_repair.ltl_types import GR1FormulaType
+
+# (spec, data) of a queued task -> its priority; lower is explored first
+TaskScorer = Callable[[ISpecification, RepairData], Any]
+
+
+def learning_steps(spec: ISpecification, data: RepairData) -> int:
+    """Fewest learning steps first; breadth-first, like the other managers."""
+    return data.learning_steps
+
+
+def counter_trace_count(spec: ISpecification, data: RepairData) -> int:
+    """Fewest counter-traces to avoid first, i.e. branches closest to realisability."""
+    return len(data.counter_traces or [])
+
+
+def adaptation_size(spec: ISpecification, data: RepairData) -> int:
+    """
+    Smallest change to the original spec first. Each adaptation counts its
+    atoms plus one: ILASP scores a learned rule by its literals, which are
+    these atoms plus a fixed few for each kind of rule.
+    """
+    return sum(len(adaptation.atom_temporal_operators or []) + 1
+               for adaptations in data.adaptation_history or [] for adaptation in adaptations)
+
+
+def assumption_weakness(spec: ISpecification, data: RepairData):
+    """
+    Least weakened assumptions first (see SpectraSpecification.get_weakness).
+    Expensive: the weakness measure builds an automaton for every queued spec.
+    """
+    return spec.get_weakness(GR1FormulaType.ASM)
+
+
+def guarantee_weakening_last(spec: ISpecification, data: RepairData) -> int:
+    """Assumption weakening tasks before guarantee weakening ones."""
+    return int(data.learning_type == Learning.GUARANTEE_WEAKENING)
+
+
+class Lexicographic:
+    """
+    Orders tasks by the first scorer, ties by the second, and so on. A class
+    rather than a closure so that managers using it can be pickled.
+    """
+
+    def __init__(self, *scorers: TaskScorer):
+        self._scorers = scorers
+
+    def __call__(self, spec: ISpecification, data: RepairData) -> tuple:
+        return tuple(scorer(spec, data) for scorer in self._scorers)
+
+
+class TaskHeap:
+    """
+    The subset of deque the orchestration managers use for their queue
+    (append, popleft, clear, len), popping the task of lowest priority first.
+    """
+
+    def __init__(self, scorer: TaskScorer):
+        self._scorer = scorer
+        self._heap: List[Tuple[Any, int, Tuple[ISpecification, Any]]] = []
+        self._n_appended = 0
+
+    def append(self, node: Tuple[ISpecification, Any]):
+        spec, data = node
+        heapq.heappush(self._heap, (self._scorer(spec, data), self._n_appended, node))
+        self._n_appended += 1
+
+    def popleft(self) -> Tuple[ISpecification, Any]:
+        return heapq.heappop(self._heap)[-1]
+
+    def clear(self):
+        self._heap.clear()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __iter__(self) -> Iterator[Tuple[ISpecification, Any]]:
+        """The queued tasks, in the order they will be popped."""
+        return (node for _, _, node in sorted(self._heap, key=lambda entry: entry[:2]))
+
+    def __getitem__(self, i: int) -> Tuple[ISpecification, Any]:
+        return list(self)[i]
+
+
+class OrchestrationManagerBestFirst(OrchestrationManagerSemanticEquivalence):
+    def __init__(self, scorer: TaskScorer = Lexicographic(learning_steps, adaptation_size)):
+        super().__init__()
+        self._stack = TaskHeap(scorer)
@@ -6,6 +6,7 @@ from spec_repair.components.orchestration_managers.a_orchestration_manager_with_
 from spec_repair.components.repair_data import RepairData
 from spec_repair.enums import Learning
 from spec_repair.model.counter_trace import CounterTrace
+from spec_repair.util.semantic_spec_index import SemanticSpecIndex
 
 RED = "#ff4444"
 GREEN = "#44ff44"
@@ -17,10 +18,15 @@ class OrchestrationManagerSemanticEquivalence(AOrchestrationManagerWithStackAndG
     def __init__(self):
         super().__init__()
         self._visited_nodes_list: list[Tuple[ISpecification, Any]] = []
+        # Task ids of the visited nodes, keyed by spec (up to equivalence) and
+        # (counter-traces, learning_type), so finding a revisited node does not
+        # compare the spec against every node visited so far.
+        self._visited_nodes_index: SemanticSpecIndex[int] = SemanticSpecIndex()
 
     def _reset(self):
         super()._reset()
         self._visited_nodes_list = []
+        self._visited_nodes_index = SemanticSpecIndex()
 
     def enqueue_new_tasks(
             self,
@@ -37,26 +43,17 @@ class OrchestrationManagerSemanticEquivalence(AOrchestrationManagerWithStackAndG
             assert data.counter_traces == [] and data.learning_type == Learning.GUARANTEE_WEAKENING
             visited_node: Tuple[ISpecification, Any] = (spec, (sorted(data.counter_traces), data.learning_type))
         node: Tuple[ISpecification, Any] = (spec, data)
-        for task_id, past_node in enumerate(self._visited_nodes_list):
-            past_spec, past_data = past_node
-            # Check the cheap (counter-traces, learning_type) comparison before the
-            # expensive semantic spec equality (deepcopy + SPOT equivalence) so most
-            # non-matches short-circuit without ever touching the spec comparison.
-            if visited_node[1] == past_data and visited_node[0] == past_spec:
-                self._add_edge_data_to_graph(data, prev, failed_spec, task_id)
-                return task_id
         task_id = len(self._visited_nodes_list)
+        past_task_id = self._visited_nodes_index.setdefault(spec, task_id, extra=visited_node[1])
+        if past_task_id != task_id:
+            self._add_edge_data_to_graph(data, prev, failed_spec, past_task_id)
+            return past_task_id
         self._stack.append(node)
         self._visited_nodes_list.append(visited_node)
         node_color = YELLOW if not prev else (RED if data.learning_type == Learning.ASSUMPTION_WEAKENING else GREEN)
         cts: list[CounterTrace] = data.counter_traces[
             -1:] if data.learning_type == Learning.GUARANTEE_WEAKENING else sorted(data.counter_traces)
-        self._graph.add_node(
-            task_id,
-            spec=spec.to_str(),
-            color=node_color,
-            data=([ct.print_multi_line() for ct in cts], str(data.learning_type))
-        )
+        self._add_task_node(task_id, spec, node_color, cts, data.learning_type)
         self._add_edge_data_to_graph(data, prev, failed_spec, task_id)
         return task_id
 
@@ -72,8 +69,7 @@ class OrchestrationManagerSemanticEquivalence(AOrchestrationManagerWithStackAndG
         else:
             assert data.counter_traces == [] and data.learning_type == Learning.GUARANTEE_WEAKENING
             visited_node: Tuple[ISpecification, Any] = (spec, (data.counter_traces, data.learning_type))
-        for task_id, past_node in enumerate(self._visited_nodes_list):
-            past_spec, past_data = past_node
-            if visited_node[1] == past_data and visited_node[0] == past_spec:
-                return task_id
-        raise ValueError("No such task")
+        task_id = self._visited_nodes_index.get(spec, extra=visited_node[1])
+        if task_id is None:
+            raise ValueError("No such task")
+        return task_id
@@ -111,6 +111,15 @@ class OrchestrationManagerSemanticEquivalenceAsmOnly(AOrchestrationManagerWithSt
         self._visited_nodes_list.append((spec, data.learning_type, visited_data))
         return spec, data
 
+    def get_next_batch(self, max_tasks: int) -> list[Tuple[ISpecification, Any]]:
+        # Candidates are only promoted to the stack once it runs dry, and a
+        # candidate keeps absorbing counter-traces from later results until then.
+        # Popping several at once would promote them before those results are
+        # merged, so hand out a single task at a time.
+        if max_tasks < 1 or not self.has_next():
+            return []
+        return [self.get_next()]
+
     def _add_next_stack_candidate(self):
         while self._stack_candidates:
             failed_spec, (spec, data), prev_list = self._stack_candidates.popleft()
@@ -138,12 +147,7 @@ class OrchestrationManagerSemanticEquivalenceAsmOnly(AOrchestrationManagerWithSt
                 cts: list[CounterTrace] = data.counter_traces[
                     -1:] if data.learning_type == Learning.GUARANTEE_WEAKENING else sorted(data.counter_traces)
                 task_id = len(self._visited_nodes_list)
-                self._graph.add_node(
-                    task_id,
-                    spec=spec.to_str(),
-                    color=node_color,
-                    data=([ct.print_multi_line() for ct in cts], str(data.learning_type))
-                )
+                self._add_task_node(task_id, spec, node_color, cts, data.learning_type)
                 for prev in prev_list:
                     self._add_edge_data_to_graph(data, prev, failed_spec, task_id)
                 return True
@@ -47,12 +47,7 @@ class OrchestrationManagerSyntacticEquivalence(AOrchestrationManagerWithStackAnd
         self._visited_nodes.add(visited_node)
         task_id = self._visited_nodes.get_id(visited_node)
         node_color = YELLOW if not prev else (RED if data.learning_type == Learning.ASSUMPTION_WEAKENING else GREEN)
-        self._graph.add_node(
-            task_id,
-            spec=spec.to_str(),
-            color=node_color,
-            data=([ct.print_multi_line() for ct in data.counter_traces[-1:]], str(data.learning_type))
-        )
+        self._add_task_node(task_id, spec, node_color, data.counter_traces[-1:], data.learning_type)
         self._add_edge_data_to_graph(data, prev, failed_spec, task_id)
         return task_id
 
@@ -3,6 +3,7 @@ from typing import List, Optional
 from spec_repair.components.recorders.unique_recorder import UniqueRecorder
 from spec_repair.model.spectra_specification import SpectraSpecification
 from spec_repair.util.file_util import write_to_file
+from spec_repair.util.semantic_spec_index import SemanticSpecIndex
 
 
 class UniqueSpecRecorder(UniqueRecorder[SpectraSpecification]):
@@ -13,9 +14,11 @@ class UniqueSpecRecorder(UniqueRecorder[SpectraSpecification]):
     The two modes differ in *which* comparison decides that two specs are the
     same, and both ultimately bottom out in SpectraSpecification's dunders:
 
-    - `sem_equivalence=True` scans a list and compares with `__eq__`, which is
-      spot-backed logical equivalence over the assumptions and the guarantees.
-      Two specs written completely differently collapse to one entry.
+    - `sem_equivalence=True` looks specs up in a SemanticSpecIndex, which
+      decides equality the way `__eq__` does (spot-backed logical equivalence
+      over the assumptions and the guarantees) but only compares specs whose
+      semantic fingerprints match. Two specs written completely differently
+      collapse to one entry.
     - `sem_equivalence=False` uses UniqueRecorder's set/dict, so `__hash__`
       decides the bucket first and `__eq__` only ever runs within a bucket.
       `__hash__` is purely syntactic (module name plus the formula rows), so
@@ -34,15 +37,16 @@ class UniqueSpecRecorder(UniqueRecorder[SpectraSpecification]):
         # Always present, so the semantic-mode accessors below never depend on
         # whether __init__ happened to create it.
         self._specs: List[SpectraSpecification] = []
+        self._spec_index: SemanticSpecIndex[int] = SemanticSpecIndex()
 
     def add(self, new_spec: SpectraSpecification):
         if not self._semantic_equivalence:
             index = super().add(new_spec)
         else:
-            for index, spec in enumerate(self._specs):
-                if spec == new_spec:
-                    return index
             index = len(self._specs)
+            past_index = self._spec_index.setdefault(new_spec, index)
+            if past_index != index:
+                return past_index
             self._specs.append(new_spec)
         if self.debug_folder:
             write_to_file(f"{self.debug_folder}/spec_{index}.spectra", new_spec.to_str())
@@ -68,10 +72,7 @@ class UniqueSpecRecorder(UniqueRecorder[SpectraSpecification]):
     def get_id(self, value: SpectraSpecification) -> Optional[int]:
         if not self._semantic_equivalence:
             return super().get_id(value)
-        for index, spec in enumerate(self._specs):
-            if spec == value:
-                return index
-        return None
+        return self._spec_index.get(value)
 
     def get_element_by_id(self, id_: int) -> Optional[SpectraSpecification]:
         if not self._semantic_equivalence:
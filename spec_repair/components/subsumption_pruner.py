@@ -0,0 +1,61 @@
+"""
+Pruning of search branches that can only lead to non-maximal repairs.
+
+Every learning step weakens a spec: assumption weakening makes its assumptions
+weaker, guarantee weakening its guarantees. So each spec learned below a task
+has assumptions and guarantees at most as strong as the task's own. Once some
+recorded repair's assumptions (or guarantees) strictly imply the task's, they
+strictly imply those of every spec below it too, and
+filter_maximal_specifications (see spec_repair.diagnosis.spec_filtering) would
+drop all the repairs that branch can produce. When only the maximal repairs
+are wanted, the branch is not worth its ILASP and synthesis runs.
+
+The pruner indexes the recorded repairs by the spot strings of their
+assumptions and guarantees; a task is checked against all of them at once,
+translating its own formulas once (see spot_cache).
+"""
+from typing import Iterable, List, Set
+
+from spec_repair.ltl_types import GR1FormulaType
+from spec_repair.model.spectra_specification import SpectraSpecification
+from spec_repair.util import spot_cache
+
+
+class SubsumptionPruner:
+    def __init__(self):
+        self._indexed: Set[str] = set()
+        self._repair_strs = {GR1FormulaType.ASM: [], GR1FormulaType.GAR: []}
+
+    def __len__(self) -> int:
+        """The number of repairs indexed."""
+        return len(self._indexed)
+
+    def add(self, repair: SpectraSpecification) -> None:
+        spec_str = repair.to_spot_str()
+        if spec_str in self._indexed:
+            return
+        self._indexed.add(spec_str)
+        for formula_type, repair_strs in self._repair_strs.items():
+            repair_strs.append(repair.to_spot_str(formula_type))
+
+    def update(self, repairs: Iterable[SpectraSpecification]) -> None:
+        """Index the repairs not indexed yet, e.g. everything in a recorder."""
+        for repair in repairs:
+            self.add(repair)
+
+    def is_dominated(self, spec: SpectraSpecification) -> bool:
+        """
+        Whether a recorded repair is strictly stronger than spec on assumptions
+        or on guarantees, i.e. whether nothing learned from spec can be maximal.
+        """
+        return any(self._strictly_stronger_repairs(spec, formula_type) for formula_type in self._repair_strs)
+
+    def _strictly_stronger_repairs(self, spec: SpectraSpecification, formula_type: GR1FormulaType) -> List[str]:
+        spec_str = spec.to_spot_str(formula_type)
+        repair_strs = self._repair_strs[formula_type]
+        stronger_candidates = [repair_str for repair_str, repair_implies_spec
+                               in zip(repair_strs, spot_cache.implied_by_many(repair_strs, spec_str))
+                               if repair_implies_spec]
+        return [repair_str for repair_str, spec_implies_repair
+                in zip(stronger_candidates, spot_cache.implies_many(spec_str, stronger_candidates))
+                if not spec_implies_repair]
@@ -9,6 +9,9 @@ PATH_TO_ILASP = os.path.expanduser('~/Tools/bin/ILASP')
 PATH_TO_FASTLAS = os.path.expanduser('~/Tools/bin/FastLAS')
 PATH_TO_SHIELD = os.path.expanduser("~/Documents/PhD/SpecRepair/easy-downloads/spectra-executor.jar")
 PRINT_CS = False
+# Solve clingo queries in-process through the clingo Python package when it is
+# installed (see spec_repair/wrappers/clingo_api.py), instead of via SETUP_DICT['clingo']
+USE_CLINGO_API = True
 FASTLAS = False  # TODO: modify into enum (inductive ASP tool)
 RESTORE_FIRST_HYPOTHESIS = True
 
@@ -31,6 +34,17 @@ LOG_FOLDER = '/Users/tg4018/eclipse-workspace/PhD/Lift'
 
 # TODO: add these in a config class
 MAX_ASP_HYPOTHESES = 10
+# Seconds an ILASP (or FastLAS) hypothesis search may run for; the searches of
+# one learning step share a single deadline this far ahead
+ILASP_TIMEOUT = 60
+# Seconds a recorded ILASP timeout is trusted for before the task is tried again
+ILASP_TIMEOUT_CACHE_TTL = 24 * 60 * 60
+# With the PRUNE_HYPOTHESIS_SPACE heuristic, how many formulas away from the one
+# being weakened an atom may be (by sharing a formula) and still be learnable
+PRUNING_DEPENDENCY_DEPTH = 1
+
+# Seconds between checkpoints of a BFS repair run that has a checkpoint file
+CHECKPOINT_INTERVAL = 10 * 60
 
 # For testing and statistics
 STATISTICS: bool = True
@@ -45,3 +59,25 @@ SEMANTIC_EQUIVALENCE = True
 # 1. G(a&c->b) or 2. G(a->b|!c), and 1 equivalent to 2.
 # But both can be weakened further to response as:
 # 1. G(a&c->F(b)) or 2. G(a->F(b|!c)), who are not equivalent.
+
+# On-disk caching of external tool results (see spec_repair/util/disk_cache.py).
+# Entries are keyed on the exact tool input and flags, so a stale entry is only
+# possible if the tool itself changes behaviour without its binary changing.
+# Off by default, so that a run (or a test run) never depends on the runs before
+# it: set SPEC_REPAIR_CACHE_DIR to the directory to cache in, or turn it on with
+# enable_disk_cache (e.g. through BFSRepairOrchestratorBuilder.with_disk_cache).
+DEFAULT_CACHE_DIR: str = os.path.expanduser("~/.cache/spec_repair")
+CACHE_DIR: str = os.environ.get("SPEC_REPAIR_CACHE_DIR", "")
+DISK_CACHE_ENABLED: bool = bool(CACHE_DIR)
+DISK_CACHE_MAX_BYTES: int = 1 << 30
+
+# Entries kept by each of the in-memory spot caches (see spec_repair/util/spot_cache.py)
+SPOT_CACHE_SIZE: int = 4096
+
+# (spec, deadlocked counter-trace) pairs whose completions are remembered
+# (see spec_repair/model/counter_trace.py)
+DEADLOCK_COMPLETION_CACHE_SIZE: int = 1024
+
+# Compiled specs whose unrealisable cores are remembered in memory
+# (see spec_repair/wrappers/spectra_toolbox.py)
+UNREALISABLE_CORES_CACHE_SIZE: int = 1024
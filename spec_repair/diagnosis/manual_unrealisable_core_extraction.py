@@ -38,12 +38,7 @@ def _get_unrealisable_cores(
     specification.
     """
 
-    guarantees = frozenset(
-        spec._formulas_df.loc[
-            spec._formulas_df["type"] == GR1FormulaType.GAR,
-            "name",
-        ]
-    )
+    guarantees = frozenset(spec.get_formula_names(GR1FormulaType.GAR))
 
     #
     # Memoised oracle
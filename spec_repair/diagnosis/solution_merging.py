@@ -142,12 +142,12 @@ def merge_solutions(
             log.info("merging: %d/%d", i, len(specs))
         merged_spec = merged_spec.merge(spec)
     log.info("merged %d specs into one with %d formulas; checking realisability",
-             len(specs), len(merged_spec._formulas_df))
+             len(specs), len(merged_spec.get_formula_names()))
 
     if oracle.is_realisable(merged_spec):
         return [merged_spec]
 
-    n_formulas = len(merged_spec._formulas_df)
+    n_formulas = len(merged_spec.get_formula_names())
     if max_formulas_for_trivial_fallback is not None and n_formulas > max_formulas_for_trivial_fallback:
         raise MergeTooLargeError(
             f"Merging {len(specs)} specifications produced an unrealisable specification with "
@@ -16,6 +16,7 @@ from typing import List, Optional, Tuple
 
 from spec_repair.ltl_types import GR1FormulaType
 from spec_repair.model.spectra_specification import SpectraSpecification
+from spec_repair.util import spot_cache
 
 FileWithSpec = Tuple[str, SpectraSpecification]
 
@@ -79,16 +80,20 @@ def filter_maximal_specifications(
         gar_files = {spec[0] for spec in maximal_gar_specs}
         return [(name, spec) for name, spec in maximal_asm_specs if name in gar_files]
 
+    # Each spec's automata are translated once for the whole filtering (see spot_cache)
+    other_names = [other_spec_name for other_spec_name, _ in semantically_unique_files_with_specs]
+    other_strs = [other_spec.to_spot_str(comparison_type) for _, other_spec in semantically_unique_files_with_specs]
     maximal_specs_of_comparison_type = []
     for spec_name, spec in files_with_specs:
-        is_maximal = True
-        for other_spec_name, other_spec in semantically_unique_files_with_specs:
-            if (spec_name != other_spec_name and (
-                    (other_spec.implies(spec, comparison_type) and not spec.implies(other_spec, comparison_type))
-            )):
-                is_maximal = False
-                break
-        if is_maximal:
+        spec_str = spec.to_spot_str(comparison_type)
+        # Not maximal when some other spec implies it without being implied by it
+        stronger_candidates = [
+            other_str
+            for other_spec_name, other_str, other_implies_spec
+            in zip(other_names, other_strs, spot_cache.implied_by_many(other_strs, spec_str))
+            if other_implies_spec and other_spec_name != spec_name
+        ]
+        if all(spot_cache.implies_many(spec_str, stronger_candidates)):
             maximal_specs_of_comparison_type.append((spec_name, spec))
     return maximal_specs_of_comparison_type
 
@@ -117,13 +117,13 @@ def strengthen_random_formula(
     types has an applicable strengthening pattern.
     """
     rng = rng or random
-    rows = [row for _, row in spec._formulas_df.iterrows() if row["type"] in formula_types]
+    rows = [row for row in spec.get_formula_rows() if row.type in formula_types]
     rng.shuffle(rows)
     for row in rows:
-        new_formula = _try_strengthen(row["formula"], rng)
+        new_formula = _try_strengthen(row.formula, rng)
         if new_formula is not None:
             new_spec = deepcopy(spec)
-            new_spec.replace_formula(row["name"], new_formula)
+            new_spec.replace_formula(row.name, new_formula)
             return new_spec
     return None
 
@@ -56,10 +56,7 @@ class GeneratedTrace(NamedTuple):
 
 
 def get_formula_names(spec: SpectraSpecification, formula_type: Optional[GR1FormulaType] = None) -> List[str]:
-    df = spec._formulas_df
-    if formula_type is not None:
-        df = df[df["type"] == formula_type]
-    return [str(name) for name in df["name"]]
+    return [str(name) for name in spec.get_formula_names(formula_type)]
 
 
 def _trace_skeleton_asp(trace_name: str, n_timepoints: int) -> str:
@@ -1,13 +1,10 @@
-from copy import deepcopy
 from typing import Optional, List
 
-from spec_repair.helpers.formatters.spot_formula_formatter import SpotFormulaFormatter
 from spec_repair.model.gr1_formula import GR1Formula
 from spec_repair.ltl_types import GR1FormulaType, GR1TemporalType
 
 class SpotSpecificationFormatter:
     def __init__(self, type: Optional[GR1FormulaType] = None, not_initial: bool = False):
-        self._formula_formatter = SpotFormulaFormatter()
         self._type = type
         self._not_initial = not_initial
 
@@ -20,24 +17,22 @@ class SpotSpecificationFormatter:
         Returns:
             Formatted string of formulas joined with '&'
         """
-        # Never risk modifying the original spec
-        spec = deepcopy(spec)
         asm_formulas: List[GR1Formula] = []
         gar_formulas: List[GR1Formula] = []
         if self._type is not GR1FormulaType.GAR:
-            for _, row in spec._formulas_df[spec._formulas_df.type == GR1FormulaType.ASM].iterrows():
+            for row in spec.get_formula_rows(GR1FormulaType.ASM):
                 if self._not_initial and row.when == GR1TemporalType.INITIAL:
                     continue
                 asm_formulas.append(row.formula)
 
         if self._type is not GR1FormulaType.ASM:
-            for _, row in spec._formulas_df[spec._formulas_df.type == GR1FormulaType.GAR].iterrows():
+            for row in spec.get_formula_rows(GR1FormulaType.GAR):
                 if self._not_initial and row.when == GR1TemporalType.INITIAL:
                     continue
                 gar_formulas.append(row.formula)
 
-        asms = '&'.join([f.to_str(self._formula_formatter) for f in asm_formulas])
-        gars = '&'.join([f.to_str(self._formula_formatter) for f in gar_formulas])
+        asms = '&'.join([f.to_spot_str() for f in asm_formulas])
+        gars = '&'.join([f.to_spot_str() for f in gar_formulas])
         if asms and gars:
             formulas_str = f"({asms})->({gars})"
         elif asms:
@@ -1,10 +1,13 @@
 import re
-from typing import Optional, List, Tuple
+from typing import Iterable, Iterator, Optional, List, Tuple
 
 from spec_repair.exceptions import NoViolationException
 from spec_repair.model.adaptation_learned import Adaptation
 
 
+_SOLUTION_HEADER = re.compile(r"%% Solution (\d+) \(score (\d+)\)")
+
+
 class ILASPInterpreter:
 
     @staticmethod
@@ -28,3 +31,36 @@ class ILASPInterpreter:
             return None
         return [(score, [Adaptation.from_str(adaptation) for adaptation in adaptations])
                 for score, adaptations in possible_adaptations]
+
+    @staticmethod
+    def iter_learned_possible_adaptations_raw(lines: Iterable[str]) -> Iterator[Tuple[int, List[str]]]:
+        """
+        The solutions of extract_learned_possible_adaptations_raw, read from
+        ILASP's output lines as they arrive. A solution is yielded as soon as
+        it is known to be complete: at the next solution header, at a blank
+        line after its rules, or at the end of the output. UNSATISFIABLE ends the stream.
+        """
+        score: Optional[int] = None
+        hypothesis: List[str] = []
+        for line in lines:
+            header = _SOLUTION_HEADER.search(line)
+            if header or (hypothesis and not line.strip()) or "UNSATISFIABLE" in line:
+                if score is not None:
+                    yield score, hypothesis
+                score, hypothesis = None, []
+            if header:
+                if header.group(1) == "1" and header.group(2) == "0":
+                    raise NoViolationException("Learning problem is trivially solvable. "
+                                               "If spec is not realisable, we have a learning error.")
+                score = int(header.group(2))
+            elif "UNSATISFIABLE" in line:
+                return
+            elif score is not None and line.strip() and not line.startswith("%"):
+                hypothesis.append(line)
+        if score is not None:
+            yield score, hypothesis
+
+    @staticmethod
+    def iter_learned_possible_adaptations(lines: Iterable[str]) -> Iterator[Tuple[int, List[Adaptation]]]:
+        for score, adaptations in ILASPInterpreter.iter_learned_possible_adaptations_raw(lines):
+            yield score, [Adaptation.from_str(adaptation) for adaptation in adaptations]
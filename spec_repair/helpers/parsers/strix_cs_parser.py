@@ -39,9 +39,17 @@ Guard enumeration
 -----------------
 HOA transition guards are symbolic boolean formulas over AP indices, using
 ``t`` (tautology), integer literals, ``!`` (negation), ``&`` (conjunction),
-and ``|`` (disjunction).  An unconstrained AP (appearing as ``t``) ranges
-over both ``true`` and ``false``.  Each guard is fully enumerated into one
-concrete ``CSTransition`` per satisfying assignment.
+and ``|`` (disjunction).  Each guard is compiled into a cover of disjoint
+cubes (partial assignments) by Shannon expansion over the APs the guard
+actually mentions, so compiling it costs in the size of the guard rather than
+in the 2^AP assignments of the whole alphabet.
+
+An AP a cube leaves unconstrained ranges over both ``true`` and ``false``.  By
+default every cube is expanded into one concrete ``CSTransition`` per
+assignment of those APs, as the counter-trace extraction expects.  With
+``symbolic_dont_cares=True`` they are left out of the transition's
+``inputs``/``outputs`` instead, so the transition count only grows with the
+guards: one transition per cube.
 
 Trap / DEAD states
 ------------------
@@ -66,16 +74,40 @@ class _Expr:
     def evaluate(self, assignment: dict[int, bool]) -> bool:
         raise NotImplementedError
 
+    def support(self) -> set[int]:
+        """The AP indices the formula mentions."""
+        raise NotImplementedError
+
+    def restrict(self, idx: int, value: bool) -> _Expr:
+        """The formula with AP idx fixed to value, with constants folded away."""
+        raise NotImplementedError
+
 
 class _True(_Expr):
     def evaluate(self, _: dict[int, bool]) -> bool:
         return True
 
+    def support(self) -> set[int]:
+        return set()
+
+    def restrict(self, idx: int, value: bool) -> _Expr:
+        return self
+
 
 class _False(_Expr):
     def evaluate(self, _: dict[int, bool]) -> bool:
         return False
 
+    def support(self) -> set[int]:
+        return set()
+
+    def restrict(self, idx: int, value: bool) -> _Expr:
+        return self
+
+
+_TRUE = _True()
+_FALSE = _False()
+
 
 class _AP(_Expr):
     def __init__(self, idx: int):
@@ -84,6 +116,14 @@ class _AP(_Expr):
     def evaluate(self, assignment: dict[int, bool]) -> bool:
         return assignment[self.idx]
 
+    def support(self) -> set[int]:
+        return {self.idx}
+
+    def restrict(self, idx: int, value: bool) -> _Expr:
+        if idx != self.idx:
+            return self
+        return _TRUE if value else _FALSE
+
 
 class _Not(_Expr):
     def __init__(self, child: _Expr):
@@ -92,6 +132,17 @@ class _Not(_Expr):
     def evaluate(self, assignment: dict[int, bool]) -> bool:
         return not self.child.evaluate(assignment)
 
+    def support(self) -> set[int]:
+        return self.child.support()
+
+    def restrict(self, idx: int, value: bool) -> _Expr:
+        child = self.child.restrict(idx, value)
+        if isinstance(child, _True):
+            return _FALSE
+        if isinstance(child, _False):
+            return _TRUE
+        return self if child is self.child else _Not(child)
+
 
 class _And(_Expr):
     def __init__(self, left: _Expr, right: _Expr):
@@ -100,6 +151,22 @@ class _And(_Expr):
     def evaluate(self, assignment: dict[int, bool]) -> bool:
         return self.left.evaluate(assignment) and self.right.evaluate(assignment)
 
+    def support(self) -> set[int]:
+        return self.left.support() | self.right.support()
+
+    def restrict(self, idx: int, value: bool) -> _Expr:
+        left = self.left.restrict(idx, value)
+        if isinstance(left, _False):
+            return _FALSE
+        right = self.right.restrict(idx, value)
+        if isinstance(right, _False):
+            return _FALSE
+        if isinstance(left, _True):
+            return right
+        if isinstance(right, _True):
+            return left
+        return self if left is self.left and right is self.right else _And(left, right)
+
 
 class _Or(_Expr):
     def __init__(self, left: _Expr, right: _Expr):
@@ -108,6 +175,22 @@ class _Or(_Expr):
     def evaluate(self, assignment: dict[int, bool]) -> bool:
         return self.left.evaluate(assignment) or self.right.evaluate(assignment)
 
+    def support(self) -> set[int]:
+        return self.left.support() | self.right.support()
+
+    def restrict(self, idx: int, value: bool) -> _Expr:
+        left = self.left.restrict(idx, value)
+        if isinstance(left, _True):
+            return _TRUE
+        right = self.right.restrict(idx, value)
+        if isinstance(right, _True):
+            return _TRUE
+        if isinstance(left, _False):
+            return right
+        if isinstance(right, _False):
+            return left
+        return self if left is self.left and right is self.right else _Or(left, right)
+
 
 # ── Tokeniser + recursive-descent parser ─────────────────────────────────────
 
@@ -179,9 +262,9 @@ class _FormulaParser:
             return expr
         self._consume()
         if tok == 't':
-            return _True()
+            return _TRUE
         if tok == 'f':
-            return _False()
+            return _FALSE
         return _AP(int(tok))            # AP index literal
 
 
@@ -189,13 +272,46 @@ def _parse_guard(guard_str: str) -> _Expr:
     return _FormulaParser(_tokenize(guard_str)).parse()
 
 
+def _cube_cover(guard: _Expr) -> list[dict[int, bool]]:
+    """
+    Disjoint cubes ({ap_index: bool} over some of the guard's APs) whose
+    union is exactly the set of assignments satisfying *guard*.
+
+    Shannon expansion: fix the lowest AP the guard still mentions to false,
+    then to true, and recurse on what is left of the guard, stopping as soon
+    as it folds to a constant. APs the guard does not mention are never
+    branched on, and neither are APs made irrelevant by earlier choices.
+    """
+    cubes: list[dict[int, bool]] = []
+    stack: list[tuple[_Expr, dict[int, bool]]] = [(guard, {})]
+    while stack:
+        expr, cube = stack.pop()
+        support = expr.support()
+        if not support:
+            # A constant, though maybe not folded yet (e.g. "!t" as parsed)
+            if expr.evaluate({}):
+                cubes.append(cube)
+            continue
+        idx = min(support)
+        # Pushed true first so that cubes come out false-before-true
+        stack.append((expr.restrict(idx, True), {**cube, idx: True}))
+        stack.append((expr.restrict(idx, False), {**cube, idx: False}))
+    return cubes
+
+
+def _expand_cube(cube: dict[int, bool], ap_count: int) -> list[dict[int, bool]]:
+    """Every full assignment of the ap_count APs agreeing with *cube*."""
+    free = [i for i in range(ap_count) if i not in cube]
+    return [{**cube, **dict(zip(free, bits))} for bits in product((False, True), repeat=len(free))]
+
+
 def _enumerate_satisfying(guard: _Expr, ap_count: int) -> list[dict[int, bool]]:
-    """Return every {ap_index: bool} assignment that satisfies *guard*."""
-    return [
-        {i: bits[i] for i in range(ap_count)}
-        for bits in product((False, True), repeat=ap_count)
-        if guard.evaluate({i: bits[i] for i in range(ap_count)})
-    ]
+    """
+    Return every {ap_index: bool} assignment that satisfies *guard*, in the
+    order of product((False, True), repeat=ap_count).
+    """
+    assignments = [assignment for cube in _cube_cover(guard) for assignment in _expand_cube(cube, ap_count)]
+    return sorted(assignments, key=lambda assignment: [assignment[i] for i in range(ap_count)])
 
 
 # ── HOA parser ────────────────────────────────────────────────────────────────
@@ -211,6 +327,7 @@ class StrixCSParser:
     Usage::
 
         cs = StrixHOAParser.from_str(strix_stdout)
+        cs = StrixHOAParser.from_str(strix_stdout, symbolic_dont_cares=True)
     """
 
     # ------------------------------------------------------------------ #
@@ -218,12 +335,18 @@ class StrixCSParser:
     # ------------------------------------------------------------------ #
 
     @classmethod
-    def from_str(cls, text: str) -> CounterStrategy:
-        """Parse the full Strix HOA output string into a ``CounterStrategy``."""
+    def from_str(cls, text: str, symbolic_dont_cares: bool = False) -> CounterStrategy:
+        """
+        Parse the full Strix HOA output string into a ``CounterStrategy``.
+
+        :param symbolic_dont_cares: leave the APs a guard does not constrain
+            out of the transitions, rather than making one transition for each
+            of their assignments (see the module docstring).
+        """
         lines = text.splitlines()
         ap_names, controllable_indices, start_idx = cls._parse_header(lines)
         raw = cls._parse_body_raw(lines)
-        return cls._build_counter_strategy(raw, ap_names, controllable_indices, start_idx)
+        return cls._build_counter_strategy(raw, ap_names, controllable_indices, start_idx, symbolic_dont_cares)
 
     # ------------------------------------------------------------------ #
     # Header parsing                                                       #
@@ -350,12 +473,15 @@ class StrixCSParser:
         ap_names: list[str],
         controllable_indices: set[int],
         start_idx: int,
+        symbolic_dont_cares: bool = False,
     ) -> CounterStrategy:
         n = len(ap_names)
         trap_states = cls._identify_trap_states(raw)
         name_map = cls._build_name_map(raw, start_idx, trap_states)
 
         transitions: list[CSTransition] = []
+        # The same few guards (e.g. "(t) & (t)") recur across states
+        assignments_by_guard: dict[str, list[dict[int, bool]]] = {}
 
         for state_idx, trans_list in raw.items():
             src_name = name_map[state_idx]
@@ -365,19 +491,21 @@ class StrixCSParser:
 
             for guard_str, target_idx in trans_list:
                 target_name = name_map.get(target_idx, f"S{target_idx}")
-                guard = _parse_guard(guard_str)
-                satisfying = _enumerate_satisfying(guard, n)
+                if guard_str not in assignments_by_guard:
+                    guard = _parse_guard(guard_str)
+                    assignments_by_guard[guard_str] = _cube_cover(guard) if symbolic_dont_cares \
+                        else _enumerate_satisfying(guard, n)
 
-                for assignment in satisfying:
+                for assignment in assignments_by_guard[guard_str]:
                     inputs = {
                         ap_names[i]: assignment[i]
                         for i in range(n)
-                        if i in controllable_indices
+                        if i in controllable_indices and i in assignment
                     }
                     outputs = {
                         ap_names[i]: assignment[i]
                         for i in range(n)
-                        if i not in controllable_indices
+                        if i not in controllable_indices and i in assignment
                     }
                     transitions.append(CSTransition(
                         source=src_name,
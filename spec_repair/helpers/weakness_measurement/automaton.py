@@ -1,3 +1,4 @@
+import functools
 import itertools
 import re
 import subprocess
@@ -5,8 +6,51 @@ import timeit
 
 import dd
 import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
 import tarjan
 
+# SCCs up to this many states get their spectral radius from a dense eigendecomposition
+DENSE_SPECTRAL_RADIUS_MAX_STATES = 32
+
+
+def spectralRadius(matrix, dense_max_states=DENSE_SPECTRAL_RADIUS_MAX_STATES):
+    """Returns the largest absolute eigenvalue of the square sparse matrix in input.
+    Small matrices are solved densely, as np.linalg.eig does it exactly; larger ones with ARPACK, which only computes
+    the one eigenvalue needed instead of all of them, falling back to the dense computation if it does not converge.
+    The matrices are the adjacency matrices of SCCs, so nonnegative and irreducible: the spectral radius is the
+    Perron root, and is the modulus of whichever largest-magnitude eigenvalue ARPACK finds."""
+    n = matrix.shape[0]
+    # ARPACK needs k=1 < n-1
+    if n > max(dense_max_states, 2):
+        try:
+            eigenvalues = spla.eigs(matrix.astype(np.float64), k=1, which="LM", return_eigenvectors=False)
+            return np.max(np.absolute(eigenvalues))
+        except spla.ArpackNoConvergence:
+            pass
+    return np.max(np.absolute(np.linalg.eig(matrix.toarray())[0]))
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _countSatisfyingAssignments(formula):
+    """Returns the number of assignments to the variables in the label formula satisfying it, and the number of those
+    variables. Cached: the edges of an intersection automaton are all conjunctions of the same few labels"""
+
+    # Extract all variables in the formula. Take distinct entries only.
+    # Do not list constants as variables
+    vars = list(set(re.findall(r"\b(?!TRUE|FALSE)\w+",formula)))
+    # Reformat constants in dd syntax
+    formula = formula.replace("TRUE","True").replace("FALSE","False")
+
+    # Build a BDD object
+    bdd = dd.BDD()
+    [bdd.add_var(var) for var in vars]
+    node = bdd.add_expr(formula)
+
+    # BDD.count gets the number of satisfying assignments for the BDD
+    return node.count(nvars=len(vars)), len(vars)
+
+
 class Automaton:
     """Defines the Buchi automaton corresponding to an LTL formula"""
 
@@ -212,59 +256,40 @@ class Automaton:
     def _getEdgeMultiplicity(self,formula):
         """Returns the number of variable assignments satisfying the label formula in edge"""
 
-        # Extract all variables in the formula. Take distinct entries only.
-        # Do not list constants as variables
-        vars = list(set(re.findall(r"\b(?!TRUE|FALSE)\w+",formula)))
-        # Reformat constants in dd syntax
-        formula = formula.replace("TRUE","True").replace("FALSE","False")
-
-        # Build a BDD object
-        bdd = dd.BDD()
-        [bdd.add_var(var) for var in vars]
-        node = bdd.add_expr(formula)
-
-        # BDD.count gets the number of satisfying assignments for the BDD
+        count, numvars = _countSatisfyingAssignments(formula)
         # The number is multiplied by a factor accounting for the unconstrained variables in the formula
         # ** is exponentiation
-        return node.count(nvars=len(vars))*2**(len(self.var_set)-len(vars))
+        return count*2**(len(self.var_set)-numvars)
 
     def _getEdgeReducedMultiplicity(self, formula):
         """Computes the multiplicity of an edge by neglecting variables not appearing in the formula"""
 
-        # Extract all variables in the formula. Take distinct entries only.
-        # Do not list constants as variables
-        vars = list(set(re.findall(r"\b(?!TRUE|FALSE)\w+",formula)))
-        # Reformat constants in dd syntax
-        formula = formula.replace("TRUE","True").replace("FALSE","False")
-
-        # Build a BDD object
-        bdd = dd.BDD()
-        [bdd.add_var(var) for var in vars]
-        node = bdd.add_expr(formula)
-
-        # BDD.count gets the number of satisfying assignments for the BDD
+        count, numvars = _countSatisfyingAssignments(formula)
         # The number is multiplied by a factor accounting for the unconstrained variables in the formula
         # ** is exponentiation
-        return node.count(nvars=len(vars)) * 2 ** (len(self.constrained_var_set) - len(vars))
+        return count * 2 ** (len(self.constrained_var_set) - numvars)
 
     def getAdjacencyMatrix(self):
-        """Returns the adjacency matrix of the automaton"""
-        mat = np.zeros([self.numstates,self.numstates],np.int32)
-        for edge in self.edges:
-            # Assign edge multiplicity to the (id_src,id_dst) matrix element
-            mat[edge[0]][edge[2]] = edge[3]
-        return mat
+        """Returns the adjacency matrix of the automaton, as a sparse CSR matrix"""
+        # Assign edge multiplicity to the (id_src,id_dst) matrix element. As with assignments into a dense matrix,
+        # the last of several edges between the same states wins (the CSR constructor would sum them up)
+        multiplicities = {(edge[0], edge[2]): edge[3] for edge in self.edges}
+        rows = np.fromiter((src for src, _ in multiplicities), np.int64, len(multiplicities))
+        cols = np.fromiter((dst for _, dst in multiplicities), np.int64, len(multiplicities))
+        data = np.array(list(multiplicities.values()), np.int64)
+        return sp.csr_matrix((data, (rows, cols)), shape=(self.numstates, self.numstates))
 
     def reachable(self, graph, node, reached):
         """Returns the set of all reachable states from the initial one (return type: set)"""
 
+        # Iterative DFS: automata with thousands of states exceed the recursion limit
         reached.update([node])
-        adjacent = graph.get(node)
-
-        if adjacent is not None:
-            for subnode in adjacent:
+        stack = [node]
+        while stack:
+            for subnode in graph.get(stack.pop()) or []:
                 if subnode not in reached:
-                    reached.update(self.reachable(graph, subnode, reached))
+                    reached.add(subnode)
+                    stack.append(subnode)
         return reached
 
     def getCoReachableSCCs(self):
@@ -277,7 +302,7 @@ class Automaton:
             for accepting_scc in accepting_sccs:
                 coreachable_states.update(self.reachable(coreach_list, self.sccs[accepting_scc][0], coreachable_states))
 
-            self.coreachable_sccs_indices = [self.sccs.index(scc) for scc in sccs if scc[0] in coreachable_states]
+            self.coreachable_sccs_indices = [i for i, scc in enumerate(sccs) if scc[0] in coreachable_states]
         return self.coreachable_sccs_indices
 
     def getSCCs(self):
@@ -301,12 +326,16 @@ class Automaton:
             accepting_sccs = self.getSCCs()
             # Different behavior for Buchi and Generalized Buchi
             if type(self.accepting_states[0]) == int:
-                self.accepting_sccs_indices = [self.sccs.index(x) for x in self.sccs if not not set(x).intersection(set(self.accepting_states))]
+                accepting_states = set(self.accepting_states)
+                self.accepting_sccs_indices = [i for i, x in enumerate(self.sccs) if not accepting_states.isdisjoint(x)]
             else:
+                accepting_sccs_indices = range(len(accepting_sccs))
                 for accepting_set in self.accepting_states:
                     # Remove the sccs that have no intersection with accepting_set
-                    accepting_sccs = [x for x in accepting_sccs if not not set(x).intersection(set(accepting_set))]
-                self.accepting_sccs_indices = [self.sccs.index(x) for x in accepting_sccs]
+                    accepting_set = set(accepting_set)
+                    accepting_sccs_indices = [i for i in accepting_sccs_indices
+                                              if not accepting_set.isdisjoint(accepting_sccs[i])]
+                self.accepting_sccs_indices = list(accepting_sccs_indices)
         return self.accepting_sccs_indices
 
     def turnIntoClosure(self):
@@ -323,8 +352,8 @@ class Automaton:
             sccs_indices = self.getCoReachableSCCs()
             adjMatrix = self.getAdjacencyMatrix()
             for scc in sccs_indices:
-                submatrix = adjMatrix[np.ix_(self.sccs[scc], self.sccs[scc])]
-                maxeig = np.max(np.absolute(np.linalg.eig(submatrix)[0]))
+                submatrix = adjMatrix[self.sccs[scc], :][:, self.sccs[scc]]
+                maxeig = spectralRadius(submatrix)
                 if self.reduced:
                     # Overflow avoidance (see Notebook 2 pag. 6)
                     if maxeig == 0:
@@ -356,26 +385,18 @@ class Automaton:
 
     def getAdjacencyList(self):
         """Returns the adjacency list of the automaton (without multiplicities)"""
-        list = dict()
-        for i in range(0,self.numstates):
-            list[i] = []
-            for edge in self.edges:
-                # If edge source is i
-                if edge[0] == i:
-                    # Add edge dest to adjacent nodes of i
-                    list[i].append(edge[2])
+        list = {i: [] for i in range(0,self.numstates)}
+        for edge in self.edges:
+            # Add edge dest to adjacent nodes of edge source
+            list[edge[0]].append(edge[2])
         return list
 
     def getCoReachabilityList(self):
         """Returns the adjacency list after inverting the direction of all arcs"""
-        list = dict()
-        for i in range(0,self.numstates):
-            list[i] = []
-            for edge in self.edges:
-                # If edge source is i
-                if edge[2] == i:
-                    # Add edge dest to adjacent nodes of i
-                    list[i].append(edge[0])
+        list = {i: [] for i in range(0,self.numstates)}
+        for edge in self.edges:
+            # Add edge source to adjacent nodes of edge dest
+            list[edge[2]].append(edge[0])
         return list
 
     def getSubgraph(self, state_list):
@@ -394,10 +415,10 @@ class Automaton:
         # Also self.edges uses those ids. But in the subgraph we need to identify them progressively
         # to keep consistency. So subgraph.edges first reads the edges and then those are transformed
         # to use the new ids for the states
-        subgraph.edges = [x for x in self.edges if x[0] in state_list and x[2] in state_list]
-        for edge in subgraph.edges:
-            edge[0] = state_list.index(edge[0])
-            edge[2] = state_list.index(edge[2])
+        # The edges are copied: renumbering self.edges in place would corrupt this automaton for the next subgraph
+        new_ids = {state: i for i, state in enumerate(state_list)}
+        subgraph.edges = [[new_ids[x[0]], x[1], new_ids[x[2]], x[3]] for x in self.edges
+                          if x[0] in new_ids and x[2] in new_ids]
 
         # Any initial state will not change the Hausdorff dimension. Set it to state 0
         subgraph.init_states = [0]
@@ -407,11 +428,13 @@ class Automaton:
         # In a Buchi automaton accepting_states is just a list of states, while in a GBA it is
         # a collection of lists of states
         if self.accepting_states != [] and type(self.accepting_states[0]) == int:
-            subgraph.accepting_states = [state_list.index(x) for x in state_list if x in self.accepting_states]
+            accepting_states = set(self.accepting_states)
+            subgraph.accepting_states = [i for i, x in enumerate(state_list) if x in accepting_states]
         else:
             subgraph.accepting_states = []
             for accepting_set in self.accepting_states:
-                subgraph.accepting_states.append([state_list.index(x) for x in state_list if x in accepting_set])
+                accepting_set = set(accepting_set)
+                subgraph.accepting_states.append([i for i, x in enumerate(state_list) if x in accepting_set])
 
         return subgraph
 
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, List, Tuple
+from typing import Any, Iterator, List, Tuple
 
 from spec_repair.interfaces.ispecification import ISpecification
 from spec_repair.components.repair_data import RepairData
@@ -19,3 +19,15 @@ class ILearner(ABC):
         :return: A list of new specifications.
         """
         pass
+
+    def learn_new_iter(
+        self,
+        spec: ISpecification,
+        data: RepairData
+    ) -> Iterator[Tuple[ISpecification, Any]]:
+        """
+        As learn_new, but yields the new specifications one by one, so that
+        learners able to produce them incrementally can hand each one over as
+        soon as it is learned.
+        """
+        yield from self.learn_new(spec, data)
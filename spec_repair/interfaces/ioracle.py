@@ -12,3 +12,22 @@ class IOracle(ABC):
     @abstractmethod
     def is_realisable(new_spec: ISpecification):
         pass
+
+    @abstractmethod
+    def get_counter_strategy_count(self) -> int:
+        """
+        How many counter-strategies the oracle has found so far. The
+        counter-traces of the next one are named after this count.
+        """
+        pass
+
+    @abstractmethod
+    def set_counter_strategy_count(self, count: int):
+        pass
+
+    def close(self):
+        """
+        Releases whatever the oracle keeps between checks (e.g. synthesis JVMs).
+        Called by the orchestrator once a repair is over.
+        """
+        pass
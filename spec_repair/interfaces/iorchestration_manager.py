@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Tuple, Any, Optional
+from typing import Tuple, Any, Optional, List
 
 from spec_repair.interfaces.ispecification import ISpecification
 
@@ -28,3 +28,15 @@ class IOrchestrationManager:
     @abstractmethod
     def get_next(self) -> Tuple[ISpecification, Any]:
         pass
+
+    def get_next_batch(self, max_tasks: int) -> List[Tuple[ISpecification, Any]]:
+        """
+        Pop up to `max_tasks` tasks in the order get_next() would have returned
+        them. Used by the parallel orchestrator to hand a whole frontier to its
+        workers at once; managers that decide what comes next lazily, based on
+        results merged in between, should override this to return fewer.
+        """
+        batch = []
+        while len(batch) < max_tasks and self.has_next():
+            batch.append(self.get_next())
+        return batch
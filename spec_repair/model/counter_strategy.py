@@ -7,9 +7,9 @@ class that makes the automaton graph explicit and traversable.
 
 from __future__ import annotations
 
-from collections import defaultdict
+from collections import Counter, defaultdict
 from dataclasses import dataclass
-from typing import Iterator
+from typing import Iterator, Optional
 
 
 @dataclass
@@ -41,6 +41,40 @@ class CSTransition:
         return f"{self.source} -> {self.target} {{{fmt(self.inputs)}}} / {{{fmt(self.outputs)}}};"
 
 
+class CSPathNode:
+    """
+    A node of the trie of paths through a counter-strategy: the path from the
+    root to this node. Paths that share a prefix share its nodes, so walking
+    every path costs one node per transition taken, not a copy of the path
+    for every branch.
+    """
+    __slots__ = ("parent", "transition", "token", "depth")
+
+    def __init__(self, parent: Optional[CSPathNode], transition: Optional[CSTransition], token: str):
+        self.parent = parent
+        self.transition = transition
+        # The name of this node's state in path names (see CounterStrategy.iter_paths)
+        self.token = token
+        self.depth = 0 if parent is None else parent.depth + 1
+
+    def nodes(self) -> list[CSPathNode]:
+        """The nodes from the root down to this one."""
+        nodes = []
+        node: Optional[CSPathNode] = self
+        while node is not None:
+            nodes.append(node)
+            node = node.parent
+        nodes.reverse()
+        return nodes
+
+    def transitions(self) -> list[CSTransition]:
+        return [node.transition for node in self.nodes()[1:]]
+
+    def name(self) -> str:
+        """The tokens of the states along the path, joined by "_", e.g. ``ini_S0_DEAD``."""
+        return "_".join(node.token for node in self.nodes())
+
+
 class CounterStrategy:
     """
     A counter-strategy automaton: a finite directed graph whose paths from
@@ -100,24 +134,51 @@ class CounterStrategy:
         Each path is an ordered list of CSTransition objects; the sequence
         of states is implicit as [t.source for t in path] + [path[-1].target].
         """
-        paths: list[list[CSTransition]] = []
-        self._dfs(self.initial_state, [], [], paths)
-        return paths
+        return [leaf.transitions() for leaf in self.iter_paths()]
 
-    def _dfs(
-        self,
-        state: str,
-        current_path: list[CSTransition],
-        visited: list[str],
-        paths: list[list[CSTransition]],
-    ) -> None:
-        # Terminate: reached dead state or detected a cycle.
-        if state == self.dead_state or state in visited:
-            if current_path:                 # don't record the trivial empty path
-                paths.append(list(current_path))
+    def iter_paths(self, max_paths: Optional[int] = None, root_token: Optional[str] = None) -> Iterator[CSPathNode]:
+        """
+        Yield the last node of every path of all_paths, depth first in
+        transition order, stopping after max_paths paths if given.
+
+        A path ends on reaching `dead_state`, or on reaching a state whose
+        token is already on the path. Every state's token is its name, except
+        the initial state's, which is `root_token` when given: counter-trace
+        names start with "ini" rather than the initial state's name, so going
+        back to the initial state is only a cycle the second time round.
+
+        Iterative, with the tokens on the current path counted as it grows
+        and shrinks, so no path is copied and deep counter-strategies cannot
+        hit the recursion limit.
+        """
+        if max_paths is not None and max_paths <= 0:
+            return
+        if self.initial_state == self.dead_state:
             return
-        for t in self.transitions_from(state):
-            self._dfs(t.target, current_path + [t], visited + [state], paths)
+        root = CSPathNode(None, None, root_token if root_token is not None else self.initial_state)
+        on_path = Counter([root.token])
+        # (node, transitions out of its state, index of the next one to take)
+        stack: list[list] = [[root, self.transitions_from(self.initial_state), 0]]
+        n_paths = 0
+        while stack:
+            frame = stack[-1]
+            node, transitions, i = frame
+            if i == len(transitions):
+                stack.pop()
+                on_path[node.token] -= 1
+                continue
+            frame[2] += 1
+            t = transitions[i]
+            child = CSPathNode(node, t, t.target)
+            on_path[child.token] += 1
+            if t.target == self.dead_state or on_path[child.token] > 1:
+                yield child
+                n_paths += 1
+                if n_paths == max_paths:
+                    return
+                on_path[child.token] -= 1
+            else:
+                stack.append([child, self.transitions_from(t.target), 0])
 
     # ------------------------------------------------------------------
     # Winning condition
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 import random
 import re
-from collections import defaultdict
-from copy import deepcopy
-from typing import Optional, List, Set, Tuple, Any
+from collections import OrderedDict
+from copy import copy
+from typing import Iterator, Optional, List, Set, Tuple, Any
+
+import numpy as np
 
 from py_ltl.formula import AtomicProposition
 
+from spec_repair.config import DEADLOCK_COMPLETION_CACHE_SIZE
 from spec_repair.interfaces.ispecification import ISpecification
 from spec_repair.components.new_spec_encoder import NewSpecEncoder
 from spec_repair.enums import Learning
@@ -22,36 +26,114 @@ from spec_repair.wrappers.spectra_toolbox import run_all_unrealisable_cores
 from spec_repair.wrappers.asp_wrappers import run_clingo
 
 
+_ASP_LITERAL = re.compile(r"(not_)?holds_at\(([^,()]+),(\d+),([^,()]+)\)\.")
+
+
 class CounterTrace:
+    """
+    A counter-trace is kept as a matrix rather than as its ASP text: an atom
+    table (atoms in the order they first appear) and two boolean matrices over
+    timepoints x atoms, _known (the atom is assigned at that timepoint) and
+    _values (it holds there). _order lists the assigned cells in the order of
+    their ASP literals, so the text the trace was built from is reproduced
+    exactly.
+
+    Counter-traces are sorted, hashed and compared every time a task is
+    enqueued and its visited node looked up, so equality, hashing and ordering
+    go through a digest of the (path, matrix) content computed once, instead of
+    through the full ASP string. The ASP, ILASP and printable forms are only
+    built when asked for, once per name.
+    """
+
     def __init__(self, raw_trace: str, raw_path: str, name: Optional[str] = None):
-        self._raw_trace, self._path = raw_trace, raw_path
+        self._path = raw_path
         self._name = name if name is not None else self._path
+        states = self._path.split("_")
         self._is_deadlock = "DEAD" in self._path
+        # A path ending in a state it went through before loops back to the timepoint following that state
+        self._loop_start: Optional[int] = None
+        if not self._is_deadlock and states[-1] in states[1:-1]:
+            self._loop_start = states.index(states[-1], 1)
+        self._atoms, self._known, self._values, self._order = _parse_raw_trace(raw_trace, raw_path)
+        self._trailing_newline = raw_trace.endswith("\n")
+        self._set_digest()
+        self._forms: dict = {}
+
+    def _set_digest(self):
+        # Content in alphabetical atom order, so the atom order of the ASP text does not matter
+        columns = sorted(range(len(self._atoms)), key=self._atoms.__getitem__)
+        self._key: bytes = b"\0".join([
+            self._path.encode(), ",".join(self._atoms[i] for i in columns).encode(),
+            str(self._known.shape[0]).encode(),
+            np.packbits(self._known[:, columns]).tobytes() + np.packbits(self._values[:, columns]).tobytes()
+        ])
+        # Not hash(): it is salted per process, and the order of sorted counter-traces should not be
+        self._digest: int = int.from_bytes(hashlib.blake2b(self._key, digest_size=8).digest(), "big")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The generated forms are rebuilt on demand; no need to checkpoint them
+        state["_forms"] = {}
+        return state
 
     def is_deadlock(self) -> bool:
         return self._is_deadlock
 
+    def get_loop_start(self) -> Optional[int]:
+        """
+        The timepoint the trace loops back to after its last one, e.g. 1 for
+        ini_S0_S1_S0; None for deadlocks and paths ending without a loop.
+        """
+        return self._loop_start
+
+    def get_num_timepoints(self) -> int:
+        return self._known.shape[0]
+
     def get_name(self) -> str:
         return self._name
 
+    def set_cs_id(self, cs_id: int):
+        """
+        Renumber the counter-strategy this trace was extracted from, keeping its
+        index within that strategy: counter_strat_<old>_<k> -> counter_strat_<cs_id>_<k>.
+        Traces still named after their raw path are left untouched.
+        """
+        name = re.sub(r"^counter_strat_\d+_", f"counter_strat_{cs_id}_", self._name)
+        if name != self._name:
+            self._name = name
+            self._forms = {}
+
+    def _cached_form(self, key, build):
+        if key not in self._forms:
+            self._forms[key] = build()
+        return self._forms[key]
+
     def get_raw_trace(self, is_named=True):
-        if is_named:
-            return trace_replace_name(self._raw_trace, self._path, self._name)
-        return self._raw_trace
+        return self._cached_form(("raw", is_named), lambda: self._render_raw_trace(
+            self._name if is_named else self._path))
+
+    def _render_raw_trace(self, trace_name: str) -> str:
+        n_atoms = len(self._atoms)
+        lines = []
+        for cell in self._order.tolist():
+            timepoint, atom = divmod(cell, n_atoms)
+            suffix = "" if self._values[timepoint, atom] else "not_"
+            lines.append(f"{suffix}holds_at({self._atoms[atom]},{timepoint},{trace_name}).")
+        raw_trace = "\n".join(lines)
+        return raw_trace + "\n" if self._trailing_newline and lines else raw_trace
 
     def get_asp_form(self, is_named=True):
-        raw_asp_form = trace_list_to_asp_form([self.get_raw_trace(is_named=False)])
-        if is_named:
-            return trace_replace_name(raw_asp_form, self._path, self._name)
-        return raw_asp_form
+        def build():
+            raw_asp_form = trace_list_to_asp_form([self.get_raw_trace(is_named=False)])
+            if is_named:
+                return trace_replace_name(raw_asp_form, self._path, self._name)
+            return raw_asp_form
 
-    def get_max_timepoint(self, asp_form: str) -> int:
-        timepoints = map(int, re.findall(r"timepoint\((\d+),", asp_form))
-        return max(timepoints) if timepoints else 0
+        return self._cached_form(("asp", is_named), build)
 
     def get_asp_form_awaiting_deadlock(self):
         asp_form = self.get_asp_form()
-        max_timepoint = self.get_max_timepoint(asp_form)
+        max_timepoint = self.get_num_timepoints() - 1
         asp_form += f"\n% Extension awaiting deadlock resolution\n"
         asp_form += f"timepoint({max_timepoint + 1},{self._name}).\n"
         asp_form += f"next({max_timepoint + 1},{max_timepoint},{self._name}).\n"
@@ -64,36 +146,40 @@ class CounterTrace:
 
     def get_ilasp_form(self, learning: Learning, is_named=True):
         # TODO: remove "trace_replace_name" as a method for adding the "CS_PATH: self._path" comment to the trace
-        return trace_replace_name(trace_list_to_ilasp_form(self.get_asp_form(is_named=is_named), learning), self._path,
-                                  self._name)
+        return self._cached_form(("ilasp", learning, is_named), lambda: trace_replace_name(
+            trace_list_to_ilasp_form(self.get_asp_form(is_named=is_named), learning), self._path, self._name))
+
+    def _compare_key(self) -> Tuple[int, bytes]:
+        # Digest first: two different traces almost never get past it to the content comparison
+        return self._digest, self._key
 
     def __eq__(self, other: CounterTrace) -> bool:
         if not isinstance(other, CounterTrace):
             return False
-        return self._raw_trace == other._raw_trace
+        return self._digest == other._digest and self._key == other._key
 
     def __le__(self, other: CounterTrace) -> bool:
         if not isinstance(other, CounterTrace):
             return False
-        return self._raw_trace <= other._raw_trace
+        return self._compare_key() <= other._compare_key()
 
     def __lt__(self, other: CounterTrace) -> bool:
         if not isinstance(other, CounterTrace):
             return False
-        return self._raw_trace < other._raw_trace
+        return self._compare_key() < other._compare_key()
 
     def __ge__(self, other: CounterTrace) -> bool:
         if not isinstance(other, CounterTrace):
             return False
-        return self._raw_trace >= other._raw_trace
+        return self._compare_key() >= other._compare_key()
 
     def __gt__(self, other: CounterTrace) -> bool:
         if not isinstance(other, CounterTrace):
             return False
-        return self._raw_trace > other._raw_trace
+        return self._compare_key() > other._compare_key()
 
     def __hash__(self):
-        return hash(self._raw_trace)
+        return self._digest
 
     # TODO: Streamline this to be one-two lines maximum
     def __str__(self):
@@ -103,43 +189,65 @@ class CounterTrace:
         return self.print_one_line()
 
     def print_one_line(self) -> str:
-        output = self._simple_print_data()
-
-        # Join the time steps with a semicolon
-        result = ';'.join(output)
-        return f"CT({result})"
+        return self._cached_form("one_line", lambda: self._print(';'))
 
     def print_multi_line(self) -> str:
-        output = self._simple_print_data()
+        return self._cached_form("multi_line", lambda: self._print(';\n'))
 
-        # Join the time steps with a semicolon
-        result = ';\n'.join(output)
+    def _print(self, separator: str) -> str:
+        # Join the time steps with the separator
+        result = separator.join(self._simple_print_data())
         return f"CT({result})"
 
     def _simple_print_data(self) -> list[str]:
-        # Dictionary to store states at each time point
-        state_dict = defaultdict(dict)
-
-        for s in self.get_raw_trace().split('\n'):
-            match = re.search(r'(not_holds_at|holds_at)\((\w+),(\d+),', s)
-            if match:
-                state, atom, time = match.groups()
-                state_dict[time][atom] = '!' if 'not' in state else ''
-
-        # Sort times to maintain order
-        sorted_times = sorted(state_dict.keys())
-
-        # Construct the output strings for each time step
+        """
+        One "a,!b,..." per timepoint with atoms assigned: the atoms in
+        alphabetical order, negated ones prefixed with '!'.
+        """
+        columns = sorted(range(len(self._atoms)), key=self._atoms.__getitem__)
         output = []
-        for time in sorted_times:
-            entities = sorted(state_dict[time].keys())
-            time_output = ','.join([f"{state_dict[time][entity]}{entity}" for entity in entities])
-            output.append(time_output)
+        for known, values in zip(self._known[:, columns].tolist(), self._values[:, columns].tolist()):
+            if any(known):
+                output.append(','.join(f"{'' if value else '!'}{self._atoms[atom]}"
+                                       for atom, is_known, value in zip(columns, known, values) if is_known))
         return output
 
 
-def cts_from_cs(cs: CounterStrategy, cs_id: Optional[int] = None) -> list[CounterTrace]:
-    trace_name_dict: dict[str, str] = dict(sorted(cs_to_named_cs_traces(cs).items()))
+def _parse_raw_trace(raw_trace: str, raw_path: str) \
+        -> Tuple[Tuple[str, ...], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The atom table, known and value matrices and literal order (see
+    CounterTrace) of an ASP trace made of holds_at/not_holds_at(atom,timepoint,raw_path) facts.
+    """
+    atom_ids: dict[str, int] = {}
+    literals: list[Tuple[int, int, bool]] = []
+    for line in raw_trace.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        match = _ASP_LITERAL.fullmatch(line)
+        if not match or match.group(4) != raw_path:
+            raise ValueError(f"Not a literal of counter-trace {raw_path}: '{line}'")
+        negated, atom, timepoint, _ = match.groups()
+        literals.append((int(timepoint), atom_ids.setdefault(atom, len(atom_ids)), negated is None))
+    n_timepoints = max((timepoint for timepoint, _, _ in literals), default=-1) + 1
+    known = np.zeros((n_timepoints, len(atom_ids)), dtype=bool)
+    values = np.zeros((n_timepoints, len(atom_ids)), dtype=bool)
+    order = []
+    for timepoint, atom, value in literals:
+        cell = timepoint * len(atom_ids) + atom
+        if known[timepoint, atom]:
+            # A later literal overrides the earlier one, which is not printed again
+            order.remove(cell)
+        known[timepoint, atom] = True
+        values[timepoint, atom] = value
+        order.append(cell)
+    return tuple(atom_ids), known, values, np.array(order, dtype=np.int64)
+
+
+def cts_from_cs(cs: CounterStrategy, cs_id: Optional[int] = None, max_paths: Optional[int] = None) \
+        -> list[CounterTrace]:
+    trace_name_dict: dict[str, str] = dict(sorted(cs_to_named_cs_traces(cs, max_paths).items()))
 
     return [CounterTrace(raw_trace, raw_path, f"counter_strat_{cs_id}_{ct_id}" if cs_id is not None else None)
             for ct_id, (raw_trace, raw_path) in enumerate(trace_name_dict.items())]
@@ -149,11 +257,38 @@ def ct_from_cs(cs: CounterStrategy, heuristic: HeuristicType, cs_id: Optional[in
     return choose_one_with_heuristic(cts_from_cs(cs, cs_id), heuristic)
 
 
-def cs_to_named_cs_traces(cs: CounterStrategy) -> dict[str, str]:
-    trace_name_dict: dict[str, str] = {}
-    extract_trace(cs, "", cs.initial_state, 0, "ini", trace_name_dict)
-
-    return trace_name_dict
+def cs_to_named_cs_traces(cs: CounterStrategy, max_paths: Optional[int] = None) -> dict[str, str]:
+    """
+    ASP trace -> path name, for every path of the counter-strategy (see
+    CounterStrategy.iter_paths), or the first max_paths of them.
+    """
+    return dict(iter_named_cs_traces(cs, max_paths))
+
+
+def iter_named_cs_traces(cs: CounterStrategy, max_paths: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+    """
+    (ASP trace, path name) of each path of the counter-strategy, in the order
+    CounterStrategy.iter_paths finds them, e.g. ("holds_at(a,0,ini_S0_DEAD).\n...", "ini_S0_DEAD").
+
+    The ASP of a step only depends on the transition taken and its timepoint,
+    so it is built once per (transition, timepoint) and shared by every path
+    taking that step; each trace is then a single join.
+    """
+    step_asp: dict[Tuple[int, int], str] = {}
+    for leaf in cs.iter_paths(max_paths, root_token="ini"):
+        steps = []
+        for node in leaf.nodes()[1:]:
+            timepoint = node.depth - 1
+            key = (id(node.transition), timepoint)
+            if key not in step_asp:
+                # Inputs (environment-controlled APs) are shared across all
+                # transitions from the same source state, so it's safe to read
+                # them off the first one.
+                env = cs.transitions_from(node.transition.source)[0].inputs
+                step_asp[key] = vars_to_asp(env, timepoint) + vars_to_asp(node.transition.outputs, timepoint)
+            steps.append(step_asp[key])
+        trace_name = leaf.name()
+        yield "".join(steps).replace("trace_name", trace_name), trace_name
 
 
 def trace_replace_name(trace: str, old_name: str, new_name: str) -> str:
@@ -163,31 +298,9 @@ def trace_replace_name(trace: str, old_name: str, new_name: str) -> str:
     return trace
 
 
-# TODO: replace traces as Dict with a Set[Tuple[str,str]]
-def extract_trace(cs: CounterStrategy, output: str, state: str, timepoint: int, trace_name: str,
-                  traces: dict[str, str]) -> Optional[str]:
-    # Terminate on reaching the dead state, or on detecting a cycle (the same
-    # state appearing more than once in the path built so far).
-    if trace_name.split("_").count(state) > 1 or state == cs.dead_state:
-        return re.sub("trace_name", trace_name, output)
-    transitions = cs.transitions_from(state)
-    if not transitions:
-        return None
-    # Inputs (environment-controlled APs) are shared across all transitions
-    # from the same source state, so it's safe to read them off the first one.
-    env = transitions[0].inputs
-    output += vars_to_asp(env, timepoint)
-    for t in transitions:
-        out_copy = deepcopy(output)
-        out_copy += vars_to_asp(t.outputs, timepoint)
-        new_trace_name = trace_name + "_" + t.target
-        new_output = extract_trace(cs, out_copy, t.target, timepoint + 1, new_trace_name, traces)
-        if new_output is not None:
-            traces[new_output] = new_trace_name
-    return None
-
-
 def vars_to_asp(assignments: dict[str, bool], timepoint: int) -> str:
+    if not assignments:
+        return ""
     output = "\n".join(var_to_asp(var, value, timepoint) for var, value in assignments.items())
     output += "\n"  # TODO: consider removing this last line
     return output
@@ -207,7 +320,7 @@ def complete_ct_from_ct(ct: CounterTrace, spec: list[str], entailed_list: list[s
 
 def complete_cts_from_ct(ct: CounterTrace, spec: ISpecification, entailed_list: list[str]) -> list[CounterTrace]:
     if ct.is_deadlock() and ct.get_name() in entailed_list:
-        assignments = find_all_possible_deadlock_completion_assignments(ct, spec)
+        assignments = deadlock_completion_assignments(ct, spec)
         complete_cts = [complete_ct_with_deadlock_assignment(ct, assignment) for assignment in assignments]
         unique_complete_cts = list(dict.fromkeys(complete_cts))
         return unique_complete_cts
@@ -215,6 +328,31 @@ def complete_cts_from_ct(ct: CounterTrace, spec: ISpecification, entailed_list:
     return [ct]
 
 
+_completion_assignments: OrderedDict[Tuple[str, CounterTrace], List[List[AtomicProposition]]] = OrderedDict()
+
+
+def deadlock_completion_assignments(ct: CounterTrace, spec: ISpecification) -> List[List[AtomicProposition]]:
+    """
+    find_all_possible_deadlock_completion_assignments, remembered for the last
+    DEADLOCK_COMPLETION_CACHE_SIZE (spec, deadlock) pairs.
+
+    The same deadlock is completed again for every set of counter-traces it
+    is part of, and for every task of the same spec it is handed down to, and
+    each time costs a clingo enumeration of all the models plus an
+    unrealisable core search. Counter-traces are keyed by content, not name:
+    the assignments do not depend on the name.
+    """
+    key = (spec.to_str(), ct)
+    if key in _completion_assignments:
+        _completion_assignments.move_to_end(key)
+        return _completion_assignments[key]
+    assignments = find_all_possible_deadlock_completion_assignments(ct, spec)
+    _completion_assignments[key] = assignments
+    if len(_completion_assignments) > DEADLOCK_COMPLETION_CACHE_SIZE:
+        _completion_assignments.popitem(last=False)
+    return assignments
+
+
 # TODO: rework this to not force breakings on guarantees outside of unrealisable cores
 def find_all_possible_deadlock_completion_assignments(ct: CounterTrace, spec: ISpecification) -> List[List[AtomicProposition]]:
     asp = NewSpecEncoder.encode_ASP_deadlock_extension(spec, ct)
@@ -224,7 +362,7 @@ def find_all_possible_deadlock_completion_assignments(ct: CounterTrace, spec: IS
         raise ValueError("Not possible to complete the deadlock! There is no valid assignment that may "
                          "continue the trace. Some error must have occurred!")
     unrealisable_cores = get_unrealisable_core_expression_names(spec)
-    guarantee_names = set(spec._formulas_df.loc[spec._formulas_df["type"] == GR1FormulaType.GAR,"name"].tolist())
+    guarantee_names = set(spec.get_formula_names(GR1FormulaType.GAR))
     possible_assignments = [(atom_assignments, violated_expressions) for atom_assignments, violated_expressions in assignments if (violated_expressions.intersection(guarantee_names)).issubset(unrealisable_cores)]
     sorted_possible_assignments = sorted(possible_assignments, key=lambda x: len(x[0]))
     # TODO: introduce heuristic to enforce specific violation
@@ -291,12 +429,38 @@ def last_state(trace, prevs, offset=0):
 
 
 def complete_ct_with_deadlock_assignment(ct: CounterTrace, assignment: list[AtomicProposition]):
-    ct = deepcopy(ct)
-    last_timepoint = max(re.findall(r",(\d*),", ct._raw_trace))
-    timepoint = str(int(last_timepoint) + 1)
-    asp = [f"{'' if atom_value.value else 'not_'}holds_at({atom_value.name},{timepoint},{ct._path})." for atom_value in assignment]
-    ct._raw_trace = ct._raw_trace + '\n'.join(asp)
+    """
+    ct extended with one more timepoint, where the atoms are set as in the
+    assignment; the extended trace is no longer a deadlock.
+    """
+    atom_ids = {atom: i for i, atom in enumerate(ct._atoms)}
+    for atom_value in assignment:
+        atom_ids.setdefault(atom_value.name, len(atom_ids))
+    n_timepoints, n_atoms = ct._known.shape
+    known = np.zeros((n_timepoints + 1, len(atom_ids)), dtype=bool)
+    values = np.zeros((n_timepoints + 1, len(atom_ids)), dtype=bool)
+    known[:n_timepoints, :n_atoms] = ct._known
+    values[:n_timepoints, :n_atoms] = ct._values
+    # Cells are numbered row by row, so they move when new atoms widen the rows
+    timepoints, atoms = np.divmod(ct._order, n_atoms) if n_atoms else (ct._order, ct._order)
+    order = list(timepoints * len(atom_ids) + atoms)
+    for atom_value in assignment:
+        atom = atom_ids[atom_value.name]
+        cell = n_timepoints * len(atom_ids) + atom
+        if known[n_timepoints, atom]:
+            order.remove(cell)
+        known[n_timepoints, atom] = True
+        values[n_timepoints, atom] = atom_value.value
+        order.append(cell)
+
+    ct = copy(ct)
+    ct._atoms, ct._known, ct._values = tuple(atom_ids), known, values
+    ct._order = np.array(order, dtype=np.int64)
+    # The extension used to be appended to the ASP text without a final newline
+    ct._trailing_newline = ct._trailing_newline and not assignment
     ct._is_deadlock = False
+    ct._set_digest()
+    ct._forms = {}
     return ct
 
 
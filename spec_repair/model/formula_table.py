@@ -0,0 +1,121 @@
+"""
+Name-indexed store for the formulas of a SpectraSpecification.
+
+Specs are copied for every candidate adaptation and every entry of a repair's
+spec history, and serialised (to Spectra, ASP and spot) many times per BFS
+step, so the store is built for cheap copies and cheap iteration:
+
+- Rows live in an insertion-ordered dict keyed by formula name, so lookups,
+  replacements and clash checks are O(1) and iteration keeps the spec's order.
+- Rows are never mutated once stored; replacing a formula stores a new row.
+  A copy of the table is therefore just a copy of the dict, sharing every row
+  (and the GR1Formula in it) with the original, copy-on-write. Anything that
+  wants to change a formula in place must copy it first (see
+  SpectraSpecification.integrate).
+
+Values derived from the whole table (e.g. the spec's spot string) can be
+memoised on it with memo(); every mutation clears them.
+
+to_dataframe()/from_dataframe() convert to and from the pandas layout the
+specification used to keep its formulas in (columns name/type/when/formula).
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from spec_repair.ltl_types import GR1FormulaType, GR1TemporalType
+from spec_repair.model.gr1_formula import GR1Formula
+
+
+class FormulaRow:
+    __slots__ = ("name", "type", "when", "formula")
+    COLUMNS = ["name", "type", "when", "formula"]
+
+    def __init__(self, name: str, type: GR1FormulaType, when: GR1TemporalType, formula: GR1Formula):
+        self.name = name
+        self.type = type
+        self.when = when
+        self.formula = formula
+
+    def __getitem__(self, column: str):
+        # Lets code written against DataFrame rows (row['name']) keep working
+        return getattr(self, column)
+
+    def with_changes(self, **changes) -> FormulaRow:
+        values = {column: getattr(self, column) for column in FormulaRow.COLUMNS}
+        values.update(changes)
+        return FormulaRow(**values)
+
+    def as_tuple(self) -> tuple:
+        return self.name, self.type, self.when, self.formula
+
+    def __repr__(self):
+        return f"FormulaRow(name={self.name!r}, type={self.type}, when={self.when}, formula={self.formula!r})"
+
+
+class FormulaTable:
+    __slots__ = ("_rows", "_memo")
+
+    def __init__(self, rows: Iterable[FormulaRow] = ()):
+        self._rows: Dict[str, FormulaRow] = {row.name: row for row in rows}
+        self._memo: Dict[Hashable, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[FormulaRow]:
+        return iter(self._rows.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rows
+
+    def get(self, name: str) -> FormulaRow:
+        return self._rows[name]
+
+    def names(self) -> List[str]:
+        return list(self._rows)
+
+    def of_type(self, formula_type: Optional[GR1FormulaType]) -> Iterator[FormulaRow]:
+        """Rows of the given type, in order; every row if formula_type is None."""
+        if formula_type is None:
+            return iter(self._rows.values())
+        return (row for row in self._rows.values() if row.type == formula_type)
+
+    def memo(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def add(self, row: FormulaRow):
+        self._rows[row.name] = row
+        self._memo = {}
+
+    def replace_formula(self, name: str, formula: GR1Formula):
+        self._rows[name] = self._rows[name].with_changes(formula=formula)
+        self._memo = {}
+
+    def rename(self, old_name: str, new_name: str):
+        self._memo = {}
+        self._rows = {
+            (new_name if name == old_name else name): (row.with_changes(name=new_name) if name == old_name else row)
+            for name, row in self._rows.items()
+        }
+
+    def remove(self, name: str):
+        del self._rows[name]
+        self._memo = {}
+
+    def copy(self) -> FormulaTable:
+        new_table = FormulaTable()
+        new_table._rows = dict(self._rows)
+        new_table._memo = dict(self._memo)
+        return new_table
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame([row.as_tuple() for row in self._rows.values()], columns=FormulaRow.COLUMNS)
+
+    @staticmethod
+    def from_dataframe(df: pd.DataFrame) -> FormulaTable:
+        return FormulaTable(FormulaRow(*values) for values in df[FormulaRow.COLUMNS].itertuples(index=False, name=None))
@@ -1,14 +1,13 @@
 from copy import deepcopy
 from typing import TypeVar, Optional
 
-import spot
-
 from spec_repair.model.adaptation_learned import Adaptation
 from spec_repair.helpers.formatters.spot_formula_formatter import SpotFormulaFormatter
 from spec_repair.helpers.parsers.spectra_formula_parser import SpectraFormulaParser
 from spec_repair.ltl_types import GR1TemporalType
 from spec_repair.util.ltl_formula_util import normalize_to_pattern, disjoin_all, get_disjuncts_from_disjunction
 from spec_repair.util.formula_string_util import replace_false_true
+from spec_repair.util import spot_cache
 
 from py_ltl.parser import ILTLParser
 from py_ltl.formatter import ILTLFormatter
@@ -31,6 +30,8 @@ class GR1Formula:
         # TODO: create separate parser for ILASP output. for now use this
         self.ilasp_parser = SpectraFormulaParser()
         self.spot_formatter = SpotFormulaFormatter()
+        # Lazily computed by to_spot_str(); reset whenever the formula changes
+        self._spot_str: Optional[str] = None
 
     @staticmethod
     def from_str(formula: str, parser: ILTLParser) -> Self:
@@ -78,6 +79,7 @@ class GR1Formula:
         ltl_formula: LTLFormula = self._to_ltl_formula()
         parsed_formula = normalize_to_pattern(ltl_formula)
         self.temp_type, self.antecedent, self.consequent = GR1Formula._from_normal_ltl_formula(parsed_formula)
+        self._spot_str = None
 
     def _to_ltl_formula(self) -> LTLFormula:
         if self.antecedent is None:
@@ -112,8 +114,16 @@ class GR1Formula:
     def to_str(self, formatter: ILTLFormatter) -> str:
         return self.to_ltl_formula().format(formatter)
 
+    def to_spot_str(self) -> str:
+        """to_str(SpotFormulaFormatter()), computed once per version of the formula."""
+        # getattr: formulas unpickled from before the cache existed lack the attribute
+        if getattr(self, "_spot_str", None) is None:
+            self._spot_str = self.to_str(formatter=self.spot_formatter)
+        return self._spot_str
+
     def integrate(self, adaptation: Adaptation):
         # TODO: move this to adaptation_learned.py
+        self._spot_str = None
         match adaptation.type:
             case "antecedent_exception":
                 self._integrate_antecedent_exception(adaptation)
@@ -182,12 +192,10 @@ class GR1Formula:
         return hash((self.temp_type, str(antecedent_hash), hash(str(self.consequent))))
 
     def __eq__(self, other):
-        formula1 = spot.formula(self.to_str(formatter=self.spot_formatter))
-        formula2 = spot.formula(other.to_str(formatter=self.spot_formatter))
-        return spot.are_equivalent(formula1, formula2)
+        return spot_cache.are_equivalent(self.to_spot_str(), other.to_spot_str())
 
     def __repr__(self):
-        return self.to_str(formatter=self.spot_formatter)
+        return self.to_spot_str()
 
     @staticmethod
     def remove_temporal_operators(this_formula: LTLFormula) -> LTLFormula:
@@ -1,12 +1,10 @@
 import copy
 import re
-import subprocess
 from collections import Counter
 from copy import deepcopy
-from typing import TypedDict, Optional, TypeVar, List, Set, Any, Callable
+from typing import TypedDict, Optional, TypeVar, List, Set, Any, Callable, Iterator
 
 import pandas as pd
-import spot
 
 from spec_repair.interfaces.ispecification import ISpecification
 # from spec_repair.components.oracles.new_spec_oracle import NewSpecOracle
@@ -16,6 +14,7 @@ from spec_repair.interfaces.iheuristic_manager import IHeuristicManager
 from spec_repair.components.heuristic_managers.no_filter_heuristic_manager import NoFilterHeuristicManager
 from spec_repair.model.spectra_atom import SpectraAtom
 from spec_repair.model.gr1_formula import GR1Formula
+from spec_repair.model.formula_table import FormulaRow, FormulaTable
 from spec_repair.helpers.formatters.spectra_formula_formatter import SpectraFormulaFormatter
 from spec_repair.helpers.parsers.spectra_formula_parser import SpectraFormulaParser
 from spec_repair.helpers.formatters.spot_specification_formatter import SpotSpecificationFormatter
@@ -23,6 +22,7 @@ from spec_repair.ltl_types import GR1FormulaType, GR1TemporalType
 from spec_repair.util.file_util import read_file_lines, validate_spectra_file
 from spec_repair.util.ltl_formula_util import get_disjuncts_from_disjunction
 from spec_repair.util.formula_string_util import format_spec
+from spec_repair.util import spot_cache
 from spec_repair.helpers.weakness_measurement.weakness_user_friendly import computeWeakness, Weakness
 from spec_repair.exceptions import NameClashException
 
@@ -57,7 +57,7 @@ class SpectraSpecification(ISpecification):
 
     def __init__(self, spec_txt: str):
         spec_txt = copy.deepcopy(spec_txt)
-        self._formulas_df: pd.DataFrame = pd.DataFrame(columns=["name", "type", "when", "formula"])
+        self._formulas: FormulaTable = FormulaTable()
         self._module_name: str
         self._atoms: Set[SpectraAtom] = set()
         self._parser = SpectraFormulaParser()
@@ -89,7 +89,9 @@ class SpectraSpecification(ISpecification):
         return self
 
     def integrate(self, adaptation: Adaptation):
-        formula = self.get_formula(adaptation.formula_name)
+        # Copies of a spec share their GR1Formula objects (see FormulaTable), so
+        # the formula is copied before being changed in place.
+        formula = deepcopy(self.get_formula(adaptation.formula_name))
         print("Rule:")
         print(f'\t{formula.to_str(self._formater)}')
         print("Hypothesis:")
@@ -101,26 +103,45 @@ class SpectraSpecification(ISpecification):
         self.replace_formula(adaptation.formula_name, formula)
 
     def replace_formula(self, formula_name, formula):
-        self._formulas_df.loc[self._formulas_df["name"] == formula_name, "formula"] = formula
+        # Keeps the row's original "when", as the DataFrame-backed version did
+        if formula_name in self._formulas:
+            self._formulas.replace_formula(formula_name, formula)
 
     def get_formula(self, name: str):
         # Get formula by name
-        formula: GR1Formula = \
-            self._formulas_df.loc[self._formulas_df["name"] == name, "formula"].iloc[0]
+        formula: GR1Formula = self._formulas.get(name).formula
         return formula
 
+    def get_formula_rows(self, formula_type: Optional[GR1FormulaType] = None) -> Iterator[FormulaRow]:
+        """The spec's formulas (with name, type and when), optionally only those of one type."""
+        return self._formulas.of_type(formula_type)
+
+    def get_formula_names(self, formula_type: Optional[GR1FormulaType] = None) -> List[str]:
+        return [row.name for row in self._formulas.of_type(formula_type)]
+
+    @property
+    def _formulas_df(self) -> pd.DataFrame:
+        """
+        A DataFrame snapshot of the formulas (columns name/type/when/formula),
+        for scripts written against the old DataFrame-backed store. Changes to
+        it are not reflected in the spec unless it is assigned back.
+        """
+        return self._formulas.to_dataframe()
+
+    @_formulas_df.setter
+    def _formulas_df(self, df: pd.DataFrame):
+        self._formulas = FormulaTable.from_dataframe(df)
+
 # TODO: make it count the amount of conjunctions with different temporal operators (max=3/disjunct)
     def get_max_disjuncts_in_antecedent(self) -> int:
         """
         Get the maximum number of conjunctions in the antecedent of any formula.
         """
         max_disjuncts = 0
-        for _, row in self._formulas_df.iterrows():
-            if row['type'] == GR1FormulaType.ASM:
-                formula = row.formula
-                antecedent = formula.antecedent
-                disjuncts = get_disjuncts_from_disjunction(antecedent)
-                max_disjuncts = max(max_disjuncts, len(disjuncts))
+        for row in self._formulas.of_type(GR1FormulaType.ASM):
+            antecedent = row.formula.antecedent
+            disjuncts = get_disjuncts_from_disjunction(antecedent)
+            max_disjuncts = max(max_disjuncts, len(disjuncts))
         return max_disjuncts
 
     @staticmethod
@@ -152,34 +173,42 @@ class SpectraSpecification(ISpecification):
         if learning_names is None:
             learning_names = []
         formulas_str = ""
-        for _, row in self._formulas_df.iterrows():
+        for row in self._formulas:
             formulas_str += self._formula_to_asp_str(row, learning_names, for_clingo, hm)
             formulas_str += "\n\n"
         return formulas_str
 
-    def _formula_to_asp_str(self, row, learning_names, for_clingo, hm: IHeuristicManager):
-        if row.when == GR1TemporalType.JUSTICE and row['name'] not in learning_names and not for_clingo:
+    def _formula_to_asp_str(self, row: FormulaRow, learning_names, for_clingo, hm: IHeuristicManager):
+        if row.when == GR1TemporalType.JUSTICE and row.name not in learning_names and not for_clingo:
             return ""
         formula: GR1Formula = row.formula
-        expression_string = f"%{row.type.to_asp()} -- {row['name']}\n"
+        expression_string = f"%{row.type.to_asp()} -- {row.name}\n"
         expression_string += f"%\t{formula.to_str(self._formater)}\n\n"
-        expression_string += f"{row.type.to_asp()}({row['name']}).\n\n"
-        is_exception = (row['name'] in learning_names) and not for_clingo
+        expression_string += f"{row.type.to_asp()}({row.name}).\n\n"
+        is_exception = (row.name in learning_names) and not for_clingo
         ant_exception = is_exception and hm.is_enabled("ANTECEDENT_WEAKENING")
         gar_exception = is_exception and hm.is_enabled("CONSEQUENT_WEAKENING")
         ev_exception = is_exception and hm.is_enabled("INVARIANT_TO_RESPONSE_WEAKENING")
         self._asp_formatter.is_antecedent_exception = ant_exception
         self._asp_formatter.is_consequent_exception = gar_exception
         self._asp_formatter.is_eventually_exception = ev_exception
-        expression_string += row.formula.to_str(self._asp_formatter).replace("{name}", row['name'])
+        expression_string += row.formula.to_str(self._asp_formatter).replace("{name}", row.name)
         return expression_string
 
     def filter(self, func: Callable[[pd.DataFrame], bool]) -> pd.DataFrame:
-        return self._formulas_df.loc[func(self._formulas_df)]
+        df = self._formulas_df
+        return df.loc[func(df)]
 
     def extract_sub_specification(self, func: Callable[[pd.DataFrame], bool]) -> Any:
         sub_spec = deepcopy(self)
-        sub_spec._formulas_df = deepcopy(self.filter(func))
+        selected_names = set(self.filter(func)["name"])
+        sub_spec._formulas = FormulaTable(row for row in self._formulas if row.name in selected_names)
+        return sub_spec
+
+    def extract_sub_specification_of_type(self, formula_type: GR1FormulaType) -> Self:
+        """extract_sub_specification(lambda x: x['type'] == formula_type), without the DataFrame round trip."""
+        sub_spec = deepcopy(self)
+        sub_spec._formulas = FormulaTable(self._formulas.of_type(formula_type))
         return sub_spec
 
     def __str__(self):
@@ -199,9 +228,9 @@ class SpectraSpecification(ISpecification):
 
         self._formater.is_response_pattern = is_to_compile
 
-        for _, row in self._formulas_df.iterrows():
-            spec_str += f"{row['type'].to_str()} -- {row['name']}\n"
-            spec_str += f"\t{row['formula'].to_str(self._formater)};\n\n"
+        for row in self._formulas:
+            spec_str += f"{row.type.to_str()} -- {row.name}\n"
+            spec_str += f"\t{row.formula.to_str(self._formater)};\n\n"
 
         if is_to_compile and "pRespondsToS" in spec_str:
             spec_str += self._response_pattern
@@ -211,18 +240,22 @@ class SpectraSpecification(ISpecification):
     def __deepcopy__(self, memo):
         new_spec = SpectraSpecification("")
         new_spec._module_name = self._module_name
-        new_spec._formulas_df = self._formulas_df.copy(deep=True)
-        for col in new_spec._formulas_df.columns:
-            if new_spec._formulas_df[col].dtype == 'O':  # Object dtype means it might contain class instances
-                new_spec._formulas_df[col] = new_spec._formulas_df[col].apply(lambda x: deepcopy(x, memo))
+        # Formulas are shared copy-on-write rather than deep-copied
+        new_spec._formulas = self._formulas.copy()
         new_spec._atoms = deepcopy(self._atoms, memo)
         return new_spec
 
+    def __setstate__(self, state):
+        # Specs pickled before the formula table replaced the DataFrame
+        if "_formulas_df" in state:
+            state["_formulas"] = FormulaTable.from_dataframe(state.pop("_formulas_df"))
+        self.__dict__.update(state)
+
     def __hash__(self) -> int:
         """
         Generate a hash for the specification based on its module name and formulas.
         """
-        return hash((self._module_name, tuple(self._formulas_df.itertuples(index=False, name=None))))
+        return hash((self._module_name, tuple(row.as_tuple() for row in self._formulas)))
 
     def __eq__(self, other) -> bool:
         return (self.equivalent_to(other, GR1FormulaType.ASM)
@@ -263,23 +296,29 @@ class SpectraSpecification(ISpecification):
     def is_trivial_false(self, formula_type: Optional[GR1FormulaType]=None) -> bool:
         return self.is_equivalent_to_spot("G(false)", formula_type)
 
+    def to_spot_str(self, formula_type: Optional[GR1FormulaType] = None) -> str:
+        """
+        to_formatted_string(SpotSpecificationFormatter(formula_type)), memoised
+        until the spec's formulas change.
+        """
+        return self._formulas.memo(
+            ("spot", formula_type),
+            lambda: self.to_formatted_string(SpotSpecificationFormatter(formula_type))
+        )
+
     def equivalent_to(self, other, formula_type: Optional[GR1FormulaType] = None) -> bool:
-        f1 = spot.formula(self.to_formatted_string(SpotSpecificationFormatter(formula_type)))
-        f2 = spot.formula(other.to_formatted_string(SpotSpecificationFormatter(formula_type)))
-        return spot.are_equivalent(f1, f2)
+        return spot_cache.are_equivalent(self.to_spot_str(formula_type), other.to_spot_str(formula_type))
 
     def implies(self, other, formula_type: Optional[GR1FormulaType] = None) -> bool:
-        f1 = self.to_formatted_string(SpotSpecificationFormatter(formula_type))
-        f2 = other.to_formatted_string(SpotSpecificationFormatter(formula_type))
+        f1 = self.to_spot_str(formula_type)
+        f2 = other.to_spot_str(formula_type)
         return does_left_imply_right(f1, f2)
 
     def implied_by(self, other, formula_type: Optional[GR1FormulaType] = None) -> bool:
         return other.implies(self, formula_type)
 
     def is_equivalent_to_spot(self, formula: str, formula_type: Optional[GR1FormulaType]):
-        f1 = spot.formula(self.to_formatted_string(SpotSpecificationFormatter(formula_type)))
-        f2 = spot.formula(formula)
-        return spot.are_equivalent(f1, f2)
+        return spot_cache.are_equivalent(self.to_spot_str(formula_type), formula)
 
     def get_weakness(self, type: GR1FormulaType = GR1FormulaType.ASM) -> Weakness:
         """
@@ -307,40 +346,32 @@ class SpectraSpecification(ISpecification):
     def add_formula(self, new_formula: GR1Formula, name: str, formula_type: GR1FormulaType):
         when: GR1TemporalType = new_formula.temp_type
         # Check if a formula with the same name, type, and when already exists
-        existing = self._formulas_df[
-            (self._formulas_df['name'] == name)
-            ]
-
-        if not existing.empty:
+        if name in self._formulas:
             raise NameClashException(
                 f"Formula with name '{name}', type '{formula_type}', and temporal type '{when}' already exists"
             )
 
-        new_row = pd.DataFrame([[name, formula_type, when, new_formula]], columns=["name", "type", "when", "formula"])
-        self._formulas_df = pd.concat([self._formulas_df, new_row], ignore_index=True)
+        self._formulas.add(FormulaRow(name, formula_type, when, new_formula))
 
     def rename_formula(self, old_name: str, new_name: str):
         # Check if old_name exists
-        existing_old = self._formulas_df[self._formulas_df['name'] == old_name]
-        if existing_old.empty:
+        if old_name not in self._formulas:
             raise ValueError(f"Formula with name '{old_name}' does not exist")
 
         # Check if new_name would create a clash
-        existing_new = self._formulas_df[self._formulas_df['name'] == new_name]
-        if not existing_new.empty:
+        if new_name in self._formulas:
             raise NameClashException(f"Formula with name '{new_name}' already exists")
 
         # Update the name
-        self._formulas_df.loc[self._formulas_df['name'] == old_name, 'name'] = new_name
+        self._formulas.rename(old_name, new_name)
 
     def remove_formula(self, name: str):
         # Check if formula exists
-        existing = self._formulas_df[self._formulas_df['name'] == name]
-        if existing.empty:
+        if name not in self._formulas:
             raise ValueError(f"Formula with name '{name}' does not exist")
 
         # Remove the formula
-        self._formulas_df = self._formulas_df[self._formulas_df['name'] != name].reset_index(drop=True)
+        self._formulas.remove(name)
 
     def merge(self, other: Self) -> Self:
         """
@@ -364,10 +395,10 @@ class SpectraSpecification(ISpecification):
 
         # Collect all existing names from both specifications for clash detection
         all_existing_names: Set[str] = set()
-        for _, row in merged_spec._formulas_df.iterrows():
-            all_existing_names.add(row['name'])
-        for _, row in other._formulas_df.iterrows():
-            all_existing_names.add(row['name'])
+        for row in merged_spec._formulas:
+            all_existing_names.add(row.name)
+        for row in other._formulas:
+            all_existing_names.add(row.name)
 
 
         # Helper function to generate unique name
@@ -381,11 +412,11 @@ class SpectraSpecification(ISpecification):
 
 
         # Collect formulas from the current specification
-        for _, row in merged_spec._formulas_df.iterrows():
-            name: str = row['name']
+        for row in merged_spec._formulas:
+            name: str = row.name
             if name not in name_to_formulas:
                 name_to_formulas[name] = []
-            name_to_formulas[name].append((row['formula'], row['type'], row['when'], 'self'))
+            name_to_formulas[name].append((row.formula, row.type, row.when, 'self'))
 
         # Helper function to check if equivalent formula already exists
         def has_equivalent_formula(target_formula: GR1Formula, target_type: GR1FormulaType) -> bool:
@@ -396,11 +427,11 @@ class SpectraSpecification(ISpecification):
             return False
 
         # Process formulas from the other specification
-        for _, row in other._formulas_df.iterrows():
-            name = row['name']
-            formula = row['formula']
-            formula_type = row['type']
-            when = row['when']
+        for row in other._formulas:
+            name = row.name
+            formula = row.formula
+            formula_type = row.type
+            when = row.when
 
             # Skip if an equivalent formula with the same type already exists
             if has_equivalent_formula(formula, formula_type):
@@ -424,22 +455,18 @@ class SpectraSpecification(ISpecification):
                     name_to_formulas[name].append((formula, formula_type, when, 'other'))
 
         # Rebuild the specification with renamed formulas where needed
-        merged_spec._formulas_df = pd.DataFrame(columns=["name", "type", "when", "formula"])
+        merged_spec._formulas = FormulaTable()
 
         for base_name, formulas_list in name_to_formulas.items():
             if len(formulas_list) == 1:
                 # No clash, use original name
                 formula, formula_type, when, _ = formulas_list[0]
-                new_row = pd.DataFrame([[base_name, formula_type, when, formula]],
-                                       columns=["name", "type", "when", "formula"])
-                merged_spec._formulas_df = pd.concat([merged_spec._formulas_df, new_row], ignore_index=True)
+                merged_spec._formulas.add(FormulaRow(base_name, formula_type, when, formula))
             else:
                 # Multiple formulas with same name, rename with counter
                 for idx, (formula, formula_type, when, _) in enumerate(formulas_list):
                     new_name = generate_unique_name(base_name, idx)
-                    new_row = pd.DataFrame([[new_name, formula_type, when, formula]],
-                                                   columns=["name", "type", "when", "formula"])
-                    merged_spec._formulas_df = pd.concat([merged_spec._formulas_df, new_row], ignore_index=True)
+                    merged_spec._formulas.add(FormulaRow(new_name, formula_type, when, formula))
 
         # Merge atoms from both specifications
         merged_spec._atoms = self._atoms.union(other._atoms)
@@ -449,14 +476,5 @@ class SpectraSpecification(ISpecification):
 
 def does_left_imply_right(left_exp: str, right_exp: str) -> bool:
     # TODO: introduce an assertion against ltl_ops which do not exist yet
-    linux_cmd = ["ltlfilt", "-c", "-f", f"{left_exp}", "--imply", f"{right_exp}"]
-    p = subprocess.Popen(linux_cmd, stdout=subprocess.PIPE, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
-    output: str = p.communicate()[0].decode('utf-8')
-    reg = re.search(r"([01])\n", output)
-    if not reg:
-        raise Exception(
-            f"The output of ltlfilt is unexpected, ergo error occurred during the comparison of:\n{left_exp}\nand\n{right_exp}",
-        )
-    result = reg.group(1)
-    return result == "1"
+    return spot_cache.implies(left_exp, right_exp)
 
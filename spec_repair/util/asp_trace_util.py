@@ -10,6 +10,7 @@ from spec_repair.util.formula_string_util import remove_multiple_newlines, extra
     strip_vars
 from spec_repair.util.patterns import PRS_REG
 from spec_repair.util.subprocess_util import create_cmd, run_subprocess
+from spec_repair.wrappers.clingo_api import is_clingo_api_enabled, solve_clingo_program
 
 
 def pRespondsToS_substitution(output_filename):
@@ -528,5 +529,7 @@ def aspify(expressions):
 
 
 def run_clingo_raw(filename, n_models: int = 1) -> str:
+    if is_clingo_api_enabled():
+        return solve_clingo_program(filename=filename, n_models=n_models)
     cmd = create_cmd(['clingo', f'--models={n_models}', filename])
     return run_subprocess(cmd)
@@ -0,0 +1,222 @@
+"""
+Content-addressed on-disk cache for results of the external tools (Spectra,
+clingo, ILASP) that are expensive to recompute but fully determined by their
+input text and flags.
+
+Entries live in one SQLite file per cache. SQLite already gives us what a
+shared cache needs across the test suite, repeated experiment runs and the
+parallel orchestrator's worker processes: atomic writes, readers that never
+see a half-written entry, and a single lock for concurrent writers (WAL mode,
+with a busy timeout rather than failing on contention). The total size of the
+stored values is bounded by evicting the least recently read entries first.
+
+Values are pickled, so anything picklable can be cached. Keys are arbitrary
+strings; use make_key() to derive one from the inputs of a computation.
+Entries can be given a time to live (e.g. a recorded tool timeout, which a
+faster machine or a later run might not hit); expired entries read as missing.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from spec_repair import config
+from spec_repair.config import DEFAULT_CACHE_DIR, DISK_CACHE_MAX_BYTES
+from spec_repair.util.file_util import FilePath
+
+_MISSING = object()
+
+
+def make_key(*parts: Any) -> str:
+    """Hash the parts of a computation's input into a fixed-size key."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        # Length-prefixed, so that ("ab", "c") and ("a", "bc") differ
+        encoded = str(part).encode("utf-8")
+        hasher.update(f"{len(encoded)}:".encode("utf-8"))
+        hasher.update(encoded)
+    return hasher.hexdigest()
+
+
+def file_identity(path: FilePath) -> str:
+    """
+    Cheap stand-in for the version of a tool binary/jar: results cached
+    against one build of a tool must not be served for another.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return f"{path}:missing"
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class DiskCache:
+    def __init__(self, path: FilePath, max_bytes: int = DISK_CACHE_MAX_BYTES):
+        self._path = path
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def path(self) -> FilePath:
+        return self._path
+
+    def __getstate__(self):
+        # Connections cannot cross process boundaries; the copy reconnects lazily.
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        state["_conn"] = None
+        state["_conn_pid"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._conn_pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=60, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL, "
+                "expires_at REAL)"
+            )
+            # Cache files created before entries could expire lack the column
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            if "expires_at" not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN expires_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access)")
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            if row is not None and row[1] is not None and row[1] <= now:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return default
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return pickle.loads(row[0])
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT 1 FROM entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+            ).fetchone()
+        return row is not None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store value under key, for ttl seconds if given, otherwise until evicted."""
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self._max_bytes:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, last_access, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, len(blob), now, None if ttl is None else now + ttl)
+                )
+                self._evict(conn, self._max_bytes)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _evict(conn: sqlite3.Connection, max_bytes: int):
+        conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0] - max_bytes
+        if excess <= 0:
+            return
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+    def get_or_compute(self, key: str, compute, should_store=lambda value: True) -> Any:
+        """
+        Return the cached value for `key`, or compute and store it.
+        `should_store` lets callers keep failures (e.g. tool errors) out of the cache.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        if should_store(value):
+            self.set(key, value)
+        return value
+
+    def delete(self, key: str):
+        with self._lock:
+            self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._connection().execute("DELETE FROM entries")
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self), "bytes": self.size_bytes()}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn, self._conn_pid = None, None
+
+
+_named_caches: Dict[str, DiskCache] = {}
+
+
+def get_disk_cache(name: str) -> Optional[DiskCache]:
+    """
+    The process-wide cache stored as `{CACHE_DIR}/{name}.sqlite`, or None when
+    disk caching is switched off (the default; see enable_disk_cache).
+    """
+    if not config.DISK_CACHE_ENABLED:
+        return None
+    if name not in _named_caches:
+        _named_caches[name] = DiskCache(os.path.join(config.CACHE_DIR, f"{name}.sqlite"))
+    return _named_caches[name]
+
+
+def enable_disk_cache(cache_dir: FilePath = DEFAULT_CACHE_DIR):
+    """
+    Cache tool results in cache_dir from now on, in this process and in the
+    processes it starts (e.g. the parallel orchestrator's workers), which read
+    the directory from SPEC_REPAIR_CACHE_DIR.
+    """
+    config.CACHE_DIR = cache_dir
+    config.DISK_CACHE_ENABLED = True
+    os.environ["SPEC_REPAIR_CACHE_DIR"] = cache_dir
+    _named_caches.clear()
@@ -1,15 +1,22 @@
+import gzip
 import os
+import pickle
 import random
 import re
 import string
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 # Custom type definitions
 Log = str
 ASPTrace = str
 FilePath = str
 
+# Directory every generate_temp_filename() call writes into. Process-wide on
+# purpose: the parallel orchestrator gives each worker process its own
+# directory, so concurrent workers never share (or clean up) each other's files.
+_temp_dir: FilePath = '/tmp'
+
 
 def validate_spectra_file(file_path: str) -> None:
     path = Path(file_path)
@@ -52,6 +59,24 @@ def write_to_file(filename: FilePath, content: str):
         file.write(content)
 
 
+def write_pickle_atomically(file_path: FilePath, obj: Any) -> None:
+    """
+    Pickles obj, gzipped, to file_path. Written aside and renamed into place, so
+    that a crash part-way through leaves the previous file intact.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    with gzip.open(temp_path, "wb", compresslevel=6) as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, file_path)
+
+
+def read_pickle(file_path: FilePath) -> Any:
+    """Reads back what write_pickle_atomically wrote."""
+    with gzip.open(file_path, "rb") as f:
+        return pickle.load(f)
+
+
 def read_file(file_path: FilePath) -> str:
     with open(file_path, 'r') as file:
         file_content: str = file.read()
@@ -86,10 +111,21 @@ def generate_filename(spectra_file, replacement, output=False):
     return spectra_file.replace(".spectra", replacement)
 
 
+def set_temp_dir(temp_dir: FilePath) -> None:
+    """Redirect all subsequent generate_temp_filename() calls in this process to `temp_dir`."""
+    global _temp_dir
+    os.makedirs(temp_dir, exist_ok=True)
+    _temp_dir = temp_dir
+
+
+def get_temp_dir() -> FilePath:
+    return _temp_dir
+
+
 def generate_temp_filename(ext):
     assert is_file_extension(ext)
     random_name = generate_random_string(length=10)
-    temp_path = os.path.join('/tmp', f"{random_name}{ext}")
+    temp_path = os.path.join(_temp_dir, f"{random_name}{ext}")
     return temp_path
 
 
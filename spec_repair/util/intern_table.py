@@ -0,0 +1,72 @@
+"""
+Interning of the objects annotating a search graph.
+
+The orchestration managers used to annotate every node and edge of their
+search graph with strings: the full text of a spec, multi-line printouts of
+counter-traces, adaptation strings. The same spec is typically both a node and
+the failed_spec of several edges, and every node of an assumption weakening
+branch prints all the counter-traces of its ancestors again, so on big runs
+the annotations were the largest part of the search state, and producing them
+a good part of the bookkeeping time.
+
+An InternTable keeps each value once and hands out a small int id for it, so
+the graph only holds ids. Specs are interned as their text, which is short
+next to the spec objects and fixed when the spec joins the graph; counter-traces
+are kept as they are, and only printed when the graph is exported.
+"""
+from typing import Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class InternTable(Generic[T]):
+    def __init__(self, key: Optional[Callable[[T], Hashable]] = None):
+        """
+        :param key: what makes two values the same; the value itself by default.
+            Values whose equality is expensive or not meaningful (e.g. lists of
+            adaptations) can be interned by identity with key=id: the table
+            keeps each value alive, so its id is never reused for another one.
+        """
+        self._key = key
+        self._values: List[T] = []
+        self._ids: Dict[Hashable, int] = {}
+
+    def intern(self, value: T) -> int:
+        key = value if self._key is None else self._key(value)
+        value_id = self._ids.get(key)
+        if value_id is None:
+            value_id = len(self._values)
+            self._ids[key] = value_id
+            self._values.append(value)
+        return value_id
+
+    def __getitem__(self, value_id: int) -> T:
+        return self._values[value_id]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def render(self, render: Callable[[T], str]) -> Callable[[int], str]:
+        """
+        id -> render(value), rendering each value at most once for as long as
+        the returned function is in use (e.g. during one export).
+        """
+        rendered: Dict[int, str] = {}
+
+        def render_id(value_id: int) -> str:
+            if value_id not in rendered:
+                rendered[value_id] = render(self._values[value_id])
+            return rendered[value_id]
+
+        return render_id
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Keys like id() do not survive pickling; they are rebuilt on unpickling
+        del state["_ids"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._ids = {value if self._key is None else self._key(value): value_id
+                     for value_id, value in enumerate(self._values)}
@@ -0,0 +1,199 @@
+"""
+Semantic index for deduplicating specifications without a linear scan.
+
+Two specifications are the same repair candidate when their assumptions are
+equivalent and their guarantees are equivalent (SpectraSpecification.__eq__).
+Deciding that takes a spot equivalence check per formula type, so comparing a
+new spec against every spec seen so far costs O(n) spot calls per insertion and
+O(n^2) over a search.
+
+The index first buckets specs by a cheap semantic fingerprint, and only runs
+the exact check against specs in the same bucket. The fingerprint has to agree
+on equivalent specs, so it is built from what a formula means rather than how
+it is written: which of a fixed set of pseudo-random ultimately periodic
+("lasso") words the assumptions and the guarantees each accept. Equivalent
+formulas accept exactly the same words, so they always land in the same bucket;
+formulas that differ on one of the sample words never get compared.
+
+Within a bucket, identical spot strings are matched without calling spot at
+all, which covers the most common duplicate (the same spec reached twice).
+"""
+import hashlib
+from functools import lru_cache
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+import spot
+
+from spec_repair.config import SPOT_CACHE_SIZE
+from spec_repair.ltl_types import GR1FormulaType
+from spec_repair.util import spot_cache
+
+V = TypeVar("V")
+
+# (prefix length, loop length, probability of an atom holding) of each sample
+# word. Short loops with a spread of densities give GR(1) invariants, which fail
+# on almost any long random word, a real chance of being satisfied.
+_SAMPLE_WORD_SHAPES: List[Tuple[int, int, float]] = [
+    (prefix, loop, bias)
+    for bias in (0.1, 0.3, 0.5, 0.7, 0.9)
+    for prefix, loop in ((0, 1), (1, 1), (0, 2), (1, 2), (2, 3), (0, 4))
+] + [(0, 1, 0.0), (0, 1, 1.0)]
+
+
+class LassoWord:
+    """An infinite word prefix.loop^omega, with atom values derived by hashing."""
+
+    def __init__(self, seed: int, prefix: int, loop: int, bias: float):
+        self.seed = seed
+        self.length = prefix + loop
+        self.bias = bias
+        # Position after the last one wraps round to the start of the loop
+        self.successor: List[int] = list(range(1, self.length)) + [prefix]
+
+    def atom_holds(self, atom: str, position: int) -> bool:
+        # Not Python's hash(): fingerprints must not depend on PYTHONHASHSEED,
+        # so that indexes built in different processes agree.
+        digest = hashlib.blake2b(f"{self.seed}:{position}:{atom}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") < self.bias * 2 ** 64
+
+
+SAMPLE_WORDS: List[LassoWord] = [
+    LassoWord(seed, prefix, loop, bias)
+    for seed, (prefix, loop, bias) in enumerate(_SAMPLE_WORD_SHAPES)
+]
+
+
+def _fixpoint(word: LassoWord, step: Callable[[int, List[bool]], bool], greatest: bool) -> List[bool]:
+    values = [greatest] * word.length
+    changed = True
+    while changed:
+        changed = False
+        for i in reversed(range(word.length)):
+            value = step(i, values)
+            if value != values[i]:
+                values[i] = value
+                changed = True
+    return values
+
+
+def _holds(f: spot.formula, word: LassoWord) -> List[bool]:
+    """Whether f holds at each position of the word."""
+    kind = f.kindstr()
+    n = word.length
+    if kind == "tt":
+        return [True] * n
+    if kind == "ff":
+        return [False] * n
+    if kind == "ap":
+        return [word.atom_holds(f.ap_name(), i) for i in range(n)]
+    children = [_holds(f[i], word) for i in range(f.size())]
+    if kind == "Not":
+        return [not v for v in children[0]]
+    if kind == "And":
+        return [all(c[i] for c in children) for i in range(n)]
+    if kind == "Or":
+        return [any(c[i] for c in children) for i in range(n)]
+    if kind in ("X", "strong_X"):
+        return [children[0][word.successor[i]] for i in range(n)]
+    if kind == "F":
+        a = children[0]
+        return _fixpoint(word, lambda i, v: a[i] or v[word.successor[i]], greatest=False)
+    if kind == "G":
+        a = children[0]
+        return _fixpoint(word, lambda i, v: a[i] and v[word.successor[i]], greatest=True)
+    a, b = children
+    if kind == "Implies":
+        return [not a[i] or b[i] for i in range(n)]
+    if kind == "Equiv":
+        return [a[i] == b[i] for i in range(n)]
+    if kind == "Xor":
+        return [a[i] != b[i] for i in range(n)]
+    if kind == "U":
+        return _fixpoint(word, lambda i, v: b[i] or (a[i] and v[word.successor[i]]), greatest=False)
+    if kind == "W":
+        return _fixpoint(word, lambda i, v: b[i] or (a[i] and v[word.successor[i]]), greatest=True)
+    if kind == "R":
+        return _fixpoint(word, lambda i, v: b[i] and (a[i] or v[word.successor[i]]), greatest=True)
+    if kind == "M":
+        return _fixpoint(word, lambda i, v: b[i] and (a[i] or v[word.successor[i]]), greatest=False)
+    raise ValueError(f"Unsupported LTL operator in semantic fingerprint: {kind}")
+
+
+@lru_cache(maxsize=SPOT_CACHE_SIZE)
+def formula_fingerprint(formula: str) -> int:
+    """Bitmask of the sample words the (spot syntax) formula accepts."""
+    f = spot_cache.get_formula(formula)
+    mask = 0
+    for i, word in enumerate(SAMPLE_WORDS):
+        if _holds(f, word)[0]:
+            mask |= 1 << i
+    return mask
+
+
+def _freeze(obj) -> Hashable:
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(item) for item in obj)
+    return obj
+
+
+class _Entry(Generic[V]):
+    __slots__ = ("asm", "gar", "extra", "value")
+
+    def __init__(self, asm: str, gar: str, extra: Hashable, value: V):
+        self.asm = asm
+        self.gar = gar
+        self.extra = extra
+        self.value = value
+
+
+class SemanticSpecIndex(Generic[V]):
+    """
+    Maps specifications, up to SpectraSpecification.__eq__, to values.
+
+    `extra` is an optional key that must also match exactly (e.g. the counter
+    traces and learning type of an orchestration task); lists in it are
+    compared element-wise, as they would be with ==.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[Hashable, List[_Entry[V]]] = {}
+        self._size = 0
+
+    @staticmethod
+    def _describe(spec, extra) -> Tuple[Hashable, str, str, Hashable]:
+        asm = spec.to_spot_str(GR1FormulaType.ASM)
+        gar = spec.to_spot_str(GR1FormulaType.GAR)
+        extra = _freeze(extra)
+        return (extra, formula_fingerprint(asm), formula_fingerprint(gar)), asm, gar, extra
+
+    def _find(self, bucket: List[_Entry[V]], asm: str, gar: str, extra: Hashable) -> Optional[_Entry[V]]:
+        for entry in bucket:
+            if entry.extra == extra and spot_cache.are_equivalent(entry.asm, asm) \
+                    and spot_cache.are_equivalent(entry.gar, gar):
+                return entry
+        return None
+
+    def get(self, spec, extra=None) -> Optional[V]:
+        key, asm, gar, extra = self._describe(spec, extra)
+        entry = self._find(self._buckets.get(key, []), asm, gar, extra)
+        return entry.value if entry else None
+
+    def setdefault(self, spec, value: V, extra=None) -> V:
+        """
+        Value of the entry equivalent to spec (with the same extra), if there is
+        one; otherwise records spec with value and returns value.
+        """
+        key, asm, gar, extra = self._describe(spec, extra)
+        bucket = self._buckets.setdefault(key, [])
+        entry = self._find(bucket, asm, gar, extra)
+        if entry:
+            return entry.value
+        bucket.append(_Entry(asm, gar, extra, value))
+        self._size += 1
+        return value
+
+    def bucket_sizes(self) -> List[int]:
+        return [len(bucket) for bucket in self._buckets.values()]
+
+    def __len__(self) -> int:
+        return self._size
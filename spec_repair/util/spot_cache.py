@@ -0,0 +1,81 @@
+"""
+Process-wide caches for spot formulas, their automata and equivalence checks.
+
+Checking two LTL formulas for equivalence (or implication) means parsing them,
+translating each and its negation into an automaton, and intersecting the
+automata. Merging and filtering candidate specs compares the same handful of
+specs pairwise hundreds of times, redoing all of that each time, so every step
+is cached here by formula string:
+
+- parsed formulas and translated automata (of a formula and of its negation)
+  in bounded LRU caches, so a formula that keeps coming back is translated once;
+- the verdict of each equivalence/implication check, so repeating a comparison
+  is a dictionary lookup.
+
+implies_many()/implied_by_many() compare one formula against many, looking its
+automaton up once; they are what maximality filtering over many specs uses.
+
+Only strings are ever cached on specs and formulas themselves (see
+GR1Formula.to_spot_str): spot objects cannot be pickled, and specs are pickled
+to cross process boundaries (e.g. ParallelBFSRepairOrchestrator).
+"""
+from functools import lru_cache
+from typing import Iterable, List
+
+import spot
+
+from spec_repair.config import SPOT_CACHE_SIZE
+
+
+@lru_cache(maxsize=SPOT_CACHE_SIZE)
+def get_formula(formula: str) -> spot.formula:
+    return spot.formula(formula)
+
+
+@lru_cache(maxsize=SPOT_CACHE_SIZE)
+def get_automaton(formula: str) -> "spot.twa_graph":
+    return spot.translate(get_formula(formula))
+
+
+@lru_cache(maxsize=SPOT_CACHE_SIZE)
+def get_negated_automaton(formula: str) -> "spot.twa_graph":
+    return spot.translate(spot.formula.Not(get_formula(formula)))
+
+
+@lru_cache(maxsize=SPOT_CACHE_SIZE)
+def implies(left: str, right: str) -> bool:
+    """Whether every word satisfying left satisfies right."""
+    if left == right:
+        return True
+    return not get_automaton(left).intersects(get_negated_automaton(right))
+
+
+def implies_many(left: str, rights: Iterable[str]) -> List[bool]:
+    """[implies(left, right) for right in rights], translating left only once."""
+    left_automaton = get_automaton(left)
+    return [right == left or not left_automaton.intersects(get_negated_automaton(right)) for right in rights]
+
+
+def implied_by_many(lefts: Iterable[str], right: str) -> List[bool]:
+    """[implies(left, right) for left in lefts], translating right only once."""
+    negated_right_automaton = get_negated_automaton(right)
+    return [left == right or not get_automaton(left).intersects(negated_right_automaton) for left in lefts]
+
+
+def are_equivalent(left: str, right: str) -> bool:
+    if left == right:
+        return True
+    # Order the pair so (a, b) and (b, a) share a cache entry
+    if right < left:
+        left, right = right, left
+    return _are_equivalent(left, right)
+
+
+@lru_cache(maxsize=SPOT_CACHE_SIZE)
+def _are_equivalent(left: str, right: str) -> bool:
+    return implies(left, right) and implies(right, left)
+
+
+def clear():
+    for cache in (get_formula, get_automaton, get_negated_automaton, implies, _are_equivalent):
+        cache.cache_clear()
@@ -1,4 +1,6 @@
 import subprocess
+import threading
+from typing import Iterator
 
 from spec_repair.config import SETUP_DICT
 
@@ -26,6 +28,39 @@ def run_subprocess(cmd, encoding: str = 'utf-8', suppress=False, timeout=-1):
     return output
 
 
+def stream_subprocess(cmd, encoding: str = 'utf-8', timeout=-1) -> Iterator[str]:
+    """
+    Yields the lines of cmd's stdout as it prints them, rather than once it
+    exits. Raises subprocess.TimeoutExpired after the last line if the command
+    had to be killed for running past timeout. Closing the generator early
+    kills the command too, so an abandoned stream never leaves it running.
+    """
+    # stderr is not read while streaming, so it must not be a pipe that could fill up
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    timed_out = threading.Event()
+
+    def kill_on_timeout():
+        timed_out.set()
+        p.kill()
+
+    watchdog = threading.Timer(timeout, kill_on_timeout) if timeout != -1 else None
+    try:
+        if watchdog:
+            watchdog.start()
+        for line in p.stdout:
+            yield line.decode(encoding).rstrip("\n")
+        p.wait()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+    finally:
+        if watchdog:
+            watchdog.cancel()
+        if p.poll() is None:
+            p.kill()
+            p.wait()
+        p.stdout.close()
+
+
 def create_cmd(param):
     cmd = []
     if SETUP_DICT['wsl']:
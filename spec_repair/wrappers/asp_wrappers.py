@@ -1,18 +1,56 @@
+import os
 import re
-from typing import Optional
-
-from spec_repair.config import FASTLAS, MAX_ASP_HYPOTHESES, PROJECT_PATH
+import subprocess
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+from spec_repair import config
+from spec_repair.config import FASTLAS, ILASP_TIMEOUT, ILASP_TIMEOUT_CACHE_TTL, MAX_ASP_HYPOTHESES, PROJECT_PATH, \
+    SETUP_DICT
 from spec_repair.enums import ExpType
-from spec_repair.util.subprocess_util import run_subprocess, create_cmd
+from spec_repair.util.subprocess_util import run_subprocess, create_cmd, stream_subprocess
 from spec_repair.util.asp_trace_util import run_clingo_raw
-from spec_repair.util.file_util import generate_filename, generate_temp_filename, write_to_file, read_file_lines, \
-    write_file
+from spec_repair.wrappers.clingo_api import is_clingo_api_enabled, solve_clingo_program
+from spec_repair.util.disk_cache import file_identity, get_disk_cache, make_key
+from spec_repair.util.file_util import generate_filename, generate_temp_filename, get_temp_dir, write_to_file, \
+    read_file, read_file_lines
+
+
+# Patched PyLASP driver files already materialised by this process, by key
+_pylasp_driver_files: Dict[str, str] = {}
+
 
+def pylasp_driver_key(n_solutions: int = MAX_ASP_HYPOTHESES, mode: str = "min_score") -> str:
+    input_text_file = f"{PROJECT_PATH}/files/input_text_for_pylasp.txt"
+    return make_key(file_identity(SETUP_DICT['ILASP']), n_solutions, mode, file_identity(input_text_file))
+
+
+def get_pylasp_driver_file(las_file, n_solutions: int = MAX_ASP_HYPOTHESES, mode: str = "min_score") -> str:
+    """
+    Path of a .las file holding ILASP's PyLASP driver, patched by
+    edit_pylasp_for_<mode>, to pass to ILASP ahead of the task file.
 
-def integrate_pylasp(las_file):
-    pylasp_script = generate_pylasp_script(las_file)
-    pylasp_script = edit_pylasp_for_min_score(pylasp_script, MAX_ASP_HYPOTHESES)
-    append_pylasp_script(las_file, pylasp_script)
+    The driver ILASP prints with -p only depends on the ILASP build, so it is
+    generated (from las_file) and patched once per (ILASP build, n_solutions,
+    mode, patch input) and kept on disk, instead of spawning `ILASP -p` and
+    rewriting the task file on every learning call.
+    """
+    key = pylasp_driver_key(n_solutions, mode)
+    path = _pylasp_driver_files.get(key)
+    if path is not None and os.path.exists(path):
+        return path
+    directory = os.path.join(config.CACHE_DIR, "pylasp") if config.DISK_CACHE_ENABLED else get_temp_dir()
+    path = os.path.join(directory, f"driver_{key[:16]}.las")
+    if not os.path.exists(path):
+        pylasp_script = _PYLASP_EDITORS[mode](generate_pylasp_script(las_file), n_solutions)
+        # Written aside and renamed into place, so that concurrent learners
+        # never pass ILASP a half-written driver
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        write_to_file(temp_path, pylasp_script)
+        os.replace(temp_path, path)
+    _pylasp_driver_files[key] = path
+    return path
 
 
 def generate_pylasp_script(las_file):
@@ -111,10 +149,10 @@ else:
 
     return output
 
-def append_pylasp_script(las_file, pylasp_script):
-    program = read_file_lines(las_file)
-    program = [pylasp_script] + program
-    write_file(las_file, program)
+_PYLASP_EDITORS = {
+    "min_score": edit_pylasp_for_min_score,
+    "max_score": edit_pylasp_for_max_score,
+}
 
 
 def error_check_ILASP_output(output):
@@ -131,9 +169,12 @@ def error_check_ILASP_output(output):
 # TODO: check if spectra_file provided should be original version or fixed version
 # TODO: don't rename inside of function, provide exact file names and assert their existence
 def run_clingo(asp: str, n_models: int = 1) -> list[str]:
-    asp_file = generate_temp_filename(ext=".lp")
-    write_to_file(asp_file, asp)
-    output = run_clingo_raw(asp_file, n_models=n_models)
+    if is_clingo_api_enabled():
+        output = solve_clingo_program(asp, n_models=n_models)
+    else:
+        asp_file = generate_temp_filename(ext=".lp")
+        write_to_file(asp_file, asp)
+        output = run_clingo_raw(asp_file, n_models=n_models)
     output = output.split("\n")
     for i, line in enumerate(output):
         if len(line) > 100:
@@ -141,41 +182,144 @@ def run_clingo(asp: str, n_models: int = 1) -> list[str]:
     return output
 
 
-def run_ILASP_raw(las_file, pylasp_integrated=False):
+def _ilasp_command(las_file, pylasp_integrated: bool) -> Tuple[list, list, Optional[str]]:
+    """The command running the learner on las_file, the learner's own arguments and the PyLASP driver key."""
+    if FASTLAS:
+        tool_args = ["FastLAS", "--nopl", "--force-safety"]
+        return create_cmd(tool_args + [las_file]), tool_args, None
+    if pylasp_integrated:
+        tool_args = ['ILASP']
+        return create_cmd(tool_args + [las_file]), tool_args, None
+    tool_args = ['ILASP']
+    # ILASP reads its input files as one program, driver first
+    return create_cmd(tool_args + [get_pylasp_driver_file(las_file), las_file]), tool_args, pylasp_driver_key()
+
+
+def _ilasp_timeout(cmd, deadline: Optional[float]) -> float:
+    timeout = ILASP_TIMEOUT
+    if deadline is not None:
+        timeout = min(timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            raise subprocess.TimeoutExpired(cmd, 0)
+    return timeout
+
+
+def _cached_ILASP_output(las_file, cmd, tool_args, driver_key, timeout):
+    """
+    The results cache with the task's key in it, and the output recorded under
+    that key (None if there is none). Raises subprocess.TimeoutExpired if the
+    task is recorded as timing out in no less than timeout.
+    """
+    cache = get_disk_cache("ilasp_results")
+    if cache is None:
+        return None, None, None
+    key = make_key(file_identity(SETUP_DICT[tool_args[0]]), tool_args[1:], driver_key,
+                   normalise_las(read_file(las_file)))
+    cached = cache.get(key)
+    if cached is not None and "output" in cached:
+        return cache, key, cached["output"]
+    if cached is not None and cached["timeout"] >= timeout:
+        raise subprocess.TimeoutExpired(cmd, cached["timeout"])
+    return cache, key, None
+
+
+def run_ILASP_raw(las_file, pylasp_integrated=False, deadline: Optional[float] = None):
     """
     Runs ILASP on output from encode_ILASP.
 
+    Outputs are cached on disk (see get_disk_cache), keyed on the task with its
+    comments and blank lines dropped, the learner binary and its flags, so a
+    task that comes up again (in a sibling BFS branch, or in a re-run) is not
+    solved again. A search that timed out is recorded for
+    ILASP_TIMEOUT_CACHE_TTL seconds, and fails straight away while that record
+    stands if it is not given any longer to run this time.
+
     :param las_file: Path to original Spectra specification.
     :param pylasp_integrated: TODO
+    :param deadline: time.monotonic() by which the search must finish, so that
+        concurrent searches can share one time budget. The search never runs
+        for longer than ILASP_TIMEOUT either way.
     :return: Path to file containing learned hypothesis.
     """
+    cmd, tool_args, driver_key = _ilasp_command(las_file, pylasp_integrated)
+    timeout = _ilasp_timeout(cmd, deadline)
+    cache, key, output = _cached_ILASP_output(las_file, cmd, tool_args, driver_key, timeout)
+    if output is not None:
+        return output
+
+    try:
+        output = run_subprocess(cmd, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        if cache is not None:
+            cache.set(key, {"timeout": timeout}, ttl=ILASP_TIMEOUT_CACHE_TTL)
+        raise
+    error_check_ILASP_output(output)
+    if cache is not None:
+        cache.set(key, {"output": output})
+    return output
 
-    if not pylasp_integrated and not FASTLAS:
-        integrate_pylasp(las_file)
 
-    if FASTLAS:
-        cmd = create_cmd(["FastLAS", "--nopl", "--force-safety", las_file])
-    else:
-        cmd = create_cmd(['ILASP', las_file])
-    output = run_subprocess(cmd, timeout=60)
+def stream_ILASP_raw(las_file, pylasp_integrated=False, deadline: Optional[float] = None) -> Iterator[str]:
+    """
+    As run_ILASP_raw, but yields ILASP's output line by line as it is printed,
+    so that solutions can be used while ILASP is still searching for the rest.
+    A cached output is replayed in one go. Each line is error-checked before it
+    is yielded, so a failed run raises instead of handing out what it printed
+    before the error; the complete output is checked again and cached once
+    ILASP exits. A timeout is recorded and raised after the lines printed
+    before it.
+    """
+    cmd, tool_args, driver_key = _ilasp_command(las_file, pylasp_integrated)
+    timeout = _ilasp_timeout(cmd, deadline)
+    cache, key, output = _cached_ILASP_output(las_file, cmd, tool_args, driver_key, timeout)
+    if output is not None:
+        yield from output.split("\n")
+        return
+
+    lines = []
+    try:
+        for line in stream_subprocess(cmd, timeout=timeout):
+            error_check_ILASP_output(line)
+            lines.append(line)
+            yield line
+    except subprocess.TimeoutExpired:
+        if cache is not None:
+            cache.set(key, {"timeout": timeout}, ttl=ILASP_TIMEOUT_CACHE_TTL)
+        raise
+    output = "\n".join(lines)
     error_check_ILASP_output(output)
-    return output
+    if cache is not None:
+        cache.set(key, {"output": output})
 
 
-def run_ILASP(las, pylasp_integrated=False):
+def normalise_las(las: str) -> str:
+    """The task without comment lines, blank lines or trailing whitespace, which do not affect its solutions."""
+    lines = [line.rstrip() for line in las.splitlines()]
+    return "\n".join(line for line in lines if line and not line.lstrip().startswith("%"))
+
+
+def run_ILASP(las, pylasp_integrated=False, deadline: Optional[float] = None):
     """
     Runs ILASP on output from encode_ILASP.
 
     :param las: Path to original Spectra specification.
     :param pylasp_integrated: TODO
+    :param deadline: see run_ILASP_raw.
     :return: Path to file containing learned hypothesis.
     """
     ilasp_file = generate_temp_filename(ext=".las")
     write_to_file(ilasp_file, las)
-    output = run_ILASP_raw(ilasp_file, pylasp_integrated)
+    output = run_ILASP_raw(ilasp_file, pylasp_integrated, deadline)
     return output
 
 
+def stream_ILASP(las, pylasp_integrated=False, deadline: Optional[float] = None) -> Iterator[str]:
+    """As run_ILASP, but yields the output line by line; see stream_ILASP_raw."""
+    ilasp_file = generate_temp_filename(ext=".las")
+    write_to_file(ilasp_file, las)
+    yield from stream_ILASP_raw(ilasp_file, pylasp_integrated, deadline)
+
+
 def get_violations(asp, exp_type: Optional[ExpType] = None) -> list[str]:
     output = run_clingo(asp)
     if exp_type:
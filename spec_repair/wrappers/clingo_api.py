@@ -0,0 +1,68 @@
+"""
+In-process clingo solving through the clingo Python API.
+
+Every violation check, deadlock completion and trace generation used to write
+a temporary .lp file and start a `clingo` process, which costs far more than
+solving the (small) programs themselves. When the `clingo` Python package is
+installed and config.USE_CLINGO_API is set, run_clingo/run_clingo_raw solve in
+this process instead.
+
+The result is rendered exactly like the clingo CLI's stdout for the parts
+callers rely on ("Answer: N" followed by the model's atoms on one line,
+"SATISFIABLE"/"UNSATISFIABLE", and "Optimization: ..."/"OPTIMUM FOUND" for
+optimisation problems), so none of the output parsers need to know which
+backend produced it.
+
+Grounding is not shared across calls: the background knowledge's rules range
+over every trace in the program (holds_at(F,T,S) etc.), so a trace added to an
+already-grounded program would not be seen by them. Each query therefore gets
+its own clingo.Control; the saving is the process spawn and file round trip.
+"""
+from typing import List, Optional
+
+from spec_repair import config
+from spec_repair.util.file_util import FilePath
+
+try:
+    import clingo
+except ImportError:
+    clingo = None
+
+
+def is_clingo_api_enabled() -> bool:
+    return config.USE_CLINGO_API and clingo is not None
+
+
+def solve_clingo_program(asp: Optional[str] = None, filename: Optional[FilePath] = None, n_models: int = 1) -> str:
+    """
+    Solve the ASP program given as text and/or as a file, returning what
+    `clingo --models=<n_models> <file>` would print.
+    """
+    messages: List[str] = []
+    ctl = clingo.Control([f"--models={n_models}"], logger=lambda code, message: messages.append(message))
+    try:
+        if filename is not None:
+            ctl.load(filename)
+        if asp is not None:
+            ctl.add("base", [], asp)
+        ctl.ground([("base", [])])
+    except RuntimeError as e:
+        raise RuntimeError("clingo failed to ground program:\n" + "\n".join(messages)) from e
+
+    lines = ["Solving..."]
+    is_optimisation = False
+    with ctl.solve(yield_=True) as handle:
+        for model in handle:
+            lines.append(f"Answer: {model.number}")
+            lines.append(" ".join(str(symbol) for symbol in model.symbols(shown=True)))
+            if model.cost:
+                is_optimisation = True
+                lines.append("Optimization: " + " ".join(str(cost) for cost in model.cost))
+        result = handle.get()
+    if result.satisfiable:
+        lines.append("OPTIMUM FOUND" if is_optimisation and result.exhausted else "SATISFIABLE")
+    elif result.unsatisfiable:
+        lines.append("UNSATISFIABLE")
+    else:
+        lines.append("UNKNOWN")
+    return "\n".join(lines) + "\n"
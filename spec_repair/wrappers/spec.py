@@ -1,8 +1,8 @@
 import re
-import subprocess
 from typing import Optional
 
 from spec_repair.ltl_types import GR1FormulaType, LTLFiltOperation
+from spec_repair.util import spot_cache
 from spec_repair.util.formula_string_util import strip_vars
 from spec_repair.util.asp_trace_util import simplify_assignments
 from spec_repair.util.formula_string_util import shift_prev_to_next
@@ -85,17 +85,13 @@ class Spec:
 
 
 def is_left_cmp_right(this_exps: str, ltl_op: LTLFiltOperation, other_exps: str) -> bool:
-    # TODO: introduce an assertion against ltl_ops which do not exist yet
-    linux_cmd = ["ltlfilt", "-c", "-f", f"{this_exps}", f"{ltl_op.flag()}", f"{other_exps}"]
-    p = subprocess.Popen(linux_cmd, stdout=subprocess.PIPE, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
-    output: str = p.communicate()[0].decode('utf-8')
-    reg = re.search(r"([01])\n", output)
-    if not reg:
-        raise Exception(
-            f"The output of ltlfilt is unexpected, ergo error occurred during the comparison of:\n{this_exps}\nand\n{other_exps}",
-        )
-    result = reg.group(1)
-    return result == "1"
+    match ltl_op:
+        case LTLFiltOperation.IMPLIES:
+            return spot_cache.implies(this_exps, other_exps)
+        case LTLFiltOperation.EQUIVALENT:
+            return spot_cache.are_equivalent(this_exps, other_exps)
+        case _:
+            raise ValueError(f"Unsupported LTL comparison: {ltl_op}")
 
 
 def extract_GR1_expressions_of_type_spot(exp_type: str, spec: list[str], ignore_initial: bool = False) -> str:
@@ -0,0 +1,142 @@
+"""
+A pool of warm, isolated Spectra synthesis contexts for concurrent callers.
+
+One JVM can only run one Spectra synthesis at a time: run_spectra_cli swaps
+the JVM-wide System.out to capture the CLI's output, and the BDD engine behind
+the CLI keeps global state. Isolation therefore means one JVM per context,
+i.e. one worker process each. Workers are started (and their JVM booted and
+Spectra classes loaded) when the service is created, instead of paying for
+that on the first synthesis of every request.
+
+Callers hand over spec text and get back a SynthesisResult: the verdict, the
+parsed CounterStrategy (when unrealizable and requested), and how long the
+synthesis took. Any number of Python threads may call synthesise() at once;
+requests queue for the next free context.
+
+A pickled service (e.g. inside an oracle handed to a parallel orchestrator's
+worker process) does not bring its pool along: the copy synthesises in its own
+process instead, which already has a JVM of its own. Such in-process syntheses
+run one at a time, since that process has only the one JVM.
+
+A closed service refuses new requests.
+"""
+import atexit
+import multiprocessing
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from spec_repair.model.counter_strategy import CounterStrategy
+from spec_repair.util.file_util import generate_temp_filename, set_temp_dir, write_to_file
+
+
+@dataclass
+class SynthesisResult:
+    # None when Spectra gave no verdict (e.g. the spec failed to compile)
+    realizable: Optional[bool]
+    counter_strategy: Optional[CounterStrategy]
+    seconds: float
+    output: str
+
+
+def synthesise_spec_text(spec_text: str, counter_strategy: bool = True) -> SynthesisResult:
+    """Synthesise in the calling process (and its JVM)."""
+    # Imported here: importing the toolbox starts this process's JVM
+    from spec_repair.helpers.parsers.spectra_cs_parser import SpectraCSParser
+    from spec_repair.wrappers.spectra_toolbox import realizability_verdict, \
+        synthesise_check_realisability_only, synthesise_extract_counter_strategies
+
+    start = time.perf_counter()
+    spectra_file: str = generate_temp_filename(ext=".spectra")
+    write_to_file(spectra_file, spec_text)
+    if counter_strategy:
+        output = synthesise_extract_counter_strategies(spectra_file)
+    else:
+        output = synthesise_check_realisability_only(spectra_file)
+    seconds = time.perf_counter() - start
+    if output is None:
+        return SynthesisResult(None, None, seconds, "")
+    verdict = realizability_verdict(output)
+    cs = SpectraCSParser.from_str(output) if counter_strategy and verdict is False else None
+    return SynthesisResult(verdict, cs, seconds, output)
+
+
+# Serialises the in-process fallback of unpickled services: this process has one JVM
+_in_process_lock = threading.Lock()
+
+
+def _initialise_worker(warm_up_spec: Optional[str]):
+    temp_dir = tempfile.mkdtemp(prefix="spectra_synthesis_")
+    atexit.register(shutil.rmtree, temp_dir, ignore_errors=True)
+    set_temp_dir(temp_dir)
+    import spec_repair.wrappers.spectra_toolbox  # noqa: F401 - boots the JVM and loads the Spectra classes
+    if warm_up_spec is not None:
+        synthesise_spec_text(warm_up_spec)
+
+
+def _ready() -> bool:
+    return True
+
+
+class SpectraSynthesisService:
+    def __init__(self, workers: int = 2, warm_up_spec: Optional[str] = None):
+        """
+        :param workers: number of isolated synthesis contexts (JVMs).
+        :param warm_up_spec: optional spec text each context synthesises once on
+            start-up, so that the JIT has already seen the synthesis path.
+        """
+        self._workers = workers
+        self._warm_up_spec = warm_up_spec
+        self._closed = False
+        self._executor: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialise_worker,
+            initargs=(warm_up_spec,),
+        )
+        # The executor only starts a worker when a task arrives and none is
+        # idle, so submitting one task per worker at once starts all of them.
+        for future in [self._executor.submit(_ready) for _ in range(workers)]:
+            future.result()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
+
+    def submit(self, spec_text: str, counter_strategy: bool = True) -> "Future[SynthesisResult]":
+        """
+        Queues the spec for the next free context. An unpickled copy of the
+        service has no contexts: it synthesises in the calling process before
+        returning, one request at a time.
+        """
+        if self._closed:
+            raise RuntimeError("SpectraSynthesisService is closed")
+        if self._executor is None:
+            future: Future = Future()
+            try:
+                with _in_process_lock:
+                    future.set_result(synthesise_spec_text(spec_text, counter_strategy))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._executor.submit(synthesise_spec_text, spec_text, counter_strategy)
+
+    def synthesise(self, spec_text: str, counter_strategy: bool = True) -> SynthesisResult:
+        return self.submit(spec_text, counter_strategy).result()
+
+    def close(self):
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "SpectraSynthesisService":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
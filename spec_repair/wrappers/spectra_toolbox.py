@@ -1,14 +1,18 @@
 import os.path
 import re
-import subprocess
-from typing import List, Set
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
 
 import jpype
 from jpype.types import *
 
 import spec_repair.wrappers.jvm  # noqa: F401 - import side effect starts the shared JVM
+from spec_repair.config import PATH_TO_CLI, PATH_TO_TOOLBOX, UNREALISABLE_CORES_CACHE_SIZE
 from spec_repair.enums import SimEnv
+from spec_repair.util import spot_cache
 from spec_repair.util.asp_trace_util import pRespondsToS_substitution, simplify_assignments
+from spec_repair.util.disk_cache import file_identity, get_disk_cache, make_key
 from spec_repair.util.file_util import generate_temp_filename, get_line_from_file, read_file_lines, write_to_file
 from spec_repair.util.formula_string_util import shift_prev_to_next
 from spec_repair.util.formula_string_util import strip_vars
@@ -16,11 +20,61 @@ from spec_repair.util.formula_string_util import strip_vars
 SpectraToolbox = jpype.JClass('cores.SpectraToolbox')
 SpectraCLI = jpype.JClass('tau.smlab.syntech.Spectra.cli.SpectraCliTool')
 
+# run_spectra_cli redirects the JVM-wide System.out while the CLI runs, so two
+# concurrent calls from different Python threads would capture (and restore)
+# each other's streams, and the core search shares the same Spectra/BDD state.
+# All Spectra calls within one JVM are serialised; concurrency comes from
+# separate JVMs (see spectra_synthesis_service.py).
+_spectra_cli_lock = threading.Lock()
+
+
+# In-process memo of run_all_unrealisable_cores, keyed on the compiled spec
+# text. A single learning step asks for the cores of the same spec from the
+# mode bias, the ILASP encoding, the oracle's counter-trace filter and the
+# deadlock completion, and the core search itself can take minutes. Only the
+# last UNREALISABLE_CORES_CACHE_SIZE specs are kept, as a long BFS visits
+# many; the lock keeps the LRU consistent across the oracle's worker threads.
+_unrealisable_cores_memo: OrderedDict[str, List[Set[str]]] = OrderedDict()
+_unrealisable_cores_memo_lock = threading.Lock()
+unrealisable_cores_stats: Dict[str, int] = {"hits": 0, "disk_hits": 0, "misses": 0}
+
 
 def run_all_unrealisable_cores(spectra_str: str) -> List[Set[str]]:
     """
     Gets the names of all unrealisable cores from a given spectra specification as string.
+    Each distinct spec is searched at most once per process, and at most once
+    ever while the on-disk "unrealisable_cores" cache is enabled.
     """
+    with _unrealisable_cores_memo_lock:
+        if spectra_str in _unrealisable_cores_memo:
+            unrealisable_cores_stats["hits"] += 1
+            _unrealisable_cores_memo.move_to_end(spectra_str)
+            return [set(core) for core in _unrealisable_cores_memo[spectra_str]]
+    cache = get_disk_cache("unrealisable_cores")
+    key = make_key(file_identity(PATH_TO_TOOLBOX), spectra_str)
+    cores = cache.get(key) if cache is not None else None
+    if cores is not None:
+        unrealisable_cores_stats["disk_hits"] += 1
+    else:
+        unrealisable_cores_stats["misses"] += 1
+        cores = _compute_all_unrealisable_cores(spectra_str)
+        if cache is not None:
+            cache.set(key, cores)
+    with _unrealisable_cores_memo_lock:
+        _unrealisable_cores_memo[spectra_str] = cores
+        if len(_unrealisable_cores_memo) > UNREALISABLE_CORES_CACHE_SIZE:
+            _unrealisable_cores_memo.popitem(last=False)
+    return [set(core) for core in cores]
+
+
+def clear_unrealisable_cores_memo():
+    with _unrealisable_cores_memo_lock:
+        _unrealisable_cores_memo.clear()
+        for counter in unrealisable_cores_stats:
+            unrealisable_cores_stats[counter] = 0
+
+
+def _compute_all_unrealisable_cores(spectra_str: str) -> List[Set[str]]:
     temp_spectra_file = generate_temp_filename(ext=".spectra")
     write_to_file(temp_spectra_file, spectra_str)
     pRespondsToS_substitution(temp_spectra_file)
@@ -72,7 +126,8 @@ def _extract_cores(text) -> List[Set[int]]:
 def run_all_unrealisable_cores_raw(filename) -> str:
     filepath = f"{filename}"
     args = jpype.JArray(JString)([filepath, "--jtlv"])
-    output = SpectraToolbox.exploreAllCores(args)
+    with _spectra_cli_lock:
+        output = SpectraToolbox.exploreAllCores(args)
     return str(output)
 
 
@@ -98,20 +153,11 @@ def semantically_identical_spot(to_cmp_file, baseline_file):
 def equivalent_expressions(exp_type, start_file, end_file):
     start_exp = extract_all_expressions_spot(exp_type, start_file)
     end_exp = extract_all_expressions_spot(exp_type, end_file)
-    linux_cmd = ["ltlfilt", "-c", "-f", f"{start_exp}", "--equivalent-to", f"{end_exp}"]
-    p = subprocess.Popen(linux_cmd, stdout=subprocess.PIPE, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
-    output = p.communicate()[0]
-    close_file_descriptors_of_subprocess(p)
-    output = output.decode('utf-8')
-    reg = re.search(r"(\d)\n", output)
-    if not reg:
+    try:
+        return spot_cache.are_equivalent(start_exp, end_exp)
+    except SyntaxError:
+        # spot could not parse one of the expressions
         return None
-    result = reg.group(1)
-    if result == "0":
-        return False
-    if result == "1":
-        return True
-    return None
 
 
 def close_file_descriptors_of_subprocess(p):
@@ -165,8 +211,7 @@ def realizable(file, suppress=False):
         print(file)
         return None
     file = pRespondsToS_substitution(file)
-    args = ["-i", file, "--jtlv"]
-    output = run_spectra_cli(args)
+    output = run_spectra_cli_cached(file, ["--jtlv"])
     if re.search("Result: Specification is unrealizable", output):
         return False
     elif re.search("Result: Specification is realizable", output):
@@ -184,8 +229,7 @@ def synthesise_extract_counter_strategies(file):
         print(file)
         return None
     file = pRespondsToS_substitution(file)
-    args = ["-i", file, "--counter-strategy", "--jtlv"]
-    output = run_spectra_cli(args)
+    output = run_spectra_cli_cached(file, ["--counter-strategy", "--jtlv"])
     return output
 
 
@@ -206,8 +250,7 @@ def synthesise_check_realisability_only(file):
         print(file)
         return None
     file = pRespondsToS_substitution(file)
-    args = ["-i", file, "--jtlv"]
-    output = run_spectra_cli(args)
+    output = run_spectra_cli_cached(file, ["--jtlv"])
     return output
 
 
@@ -237,6 +280,40 @@ def synthesise_controller(spec_file_path, output_folder_path, suppress=False) ->
     return False
 
 
+def realizability_verdict(output: str) -> Optional[bool]:
+    """The verdict printed by a Spectra CLI realizability check, or None if it printed none (an error)."""
+    if re.search("Result: Specification is unrealizable", output):
+        return False
+    elif re.search("Result: Specification is realizable", output):
+        return True
+    return None
+
+
+def run_spectra_cli_cached(file: str, flags: list[str]) -> str:
+    """
+    run_spectra_cli(["-i", file] + flags), served from the on-disk
+    "spectra_synthesis" cache whenever the same file contents have already been
+    checked with the same flags by the same Spectra CLI jar. Specs get
+    re-synthesised across BFS branches, test runs and the merge pipeline, and
+    every run otherwise pays for a full JVM synthesis. Only outputs carrying a
+    verdict are stored, so CLI errors are always retried.
+    """
+    cache = get_disk_cache("spectra_synthesis")
+    if cache is None:
+        return run_spectra_cli(["-i", file] + flags)
+    with open(file) as f:
+        spec_text = f.read()
+    key = make_key(file_identity(PATH_TO_CLI), *flags, spec_text)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached["output"]
+    output = run_spectra_cli(["-i", file] + flags)
+    verdict = realizability_verdict(output)
+    if verdict is not None:
+        cache.set(key, {"realizable": verdict, "output": output})
+    return output
+
+
 def run_spectra_cli(args: list[str]) -> str:
     """
     Run a Java main method and capture its printed output as a string.
@@ -250,37 +327,38 @@ def run_spectra_cli(args: list[str]) -> str:
     if not jpype.isJVMStarted():
         raise RuntimeError("JVM is not started. Start it with jpype.startJVM() before calling this function.")
 
-    # Import Java system classes
-    java_lang_System = jpype.JClass("java.lang.System")
-    java_io_ByteArrayOutputStream = jpype.JClass("java.io.ByteArrayOutputStream")
-    java_io_PrintStream = jpype.JClass("java.io.PrintStream")
+    with _spectra_cli_lock:
+        # Import Java system classes
+        java_lang_System = jpype.JClass("java.lang.System")
+        java_io_ByteArrayOutputStream = jpype.JClass("java.io.ByteArrayOutputStream")
+        java_io_PrintStream = jpype.JClass("java.io.PrintStream")
 
-    # Backup original System.out
-    original_out = java_lang_System.out
+        # Backup original System.out
+        original_out = java_lang_System.out
 
-    # Prepare streams to capture output
-    baos = java_io_ByteArrayOutputStream()
-    ps = java_io_PrintStream(baos)
+        # Prepare streams to capture output
+        baos = java_io_ByteArrayOutputStream()
+        ps = java_io_PrintStream(baos)
 
-    # Redirect System.out to our PrintStream
-    java_lang_System.setOut(ps)
+        # Redirect System.out to our PrintStream
+        java_lang_System.setOut(ps)
 
-    try:
-        # Load the Java class and convert args to Java String[]
-        java_args = JArray(JString)(args)
+        try:
+            # Load the Java class and convert args to Java String[]
+            java_args = JArray(JString)(args)
 
-        # Call the main method
-        SpectraCLI.main(java_args)
+            # Call the main method
+            SpectraCLI.main(java_args)
 
-        # Flush and get captured output as bytes
-        ps.flush()
-        output_bytes = baos.toByteArray()
+            # Flush and get captured output as bytes
+            ps.flush()
+            output_bytes = baos.toByteArray()
 
-        # Decode bytes to Python string
-        output_str = bytes(output_bytes).decode("utf-8")
+            # Decode bytes to Python string
+            output_str = bytes(output_bytes).decode("utf-8")
 
-    finally:
-        # Restore original System.out no matter what
-        java_lang_System.setOut(original_out)
+        finally:
+            # Restore original System.out no matter what
+            java_lang_System.setOut(original_out)
 
     return output_str
@@ -2,6 +2,7 @@ import os
 import shutil
 import tempfile
 import unittest
+from unittest.mock import patch
 
 from main.bfs_repair_orchestrator_builder import ASSUMPTION_WEAKENING, GUARANTEE_WEAKENING, \
     BFSRepairOrchestratorBuilder
@@ -11,13 +12,18 @@ from spec_repair.components.heuristic_managers.no_filter_heuristic_manager impor
 from spec_repair.components.mitigators.mitigation_strategies import complete_counter_traces, \
     finish_here_return_nothing, move_one_to_guarantee_weakening
 from spec_repair.components.oracles.spectra_gr1_oracle import SpectraGR1Oracle
+from spec_repair.components.orchestration_managers.orchestration_manager_best_first import \
+    OrchestrationManagerBestFirst, counter_trace_count
 from spec_repair.components.orchestration_managers.orchestration_manager_semantic_equivalence import \
     OrchestrationManagerSemanticEquivalence
 from spec_repair.components.orchestration_managers.orchestration_manager_semantic_equivalence_aw_merge import \
     OrchestrationManagerSemanticEquivalenceAsmOnly
 from spec_repair.components.orchestration_managers.orchestration_manager_syntactic_equivalence import \
     OrchestrationManagerSyntacticEquivalence
+from spec_repair.components.subsumption_pruner import SubsumptionPruner
+from spec_repair import config
 from spec_repair.enums import Learning
+from spec_repair.util import disk_cache
 
 
 class TestBFSRepairOrchestratorBuilder(unittest.TestCase):
@@ -71,6 +77,12 @@ class TestBFSRepairOrchestratorBuilder(unittest.TestCase):
                          r._mitigator._mitigation_strategies[Learning.GUARANTEE_WEAKENING])
         self.assertNotIn(Learning.ASSUMPTION_WEAKENING, r._mitigator._mitigation_strategies)
 
+    def test_best_first_preset_uses_given_scorer(self):
+        r = BFSRepairOrchestratorBuilder.best_first(counter_trace_count).with_log_file(self._log()).build()
+        self.assertIsInstance(r._om, OrchestrationManagerBestFirst)
+        self.assertIs(counter_trace_count, r._om._stack._scorer)
+        self.assertEqual({ASSUMPTION_WEAKENING, GUARANTEE_WEAKENING}, set(r._learners))
+
     # ---------------- defaults and overrides ----------------
 
     def test_defaults_are_spectra_oracle_discriminator_and_no_filter_hm(self):
@@ -93,6 +105,58 @@ class TestBFSRepairOrchestratorBuilder(unittest.TestCase):
         for learner in r._learners.values():
             self.assertIs(hm, learner._hm)
 
+    def test_streaming_solutions_is_passed_to_every_learner(self):
+        r = BFSRepairOrchestratorBuilder.semantic().with_log_file(self._log()).build()
+        self.assertFalse(any(learner._stream_solutions for learner in r._learners.values()))
+        r = BFSRepairOrchestratorBuilder.semantic().streaming_solutions().with_log_file(self._log()).build()
+        self.assertTrue(all(learner._stream_solutions for learner in r._learners.values()))
+
+    def test_with_checkpoint_sets_the_checkpoint_file(self):
+        checkpoint_file = os.path.join(self.tmp, "run.checkpoint")
+        r = BFSRepairOrchestratorBuilder.semantic().with_checkpoint(checkpoint_file, 60).with_log_file(self._log()).build()
+        self.assertEqual(checkpoint_file, r._checkpoint_file)
+        self.assertEqual(60, r._checkpoint_interval)
+
+    def test_with_oracle_workers_is_passed_to_the_orchestrator(self):
+        r = BFSRepairOrchestratorBuilder.semantic().with_log_file(self._log()).build()
+        self.assertEqual(1, r._oracle_workers)
+        oracle = SpectraGR1Oracle()
+        r = BFSRepairOrchestratorBuilder.semantic().with_oracle(oracle).with_oracle_workers(4) \
+            .with_log_file(self._log()).build()
+        self.assertEqual(4, r._oracle_workers)
+        self.assertIs(oracle, r._oracle)
+
+    def test_parallel_workers_get_no_synthesis_service(self):
+        r = BFSRepairOrchestratorBuilder.semantic().with_workers(2).with_oracle_workers(4) \
+            .with_log_file(self._log()).build()
+        self.assertEqual(4, r._oracle_workers)
+        self.assertIsNone(r._oracle._synthesis_service)
+
+    def test_with_disk_cache_enables_caching_in_the_directory(self):
+        cache_dir = os.path.join(self.tmp, "cache")
+        with patch.object(config, "CACHE_DIR", ""), patch.object(config, "DISK_CACHE_ENABLED", False), \
+                patch.dict(os.environ), patch.dict(disk_cache._named_caches, clear=True):
+            BFSRepairOrchestratorBuilder.semantic().with_log_file(self._log()).build()
+            self.assertIsNone(disk_cache.get_disk_cache("results"))
+            BFSRepairOrchestratorBuilder.semantic().with_disk_cache(cache_dir).with_log_file(self._log()).build()
+            self.assertEqual(os.path.join(cache_dir, "results.sqlite"), disk_cache.get_disk_cache("results").path)
+
+    def test_pruning_subsumed_tasks_sets_a_pruner(self):
+        r = BFSRepairOrchestratorBuilder.semantic().with_log_file(self._log()).build()
+        self.assertIsNone(r._pruner)
+        r = BFSRepairOrchestratorBuilder.semantic().pruning_subsumed_tasks().with_log_file(self._log()).build()
+        self.assertIsInstance(r._pruner, SubsumptionPruner)
+
+    def test_with_max_deadlock_completions_caps_the_completion_strategy(self):
+        r = BFSRepairOrchestratorBuilder.semantic().with_max_deadlock_completions(3) \
+            .with_log_file(self._log()).build()
+        strategy = r._mitigator._mitigation_strategies[Learning.GUARANTEE_WEAKENING]
+        self.assertIs(complete_counter_traces, strategy.func)
+        self.assertEqual({"max_alternatives": 3}, strategy.keywords)
+        r = BFSRepairOrchestratorBuilder.assumption_only().with_max_deadlock_completions(3) \
+            .with_log_file(self._log()).build()
+        self.assertNotIn(Learning.GUARANTEE_WEAKENING, r._mitigator._mitigation_strategies)
+
     def test_with_debug_dir_creates_both_spec_folders(self):
         out = os.path.join(self.tmp, "run")
         r = BFSRepairOrchestratorBuilder.semantic().with_debug_dir(out).with_log_file(self._log()).build()
@@ -0,0 +1,96 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from spec_repair.components.mitigators.mitigation_strategies import complete_counter_traces
+from spec_repair.components.repair_data import RepairData
+from spec_repair.enums import Learning
+from spec_repair.model import counter_trace
+from spec_repair.model.counter_trace import CounterTrace
+
+
+class FakeSpec:
+    def __init__(self, name: str):
+        self.name = name
+
+    def to_str(self) -> str:
+        return self.name
+
+
+def deadlock(name: str, path: str) -> CounterTrace:
+    raw_trace = f"not_holds_at(a,0,{path}).\nholds_at(b,0,{path}).\n"
+    return CounterTrace(raw_trace, path, name)
+
+
+def fake_violations(cts) -> list[str]:
+    """Every deadlock is required to be completed; with none left, a guarantee is violated."""
+    deadlocks = [f"entailed({ct.get_name()})" for ct in cts if ct.is_deadlock()]
+    return deadlocks or ["violation_holds(guarantee1,1,counter_strat_0_0)"]
+
+
+def two_completions(ct, spec):
+    return [[SimpleNamespace(name="a", value=True)], [SimpleNamespace(name="a", value=False)]]
+
+
+class TestCompleteCounterTraces(unittest.TestCase):
+    def setUp(self):
+        counter_trace._completion_assignments.clear()
+        self.ct0 = deadlock("counter_strat_0_0", "ini_S0_DEAD")
+        self.ct1 = deadlock("counter_strat_0_1", "ini_S1_DEAD")
+        self.data = RepairData(["trace"], counter_traces=[self.ct0, self.ct1],
+                               learning_type=Learning.GUARANTEE_WEAKENING)
+
+    def _complete(self, spec, data, **kwargs):
+        with patch("spec_repair.components.mitigators.mitigation_strategies.NewSpecEncoder") as encoder, \
+                patch("spec_repair.components.mitigators.mitigation_strategies.get_violations") as get_violations, \
+                patch("spec_repair.model.counter_trace.find_all_possible_deadlock_completion_assignments",
+                      side_effect=two_completions) as find_assignments:
+            encoder.encode_ASP.side_effect = lambda spec, trace, cts: tuple(cts)
+            get_violations.side_effect = lambda cts, exp_type: fake_violations(cts)
+            tasks = complete_counter_traces(spec, data, **kwargs)
+        return tasks, encoder.encode_ASP.call_count, find_assignments.call_count
+
+    def test_every_set_of_counter_traces_is_checked_once(self):
+        tasks, n_encoded, n_completed = self._complete(FakeSpec("s"), self.data)
+        # {ct0, ct1}; the 2 + 2 sets with one of them completed; the 4 sets with both completed
+        self.assertEqual(1 + 4 + 4, n_encoded)
+        # Each deadlock is completed once, however many sets it is part of
+        self.assertEqual(2, n_completed)
+        ctss = [tuple(data.counter_traces) for _, data in tasks]
+        self.assertEqual(4, len(set(map(frozenset, ctss))))
+        for cts in ctss:
+            self.assertEqual(["counter_strat_0_0", "counter_strat_0_1"], [ct.get_name() for ct in cts])
+            self.assertFalse(any(ct.is_deadlock() for ct in cts))
+        for _, data in tasks:
+            self.assertEqual(Learning.GUARANTEE_WEAKENING, data.learning_type)
+
+    def test_completions_are_remembered_across_calls(self):
+        self._complete(FakeSpec("s"), self.data)
+        _, _, n_completed = self._complete(FakeSpec("s"), self.data)
+        self.assertEqual(0, n_completed)
+        _, _, n_completed = self._complete(FakeSpec("t"), self.data)
+        self.assertEqual(2, n_completed)
+
+    def test_max_alternatives_caps_the_completions(self):
+        tasks, n_encoded, _ = self._complete(FakeSpec("s"), self.data, max_alternatives=1)
+        self.assertEqual(1, len(tasks))
+        self.assertFalse(any(ct.is_deadlock() for ct in tasks[0][1].counter_traces))
+        self.assertLess(n_encoded, 1 + 4 + 4)
+        tasks, _, _ = self._complete(FakeSpec("s"), self.data, max_alternatives=3)
+        self.assertEqual(3, len(tasks))
+
+    def test_counter_traces_without_deadlocks_are_kept(self):
+        data = RepairData(["trace"], counter_traces=[], learning_type=Learning.GUARANTEE_WEAKENING)
+        tasks, n_encoded, n_completed = self._complete(FakeSpec("s"), data)
+        self.assertEqual(1, len(tasks))
+        self.assertEqual([], tasks[0][1].counter_traces)
+        self.assertEqual((1, 0), (n_encoded, n_completed))
+
+    def test_no_violation_gives_up_the_branch(self):
+        with patch("spec_repair.components.mitigators.mitigation_strategies.NewSpecEncoder"), \
+                patch("spec_repair.components.mitigators.mitigation_strategies.get_violations", return_value=[]):
+            self.assertEqual([], complete_counter_traces(FakeSpec("s"), self.data))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -111,6 +111,25 @@ class TestCounterStrategyCycles(TestCase):
         self.assertEqual({'a': True}, t.inputs)
         self.assertEqual({'b': False}, t.outputs)
 
+    def test_iter_paths_stops_after_max_paths(self):
+        cs = self.parser.from_lines(
+            ['INI -> S0 {car:true} / {green:false};',
+             'INI -> S0 {car:true} / {green:true};',
+             'S0 -> S0 {car:false} / {green:false};',
+             'S0 -> DEAD {car:false} / {green:true};']
+        )
+        leaves = list(cs.iter_paths(max_paths=3))
+        self.assertEqual(cs.all_paths()[:3], [leaf.transitions() for leaf in leaves])
+        self.assertEqual(['INI_S0_S0', 'INI_S0_DEAD', 'INI_S0_S0'], [leaf.name() for leaf in leaves])
+        # Paths through the same first transition share its trie node
+        self.assertIs(leaves[0].parent, leaves[1].parent)
+
+    def test_root_token_makes_returning_to_initial_state_a_cycle_only_the_second_time(self):
+        cs = self.parser.from_lines(['INI -> S0 {a:true} / {b:false};',
+                                     'S0 -> INI {a:false} / {b:false};'])
+        self.assertEqual(['INI_S0_INI'], [leaf.name() for leaf in cs.iter_paths()])
+        self.assertEqual(['ini_S0_INI_S0'], [leaf.name() for leaf in cs.iter_paths(root_token="ini")])
+
     def test_empty_counter_strategy_has_no_paths(self):
         cs = CounterStrategy(transitions=[])
         self.assertEqual([], cs.all_paths())
@@ -1,9 +1,13 @@
 import os
+import pickle
 import unittest
 from functools import partial
 
+from py_ltl.formula import AtomicProposition
+
 from spec_repair.model.counter_strategy import CounterStrategy
-from spec_repair.model.counter_trace import CounterTrace, ct_from_cs, complete_cts_from_ct
+from spec_repair.model.counter_trace import CounterTrace, ct_from_cs, complete_cts_from_ct, cts_from_cs, \
+    complete_ct_with_deadlock_assignment
 from spec_repair.enums import Learning
 from spec_repair.helpers.parsers.spectra_cs_parser import SpectraCSParser
 from spec_repair.model.spectra_specification import SpectraSpecification
@@ -442,5 +446,74 @@ holds_at(pump,3,counter_strat_1_1).
         ct2 = CounterTrace(cs1_2_raw_trace, "ini_S0_DEAD", "counter_strat_0_0")
         self.assertNotEqual(ct1, ct2)
 
+    def test_ct_equality_ignores_literal_order(self):
+        reordered_raw_trace = "\n".join(reversed(cs1_1_raw_trace.splitlines())) + "\n"
+        ct1 = CounterTrace(cs1_1_raw_trace, "ini_S0_DEAD", "counter_strat_0_0")
+        ct2 = CounterTrace(reordered_raw_trace, "ini_S0_DEAD", "counter_strat_0_0")
+        self.assertEqual(ct1, ct2)
+        self.assertEqual(hash(ct1), hash(ct2))
+        self.assertEqual(reordered_raw_trace, ct2.get_raw_trace(is_named=False))
+        self.assertEqual(ct1.print_one_line(), ct2.print_one_line())
+
+    def test_ct_ordering_is_total(self):
+        cts = cts_from_cs(cs3, cs_id=0) + cts_from_cs(cs2, cs_id=1) + cts_from_cs(cs1, cs_id=2)
+        ordered = sorted(cts)
+        self.assertEqual(len(set(cts)), len(ordered))
+        for smaller, larger in zip(ordered, ordered[1:]):
+            self.assertLess(smaller, larger)
+            self.assertGreater(larger, smaller)
+        self.assertEqual(ordered, sorted(reversed(cts)))
+
+    def test_ct_survives_pickling(self):
+        ct = ct_from_cs(cs2, heuristic=first_choice, cs_id=1)
+        ct.get_asp_form()
+        unpickled = pickle.loads(pickle.dumps(ct))
+        self.assertEqual(ct, unpickled)
+        self.assertEqual(hash(ct), hash(unpickled))
+        self.assertEqual(ct.get_asp_form(), unpickled.get_asp_form())
+
+    def test_set_cs_id_renames_the_generated_forms(self):
+        ct = ct_from_cs(cs1, heuristic=first_choice, cs_id=0)
+        self.assertIn("counter_strat_0_0", ct.get_asp_form())
+        ct.set_cs_id(4)
+        self.assertNotIn("counter_strat_0_0", ct.get_asp_form())
+        self.assertIn("holds_at(pump,1,counter_strat_4_0).", ct.get_raw_trace())
+
+    def test_ct_metadata(self):
+        ct = ct_from_cs(cs2, heuristic=first_choice)
+        self.assertTrue(ct.is_deadlock())
+        self.assertEqual(3, ct.get_num_timepoints())
+        self.assertIsNone(ct.get_loop_start())
+        ct = ct_from_cs(cs3, heuristic=partial(nth_choice, -1))
+        self.assertFalse(ct.is_deadlock())
+        self.assertEqual(1, ct.get_loop_start())
+
+    def test_print_one_line(self):
+        ct = ct_from_cs(cs2, heuristic=first_choice)
+        self.assertEqual("CT(!highwater,!methane,!pump;!highwater,methane,pump;highwater,methane,!pump)",
+                         ct.print_one_line())
+
+    def test_ct_rejects_literals_of_other_traces(self):
+        with self.assertRaises(ValueError):
+            CounterTrace(cs1_1_raw_trace, "ini_S0_S1_DEAD")
+
+    def test_ct_with_deadlock_assignment(self):
+        ct = ct_from_cs(cs4, heuristic=partial(nth_choice, 0), cs_id=0)
+        completed = complete_ct_with_deadlock_assignment(
+            ct, [AtomicProposition(name="s", value=False), AtomicProposition(name="e", value=True)])
+        expected_ct_raw = """\
+not_holds_at(e,0,counter_strat_0_0).
+holds_at(s,0,counter_strat_0_0).
+not_holds_at(s,1,counter_strat_0_0).
+holds_at(e,1,counter_strat_0_0).\
+"""
+        self.assertEqual(expected_ct_raw, completed.get_raw_trace())
+        self.assertFalse(completed.is_deadlock())
+        self.assertTrue(ct.is_deadlock())
+        self.assertNotEqual(ct, completed)
+        self.assertEqual(1, ct.get_num_timepoints())
+        self.assertEqual(2, completed.get_num_timepoints())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -62,6 +62,30 @@ class TestNewSpecEncoder(BaseTestCase):
         expected_las_str: str = read_file(self.minepump_ilasp_file)
         self.assertEqual(expected_las_str, las_str)
 
+    def test_encode_ilasp_from_shared_encoding_with_explicit_heuristic(self):
+        spec: SpectraSpecification = SpectraSpecification.from_file(self.minepump_spec_file)
+        trace_name = "trace_name_0"
+        trace = [
+            f'not_holds_at(highwater,0,{trace_name}).\n',
+            f'not_holds_at(methane,0,{trace_name}).\n',
+            f'not_holds_at(pump,0,{trace_name}).\n',
+            '\n',
+            f'holds_at(highwater,1,{trace_name}).\n',
+            f'holds_at(methane,1,{trace_name}).\n',
+            f'not_holds_at(pump,1,{trace_name}).\n',
+            '\n'
+        ]
+        asp: str = read_file(self.minepump_clingo_file)
+        violations = get_violations(asp, exp_type=ExpType.ASSUMPTION)
+        shared = NewSpecEncoder.encode_ILASP_shared(spec, trace, [], violations, Learning.ASSUMPTION_WEAKENING)
+        # The encoder's own heuristic manager is ignored in favour of the one passed in
+        encoder: NewSpecEncoder = NewSpecEncoder(NoEventuallyHypothesisHeuristicManager())
+        las_str: str = encoder.encode_ILASP_with_heuristic(spec, shared, violations, Learning.ASSUMPTION_WEAKENING,
+                                                           NoFilterHeuristicManager())
+
+        expected_las_str: str = read_file(self.minepump_ilasp_file)
+        self.assertEqual(expected_las_str, las_str)
+
     def test_create_mode_bias_aw(self):
         spec: SpectraSpecification = SpectraSpecification.from_file(self.minepump_spec_file)
         violations: list[str] = [
@@ -105,6 +129,33 @@ class TestNewSpecEncoder(BaseTestCase):
         expected_mode_bias: str = read_file(self.traffic_updated_mode_bias_aw_file)
         self.assertEqual(expected_mode_bias, mode_bias)
 
+    def test_create_mode_bias_aw_traffic_updated_pruned(self):
+        spec: SpectraSpecification = SpectraSpecification.from_file(self.traffic_updated_spec_file)
+        violations: list[str] = [
+            """\
+    assumption(carA_idle_when_red)
+    assumption(carB_idle_when_red)
+    violation_holds(carA_idle_when_red,0,trace_name_0)
+    violation_holds(carB_idle_when_red,0,trace_name_0)\
+    """
+        ]
+        hm = NoFilterHeuristicManager()
+        full_mode_bias: str = NewSpecEncoder(hm)._create_mode_bias(spec, violations, Learning.ASSUMPTION_WEAKENING)
+        hm.set_enabled("PRUNE_HYPOTHESIS_SPACE")
+        encoder: NewSpecEncoder = NewSpecEncoder(hm)
+        mode_bias: str = encoder._create_mode_bias(spec, violations, Learning.ASSUMPTION_WEAKENING)
+
+        # Pruning only ever drops declarations (the index range may only narrow)
+        full_lines = {line for line in full_mode_bias.splitlines() if not line.startswith("#constant(index,")}
+        pruned_lines = {line for line in mode_bias.splitlines() if not line.startswith("#constant(index,")}
+        self.assertTrue(pruned_lines < full_lines)
+        self.assertNotIn("#constant(temp_op_v,eventually).", pruned_lines)
+        formula_names = ["carA_idle_when_red", "carB_idle_when_red"]
+        atoms, temp_ops, index = encoder._pruned_hypothesis_space(spec, formula_names, hm, sorted(spec.get_atoms()))
+        self.assertLessEqual(set(atoms), set(spec.get_atoms()))
+        self.assertLess(len(temp_ops), 4)
+        self.assertLessEqual(index, max(0, spec.get_max_disjuncts_in_antecedent() - 1))
+
     def test_create_mode_bias_aw_traffic_updated_no_ev(self):
         spec: SpectraSpecification = SpectraSpecification.from_file(self.traffic_updated_spec_file)
         violations: list[str] = [
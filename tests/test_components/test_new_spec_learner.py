@@ -1,10 +1,16 @@
+import subprocess
+import time
+from types import SimpleNamespace
 from typing import Any, Tuple
+from unittest.mock import patch
 
 from spec_repair.interfaces.ispecification import ISpecification
 from spec_repair.components.learners.optimising_final_spec_learner import OptimisingSpecLearner
 from spec_repair.components.repair_data import RepairData
 from spec_repair.enums import Learning
+from spec_repair.helpers.parsers.ilasp_interpreter import ILASPInterpreter
 from spec_repair.components.heuristic_managers.no_filter_heuristic_manager import NoFilterHeuristicManager
+from spec_repair.components.heuristic_managers.choose_first_heuristic_manager import ChooseFirstHeuristicManager
 from spec_repair.model.spectra_specification import SpectraSpecification
 from spec_repair.util.file_util import read_file_lines
 from tests.base_test_case import BaseTestCase
@@ -34,3 +40,65 @@ class TestNewSpecLearner(BaseTestCase):
         for i, expected_spec in enumerate(expected_specs):
             print(i)
             self.assertIn(expected_spec.to_str(), new_specs_str)
+
+
+class TestStreamedLearning(BaseTestCase):
+    SOLUTIONS = [["adaptation_1"], ["adaptation_2"], ["adaptation_3"]]
+
+    def _learn(self, heuristic_manager):
+        spec_learner = OptimisingSpecLearner(heuristic_manager, stream_solutions=True)
+        data = RepairData([], counter_traces=[], learning_type=Learning.ASSUMPTION_WEAKENING)
+        with patch.object(OptimisingSpecLearner, "stream_possible_adaptations",
+                          return_value=iter([list(solution) for solution in self.SOLUTIONS])), \
+                patch.object(OptimisingSpecLearner, "_new_task", side_effect=lambda spec, data, adaptations: adaptations):
+            return list(spec_learner.learn_new_iter("spec", data))
+
+    def test_no_filter_yields_every_solution(self):
+        self.assertEqual(self.SOLUTIONS, self._learn(NoFilterHeuristicManager()))
+
+    def test_choose_first_yields_only_the_first_solution(self):
+        self.assertEqual(self.SOLUTIONS[:1], self._learn(ChooseFirstHeuristicManager()))
+
+
+class TestStreamedLearningFailures(BaseTestCase):
+    ADAPTATIONS = [SimpleNamespace(type="ev_temp_op")]
+
+    def _stream(self, error: Exception):
+        """Streams from three searches: the first finds a solution, the other two then fail with error."""
+        spec_learner = OptimisingSpecLearner(NoFilterHeuristicManager())
+        ilasp_tasks = iter(["solution", "failure", "failure"])
+
+        def iter_learned_possible_adaptations(ilasp):
+            if ilasp == "solution":
+                yield 0, self.ADAPTATIONS
+            else:
+                time.sleep(0.05)
+                raise error
+
+        with patch.object(OptimisingSpecLearner, "get_spec_violations", return_value=[]), \
+                patch.object(spec_learner.spec_encoder, "encode_ILASP_shared"), \
+                patch.object(spec_learner.spec_encoder, "encode_ILASP_with_heuristic",
+                             side_effect=lambda *args: next(ilasp_tasks)), \
+                patch("spec_repair.components.learners.optimising_final_spec_learner.stream_ILASP",
+                      side_effect=lambda ilasp, deadline: ilasp), \
+                patch.object(ILASPInterpreter, "iter_learned_possible_adaptations",
+                             side_effect=iter_learned_possible_adaptations):
+            streamed = []
+            try:
+                for adaptations in spec_learner.stream_possible_adaptations("spec", [], [], Learning.ASSUMPTION_WEAKENING):
+                    streamed.append(adaptations)
+            finally:
+                self.assertEqual([self.ADAPTATIONS], streamed)
+
+    def test_timeout_after_a_solution_ends_the_stream(self):
+        self._stream(subprocess.TimeoutExpired("ILASP", 1))
+
+    def test_other_errors_are_raised_after_a_solution(self):
+        with self.assertRaises(ValueError):
+            self._stream(ValueError("malformed ILASP output"))
+
+    def test_tasks_after_failure_raises_unexpected_errors(self):
+        data = RepairData([], counter_traces=[], learning_type=Learning.ASSUMPTION_WEAKENING)
+        self.assertEqual([], OptimisingSpecLearner._tasks_after_failure("spec", data, subprocess.TimeoutExpired("ILASP", 1)))
+        with self.assertRaises(ValueError):
+            OptimisingSpecLearner._tasks_after_failure("spec", data, ValueError("malformed ILASP output"))
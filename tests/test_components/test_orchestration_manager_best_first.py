@@ -0,0 +1,48 @@
+from copy import deepcopy
+
+from spec_repair.components.orchestration_managers.orchestration_manager_best_first import \
+    OrchestrationManagerBestFirst, TaskHeap, Lexicographic, counter_trace_count, learning_steps
+from spec_repair.components.repair_data import RepairData
+from spec_repair.enums import Learning
+from spec_repair.model.counter_trace import CounterTrace
+from spec_repair.model.spectra_specification import SpectraSpecification
+from spec_repair.util.file_util import read_file_lines
+from tests.base_test_case import BaseTestCase
+from tests.test_components.test_orchestration_manager_semantic_equivalence import ct_raw_trace, ct_path, ct_name
+
+
+class TestTaskHeap(BaseTestCase):
+    def test_pops_lowest_score_first_then_in_queue_order(self):
+        heap = TaskHeap(learning_steps)
+        for name, steps in [("a", 2), ("b", 0), ("c", 1), ("d", 0)]:
+            heap.append((name, RepairData(learning_steps=steps)))
+        self.assertEqual(["b", "d", "c", "a"], [spec for spec, _ in heap])
+        self.assertEqual(["b", "d", "c", "a"], [heap.popleft()[0] for _ in range(4)])
+        self.assertFalse(heap)
+
+    def test_lexicographic_breaks_ties_with_later_scorers(self):
+        heap = TaskHeap(Lexicographic(learning_steps, counter_trace_count))
+        heap.append(("a", RepairData(counter_traces=["ct", "ct"], learning_steps=1)))
+        heap.append(("b", RepairData(counter_traces=["ct"], learning_steps=1)))
+        heap.append(("c", RepairData(counter_traces=["ct", "ct", "ct"], learning_steps=0)))
+        self.assertEqual(["c", "b", "a"], [spec for spec, _ in heap])
+
+
+class TestOrchestrationManagerBestFirst(BaseTestCase):
+    def test_explores_the_best_scored_task_first(self):
+        om = OrchestrationManagerBestFirst(counter_trace_count)
+        case_study_path = '../input-files/case-studies/spectra/strengthened/minepump'
+        spec: SpectraSpecification = SpectraSpecification.from_file(f"{case_study_path}/strong.spectra")
+        spec_1: SpectraSpecification = SpectraSpecification.from_file("./test_files/minepump_aw_methane.spectra")
+        trace: list[str] = read_file_lines(f"{case_study_path}/violation_trace.txt")
+        ct = CounterTrace(raw_trace=ct_raw_trace, raw_path=ct_path, name=ct_name)
+        data: RepairData = RepairData(trace, [ct], Learning.ASSUMPTION_WEAKENING, [], [], 0)
+        data_1: RepairData = RepairData(trace, [], Learning.ASSUMPTION_WEAKENING, [], [], 1)
+        om.initialise_learning_tasks(spec, data)
+        om.enqueue_new_tasks(spec_1, data_1)
+        # A duplicate is still deduped, whatever its score
+        om.enqueue_new_tasks(deepcopy(spec), deepcopy(data))
+        self.assertEqual(2, len(om._stack))
+        self.assertEqual(spec_1.to_str(), om.get_next()[0].to_str())
+        self.assertEqual(spec.to_str(), om.get_next()[0].to_str())
+        self.assertFalse(om.has_next())
@@ -1,8 +1,10 @@
 import unittest
 from typing import Optional
 
-from spec_repair.components.oracles.spectra_gr1_oracle import SpectraGR1Oracle
+from spec_repair.components.oracles.spectra_gr1_oracle import SpectraGR1Oracle, filter_counter_traces, \
+    violated_guarantees_of_counter_traces
 from spec_repair.model.counter_strategy import CounterStrategy
+from spec_repair.model.counter_trace import cts_from_cs
 from spec_repair.helpers.parsers.spectra_cs_parser import SpectraCSParser
 from spec_repair.model.spectra_specification import SpectraSpecification
 from tests.base_test_case import BaseTestCase
@@ -70,6 +72,18 @@ class TestSpectraSpecOracle(BaseTestCase):
         cs: Optional[CounterStrategy] = spec_oracle._synthesise_and_check(weakened_spec)
         self.assertIsNone(cs)
 
+    def test_violated_guarantees_of_counter_traces_batched(self):
+        spec_oracle = SpectraGR1Oracle()
+        weakened_spec: SpectraSpecification = SpectraSpecification.from_file('./test_files/minepump_aw_pump.spectra')
+        cts = cts_from_cs(spec_oracle._synthesise_and_check(weakened_spec), cs_id=0)
+
+        violated = violated_guarantees_of_counter_traces(cts, weakened_spec)
+
+        self.assertEqual({ct.get_name() for ct in cts}, set(violated.keys()))
+        batched = filter_counter_traces(cts, weakened_spec, batched=True)
+        per_trace = filter_counter_traces(cts, weakened_spec)
+        self.assertEqual(batched, per_trace)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,47 @@
+from typing import Optional
+from unittest import TestCase
+
+from spec_repair.components.subsumption_pruner import SubsumptionPruner
+from spec_repair.ltl_types import GR1FormulaType
+from spec_repair.util import spot_cache
+
+
+class SpotSpec:
+    def __init__(self, asm: str, gar: str):
+        self.asm = asm
+        self.gar = gar
+
+    def to_spot_str(self, formula_type: Optional[GR1FormulaType] = None) -> str:
+        if formula_type == GR1FormulaType.ASM:
+            return self.asm
+        if formula_type == GR1FormulaType.GAR:
+            return self.gar
+        return f"({self.asm}) -> ({self.gar})"
+
+
+class TestSubsumptionPruner(TestCase):
+    def setUp(self):
+        spot_cache.clear()
+        self.pruner = SubsumptionPruner()
+        self.pruner.add(SpotSpec("G(a)", "G(b)"))
+
+    def test_weaker_assumptions_are_dominated(self):
+        self.assertTrue(self.pruner.is_dominated(SpotSpec("G(a | c)", "G(b)")))
+
+    def test_weaker_guarantees_are_dominated(self):
+        self.assertTrue(self.pruner.is_dominated(SpotSpec("G(a)", "G(b | c)")))
+
+    def test_stronger_or_equivalent_specs_are_not_dominated(self):
+        self.assertFalse(self.pruner.is_dominated(SpotSpec("G(a & c)", "G(b & c)")))
+        self.assertFalse(self.pruner.is_dominated(SpotSpec("G(a)", "G(!(!b))")))
+
+    def test_incomparable_specs_are_not_dominated(self):
+        self.assertFalse(self.pruner.is_dominated(SpotSpec("G(c)", "G(d)")))
+
+    def test_nothing_is_dominated_without_repairs(self):
+        self.assertFalse(SubsumptionPruner().is_dominated(SpotSpec("G(a | c)", "G(b | c)")))
+
+    def test_repairs_are_indexed_once(self):
+        self.pruner.update([SpotSpec("G(a)", "G(b)"), SpotSpec("G(c)", "G(d)")])
+        self.assertEqual(2, len(self.pruner))
+        self.assertTrue(self.pruner.is_dominated(SpotSpec("G(c | e)", "G(d)")))
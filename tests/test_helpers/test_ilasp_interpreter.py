@@ -160,3 +160,32 @@ antecedent_exception(carA_idle_when_red,0,V1,V2) :- timepoint_of_op(current,V1,V
         self.assertEqual(solution[2][1][1], "antecedent_exception(carA_idle_when_red,0,V1,V2) :- timepoint_of_op(current,V1,V1,V2); holds_at(carB,V1,V2).")
         self.assertEqual(solution[9][1][0], "antecedent_exception(carB_idle_when_red,0,V1,V2) :- timepoint_of_op(current,V1,V1,V2); holds_at(carA,V1,V2).")
         self.assertEqual(solution[9][1][1], "antecedent_exception(carA_idle_when_red,0,V1,V2) :- timepoint_of_op(current,V1,V1,V2); holds_at(emergency,V1,V2).")
+
+    def test_iter_learned_possible_adaptations_raw_yields_each_solution_once_complete(self):
+        lines = [
+            "%% Solution 1 (score 3) ",
+            "antecedent_exception(carB_idle_when_red,0,V1,V2) :- timepoint_of_op(current,V1,V1,V2); holds_at(carA,V1,V2).",
+            "antecedent_exception(carA_idle_when_red,0,V1,V2) :- timepoint_of_op(current,V1,V1,V2); holds_at(carB,V1,V2).",
+            "",
+            "%% Solution 2 (score 4) ",
+            "ev_temp_op(carA_idle_when_red).",
+            "%%%%%%%%%%%%%%%%",
+            "%% Total                                   : 0.745s",
+        ]
+        lines_read = []
+
+        def printed_lines():
+            for line in lines:
+                lines_read.append(line)
+                yield line
+
+        solutions = ILASPInterpreter.iter_learned_possible_adaptations_raw(printed_lines())
+        self.assertEqual((3, lines[1:3]), next(solutions))
+        # Solution 1 is handed over at the blank line after it, before ILASP prints solution 2
+        self.assertEqual(4, len(lines_read))
+        self.assertEqual([(4, [lines[5]])], list(solutions))
+        self.assertEqual(ILASPInterpreter.extract_learned_possible_adaptations_raw("\n".join(lines)),
+                         list(ILASPInterpreter.iter_learned_possible_adaptations_raw(lines)))
+
+    def test_iter_learned_possible_adaptations_raw_unsatisfiable(self):
+        self.assertEqual([], list(ILASPInterpreter.iter_learned_possible_adaptations_raw(["UNSATISFIABLE"])))
@@ -1,3 +1,5 @@
+from copy import deepcopy
+
 import numpy as np
 import pandas as pd
 import spot
@@ -210,6 +212,57 @@ class TestSpectraSpecification(BaseTestCase):
         for formula in formulas:
             self.assertIn(formula.to_str(self.formatter), expected_formulas)
 
+    def test_integrate_into_copy_leaves_original_untouched(self):
+        spec = SpectraSpecification.from_file("./test_files/minepump_strong.spectra")
+        original_str = spec.to_str()
+        spec_copy = deepcopy(spec)
+        # Unchanged formulas are shared between a spec and its copies...
+        self.assertIs(spec.get_formula('assumption2_1'), spec_copy.get_formula('assumption2_1'))
+
+        spec_copy.integrate(Adaptation(
+            type='antecedent_exception',
+            formula_name='assumption2_1',
+            disjunction_index=0,
+            atom_temporal_operators=[('current', 'methane=true')]
+        ))
+
+        # ...until one of them changes
+        self.assertEqual(original_str, spec.to_str())
+        self.assertNotEqual(original_str, spec_copy.to_str())
+        self.assertIsNot(spec.get_formula('assumption2_1'), spec_copy.get_formula('assumption2_1'))
+        self.assertIs(spec.get_formula('guarantee1_1'), spec_copy.get_formula('guarantee1_1'))
+
+    def test_spot_str_follows_integration(self):
+        spec = SpectraSpecification.from_file("./test_files/minepump_strong.spectra")
+        original_spot_str = spec.to_spot_str(GR1FormulaType.ASM)
+        spec_copy = deepcopy(spec)
+        spec_copy.integrate(Adaptation(
+            type='antecedent_exception',
+            formula_name='assumption2_1',
+            disjunction_index=0,
+            atom_temporal_operators=[('current', 'methane=true')]
+        ))
+        self.assertEqual(original_spot_str, spec.to_spot_str(GR1FormulaType.ASM))
+        self.assertNotEqual(original_spot_str, spec_copy.to_spot_str(GR1FormulaType.ASM))
+        self.assertEqual(spec_copy.to_formatted_string(SpotSpecificationFormatter(GR1FormulaType.ASM)),
+                         spec_copy.to_spot_str(GR1FormulaType.ASM))
+        self.assertFalse(spec.equivalent_to(spec_copy, GR1FormulaType.ASM))
+        self.assertTrue(spec.equivalent_to(spec_copy, GR1FormulaType.GAR))
+
+    def test_formulas_df_view_round_trip(self):
+        spec = SpectraSpecification.from_file("./test_files/minepump_strong.spectra")
+        df = spec._formulas_df
+        self.assertEqual(["name", "type", "when", "formula"], list(df.columns))
+        self.assertEqual(spec.get_formula_names(), list(df["name"]))
+        self.assertEqual(spec.get_formula_names(GR1FormulaType.GAR),
+                         list(spec.filter(lambda x: x['type'] == GR1FormulaType.GAR)["name"]))
+
+        spec_copy = deepcopy(spec)
+        spec_copy._formulas_df = df[df["type"] == GR1FormulaType.ASM]
+        self.assertEqual(spec.get_formula_names(GR1FormulaType.ASM), spec_copy.get_formula_names())
+        self.assertEqual(spec.extract_sub_specification_of_type(GR1FormulaType.ASM).to_str(),
+                         spec.extract_sub_specification(lambda x: x['type'] == GR1FormulaType.ASM).to_str())
+
     def test_integrate_learning_rule_multiple(self):
         spec_file = "./test_files/minepump_strong.spectra"
         spec = SpectraSpecification.from_file(spec_file)
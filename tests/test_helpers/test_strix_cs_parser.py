@@ -20,7 +20,8 @@ same source state always share inputs and may differ only in outputs.
 import unittest
 from unittest import TestCase
 
-from spec_repair.helpers.parsers.strix_cs_parser import _parse_guard, _enumerate_satisfying, StrixCSParser
+from spec_repair.helpers.parsers.strix_cs_parser import _parse_guard, _enumerate_satisfying, _cube_cover, \
+    StrixCSParser
 
 # ── Shared fixture ─────────────────────────────────────────────────────────────
 
@@ -145,6 +146,22 @@ class TestGuardParsing(TestCase):
         results = _enumerate_satisfying(guard, 2)
         self.assertEqual([], results)
 
+    def test_cube_cover_only_mentions_constrained_aps(self):
+        # !(1 | !0) = 0 & !1; APs 2.. are never branched on
+        self.assertEqual([{0: True, 1: False}], _cube_cover(_parse_guard("!(1 | !0)")))
+
+    def test_cube_cover_is_disjoint(self):
+        # 0 | 1 = !0 & 1, or 0 (whatever 1 is)
+        self.assertEqual([{0: False, 1: True}, {0: True}], _cube_cover(_parse_guard("0 | 1")))
+
+    def test_cube_cover_of_constants(self):
+        self.assertEqual([{}], _cube_cover(_parse_guard("(t) & (t)")))
+        self.assertEqual([], _cube_cover(_parse_guard("!t")))
+
+    def test_enumeration_does_not_depend_on_alphabet_size_for_constrained_aps(self):
+        results = _enumerate_satisfying(_parse_guard("0 & !1 & 2"), 3)
+        self.assertEqual([{0: True, 1: False, 2: True}], results)
+
 
 # ── Header parsing ─────────────────────────────────────────────────────────────
 
@@ -293,6 +310,32 @@ class TestMinePumpTransitions(TestCase):
         self.assertEqual(5, len(paths))
 
 
+class TestSymbolicDontCares(TestCase):
+    """With symbolic_dont_cares, APs a guard leaves free are left out of its transitions."""
+
+    def setUp(self):
+        self.cs = StrixCSParser.from_str(MINE_PUMP_HOA, symbolic_dont_cares=True)
+
+    def test_one_transition_per_cube(self):
+        # INI keeps its two (pump is constrained); S0 and S1 leave pump free
+        self.assertEqual(4, len(self.cs))
+        self.assertEqual(2, len(self.cs.transitions_from("INI")))
+
+    def test_free_aps_are_left_out(self):
+        [s0] = self.cs.transitions_from("S0")
+        self.assertEqual({'methane': True, 'highwater': False}, s0.inputs)
+        self.assertEqual({}, s0.outputs)
+
+    def test_transition_count_does_not_grow_with_the_alphabet(self):
+        ap_count = 20
+        hoa = (f'HOA: v1\nStart: 0\nAP: {ap_count} ' + " ".join(f'"p{i}"' for i in range(ap_count)) + '\n'
+               'controllable-AP: 0\n--BODY--\nState: 0\n[0 & !1] 1\nState: 1\n[t] 1\n--END--\n')
+        cs = StrixCSParser.from_str(hoa, symbolic_dont_cares=True)
+        self.assertEqual(1, len(cs))
+        self.assertEqual({'p0': True}, cs.transitions[0].inputs)
+        self.assertEqual({'p1': False}, cs.transitions[0].outputs)
+
+
 # ── Loop counter-strategy ─────────────────────────────────────────────────────
 
 class TestLoopCounterStrategy(TestCase):
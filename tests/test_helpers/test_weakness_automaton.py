@@ -0,0 +1,94 @@
+import random
+import unittest
+
+import numpy as np
+import scipy.sparse as sp
+
+from spec_repair.helpers.weakness_measurement.automaton import Automaton, spectralRadius
+
+VARS = ["a", "b"]
+
+
+def manual_automaton(numstates, edges, accepting_states):
+    automaton = Automaton("manual")
+    automaton.numstates = numstates
+    automaton.edges = edges
+    automaton.init_states = [0]
+    automaton.accepting_states = accepting_states
+    automaton.var_set = VARS
+    automaton.constrained_var_set = VARS
+    automaton.reduced = True
+    return automaton
+
+
+def random_strongly_connected_edges(rng, numstates, extra_edges):
+    """A ring through all the states, plus random edges; multiplicities are those of labels over VARS."""
+    edges = [[s, "TRUE", (s + 1) % numstates, 4] for s in range(numstates)]
+    edges += [[rng.randrange(numstates), "a", rng.randrange(numstates), 2] for _ in range(extra_edges)]
+    return edges
+
+
+def dense_spectral_radius(matrix):
+    return np.max(np.absolute(np.linalg.eig(matrix.toarray())[0]))
+
+
+class TestSpectralRadius(unittest.TestCase):
+    def test_sparse_matches_dense(self):
+        rng = random.Random(0)
+        for numstates in (40, 150, 400):
+            automaton = manual_automaton(numstates, random_strongly_connected_edges(rng, numstates, numstates),
+                                         [0])
+            matrix = automaton.getAdjacencyMatrix()
+            self.assertTrue(np.isclose(dense_spectral_radius(matrix), spectralRadius(matrix, dense_max_states=0),
+                                       1e-9, 1e-9))
+
+    def test_periodic_scc(self):
+        # A plain cycle: every eigenvalue has modulus 1
+        matrix = sp.csr_matrix((np.ones(100), (np.arange(100), (np.arange(100) + 1) % 100)), shape=(100, 100))
+        self.assertTrue(np.isclose(1, spectralRadius(matrix, dense_max_states=0), 1e-9, 1e-9))
+
+    def test_tiny_sccs_are_solved_densely(self):
+        self.assertEqual(0, spectralRadius(sp.csr_matrix((1, 1))))
+        self.assertEqual(3, spectralRadius(sp.csr_matrix([[3]])))
+
+
+class TestAutomatonGraph(unittest.TestCase):
+    def test_adjacency_matrix_keeps_the_last_of_parallel_edges(self):
+        automaton = manual_automaton(2, [[0, "a", 1, 2], [0, "TRUE", 1, 4], [1, "TRUE", 0, 4]], [0])
+        self.assertEqual([[0, 4], [4, 0]], automaton.getAdjacencyMatrix().toarray().tolist())
+
+    def test_adjacency_lists(self):
+        automaton = manual_automaton(3, [[0, "a", 1, 2], [0, "TRUE", 2, 4], [2, "TRUE", 0, 4]], [0])
+        self.assertEqual({0: [1, 2], 1: [], 2: [0]}, automaton.getAdjacencyList())
+        self.assertEqual({0: [2], 1: [0], 2: [0]}, automaton.getCoReachabilityList())
+
+    def test_entropies_match_dense_eigendecomposition(self):
+        rng = random.Random(1)
+        # Two SCCs, large enough to go through ARPACK: states 0-99 and 100-299, with an edge from the first to the second
+        edges = random_strongly_connected_edges(rng, 100, 50)
+        edges += [[100 + s, label, 100 + d, m] for s, label, d, m in random_strongly_connected_edges(rng, 200, 300)]
+        edges.append([0, "b", 100, 2])
+        automaton = manual_automaton(300, edges, [0, 150])
+        matrix = automaton.getAdjacencyMatrix()
+        for scc, entropy in zip(automaton.getSCCs(), automaton.getEntropiesSCCs()):
+            expected = np.log2(dense_spectral_radius(matrix[scc, :][:, scc])) / len(VARS)
+            self.assertTrue(np.isclose(expected, entropy, 1e-9, 1e-9))
+        self.assertEqual(2, len(automaton.getAcceptingSCCs()))
+
+    def test_reachability_of_long_chains(self):
+        automaton = manual_automaton(5000, [[s, "TRUE", s + 1, 4] for s in range(4999)] + [[4999, "TRUE", 4999, 4]],
+                                     [4999])
+        self.assertEqual(5000, len(automaton.reachable(automaton.getAdjacencyList(), 0, set())))
+        self.assertEqual(5000, len(automaton.getCoReachableSCCs()))
+
+    def test_subgraph_leaves_the_automaton_unchanged(self):
+        edges = [[0, "TRUE", 1, 4], [1, "TRUE", 0, 4], [2, "a", 3, 2], [3, "a", 2, 2], [1, "b", 2, 2]]
+        automaton = manual_automaton(4, [list(edge) for edge in edges], [0, 3])
+        subgraph = automaton.getSubgraph([2, 3])
+        self.assertEqual([[0, "a", 1, 2], [1, "a", 0, 2]], subgraph.edges)
+        self.assertEqual([1], subgraph.accepting_states)
+        self.assertEqual(edges, automaton.edges)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import os
+import shutil
+import tempfile
+import unittest
+from copy import deepcopy
+
+from main.bfs_repair_orchestrator import BFSRepairOrchestrator
+from spec_repair.components.orchestration_managers.orchestration_manager_syntactic_equivalence import \
+    OrchestrationManagerSyntacticEquivalence
+from spec_repair.components.recorders.unique_recorder import UniqueRecorder
+from spec_repair.components.repair_data import RepairData
+from spec_repair.enums import Learning
+from spec_repair.loggers.spec_logger import SpecLogger
+
+
+class FakeSpec:
+    def __init__(self, name: str):
+        self.name = name
+
+    def to_str(self) -> str:
+        return self.name
+
+    def __eq__(self, other):
+        return isinstance(other, FakeSpec) and self.name == other.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+
+class FakeCounterTrace(str):
+    def print_one_line(self) -> str:
+        return str(self)
+
+    def print_multi_line(self) -> str:
+        return str(self)
+
+
+class FakeLearner:
+    """Two weakenings of every spec, up to three learning steps deep; crashes on call number crash_at."""
+
+    def __init__(self, crash_at=None):
+        self._hm = None
+        self.calls = 0
+        self.crash_at = crash_at
+
+    def learn_new_iter(self, spec, data):
+        self.calls += 1
+        if self.calls == self.crash_at:
+            raise RuntimeError("Simulated crash")
+        if data.learning_steps >= 3:
+            return
+        for weakening in "ab":
+            new_data = deepcopy(data)
+            new_data.learning_steps += 1
+            new_data.adaptation_history.append([f"{weakening}({spec.name})"])
+            yield FakeSpec(spec.name + weakening), new_data
+
+
+class FakeOracle:
+    """Specs ending in b are repairs; the others get a counter-trace."""
+
+    def __init__(self):
+        self._hm = None
+        self._ct_cnt = 0
+        self.closed = False
+
+    def is_valid_or_counter_arguments(self, spec, data):
+        if spec.name.endswith("b"):
+            return None
+        self._ct_cnt += 1
+        return [(FakeCounterTrace(f"ct_{spec.name}"), data)]
+
+    def get_counter_strategy_count(self) -> int:
+        return self._ct_cnt
+
+    def set_counter_strategy_count(self, count: int):
+        self._ct_cnt = count
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDiscriminator:
+    def get_learning_strategy(self, spec, data):
+        return "aw"
+
+
+class FakeMitigator:
+    def __init__(self):
+        self._hm = None
+
+    def prepare_learning_task(self, spec, data, learned_spec, counter_example):
+        new_data = deepcopy(data)
+        new_data.counter_traces.append(counter_example)
+        return learned_spec, new_data
+
+    def prepare_alternative_learning_tasks(self, spec, data):
+        return []
+
+
+class TestBFSCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.checkpoint_file = os.path.join(self.tmp, "run.checkpoint")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _repairer(self, learner: FakeLearner) -> BFSRepairOrchestrator:
+        return BFSRepairOrchestrator(
+            {"aw": learner}, FakeOracle(), FakeDiscriminator(), FakeMitigator(),
+            om=OrchestrationManagerSyntacticEquivalence(),
+            recorder=UniqueRecorder(), intermediate_recorder=UniqueRecorder(),
+            logger=SpecLogger(os.path.join(self.tmp, "log.txt"))
+        )
+
+    @staticmethod
+    def _repair(repairer: BFSRepairOrchestrator):
+        repairer.repair_bfs(FakeSpec("s"), RepairData(["trace"], counter_traces=[],
+                                                      learning_type=Learning.ASSUMPTION_WEAKENING))
+
+    def test_resumed_run_matches_uninterrupted_run(self):
+        uninterrupted = self._repairer(FakeLearner())
+        self._repair(uninterrupted)
+
+        crashed_learner = FakeLearner(crash_at=4)
+        crashed = self._repairer(crashed_learner)
+        crashed.set_checkpoint(self.checkpoint_file, interval=0)
+        with self.assertRaises(RuntimeError):
+            self._repair(crashed)
+        self.assertTrue(os.path.exists(self.checkpoint_file))
+        self.assertTrue(crashed._oracle.closed)
+
+        resumed_learner = FakeLearner()
+        resumed = self._repairer(resumed_learner)
+        resumed.set_checkpoint(self.checkpoint_file, interval=0)
+        self._repair(resumed)
+
+        # The three tasks checked before the crash are not learned again
+        self.assertEqual(uninterrupted._learners["aw"].calls - 3, resumed_learner.calls)
+        # UniqueRecorder keeps its values in a set, whose order an unpickled copy needn't share
+        self.assertEqual(set(uninterrupted.recorder.get_all_values()), set(resumed.recorder.get_all_values()))
+        self.assertEqual(set(uninterrupted.intermediate_recorder.get_all_values()),
+                         set(resumed.intermediate_recorder.get_all_values()))
+        self.assertEqual(list(uninterrupted._om._graph.edges), list(resumed._om._graph.edges))
+        self.assertEqual(uninterrupted._oracle.get_counter_strategy_count(),
+                         resumed._oracle.get_counter_strategy_count())
+        self.assertFalse(os.path.exists(self.checkpoint_file))
+
+    def test_checkpoint_of_another_run_is_rejected(self):
+        crashed = self._repairer(FakeLearner(crash_at=2))
+        crashed.set_checkpoint(self.checkpoint_file, interval=0)
+        with self.assertRaises(RuntimeError):
+            self._repair(crashed)
+
+        other = self._repairer(FakeLearner())
+        other.set_checkpoint(self.checkpoint_file, interval=0)
+        with self.assertRaises(ValueError):
+            other.repair_bfs(FakeSpec("t"), RepairData(["trace"], counter_traces=[],
+                                                       learning_type=Learning.ASSUMPTION_WEAKENING))
@@ -374,7 +374,7 @@ class TestBFSRepairOrchestrator(BaseTestCase):
         builder = (BFSRepairOrchestratorBuilder.assumption_only()
                    .enabling("INCLUDE_NEXT", "INCLUDE_PREV")
                    .with_log_file(log_file)
-                   .with_on_record(lambda r, idx, s, d: save_layered_graph(r._om._graph, out_test_dir_name)))
+                   .with_on_record(lambda r, idx, s, d: save_layered_graph(r._om.export_graph(), out_test_dir_name)))
         if is_debug:
             builder.with_debug_dir(out_test_dir_name)
         repairer: BFSRepairOrchestrator = builder.build()
@@ -382,7 +382,7 @@ class TestBFSRepairOrchestrator(BaseTestCase):
         repairer.repair_bfs(spec, RepairData(trace, counter_traces=[], learning_type=Learning.ASSUMPTION_WEAKENING))
         intermediate_spec_strings: list[str] = repairer.intermediate_recorder.get_specs()
         new_spec_strings: list[str] = repairer.recorder.get_specs()
-        save_layered_graph(repairer._om._graph, out_test_dir_name)
+        save_layered_graph(repairer._om.export_graph(), out_test_dir_name)
         return intermediate_spec_strings, new_spec_strings
 
     def run_bfs_repair_sem_unique(self, case_study_name, case_study_path, out_test_dir_name=None, is_debug=False):
@@ -399,14 +399,14 @@ class TestBFSRepairOrchestrator(BaseTestCase):
         builder = (BFSRepairOrchestratorBuilder.semantic()
                    .enabling("INCLUDE_NEXT", "INCLUDE_PREV")
                    .with_log_file(log_file)
-                   .with_on_record(lambda r, idx, s, d: save_layered_graph(r._om._graph, out_test_dir_name)))
+                   .with_on_record(lambda r, idx, s, d: save_layered_graph(r._om.export_graph(), out_test_dir_name)))
         if is_debug:
             builder.with_debug_dir(out_test_dir_name)
         repairer: BFSRepairOrchestrator = builder.build()
 
         repairer.repair_bfs(spec, RepairData(trace, counter_traces=[], learning_type=Learning.ASSUMPTION_WEAKENING))
         new_spec_strings: list[str] = repairer.recorder.get_specs()
-        save_layered_graph(repairer._om._graph, out_test_dir_name)
+        save_layered_graph(repairer._om.export_graph(), out_test_dir_name)
         return new_spec_strings
 
     def run_single_repair(self, case_study_name, case_study_path, out_test_dir_name, is_debug=False):
@@ -454,12 +454,12 @@ class TestBFSRepairOrchestrator(BaseTestCase):
         builder = (BFSRepairOrchestratorBuilder.syntactic()
                    .enabling("INCLUDE_NEXT", "INCLUDE_PREV")
                    .with_log_file(log_file)
-                   .with_on_record(lambda r, idx, s, d: save_layered_graph(r._om._graph, out_test_dir_name)))
+                   .with_on_record(lambda r, idx, s, d: save_layered_graph(r._om.export_graph(), out_test_dir_name)))
         if is_debug:
             builder.with_debug_dir(out_test_dir_name)
         repairer: BFSRepairOrchestrator = builder.build()
 
         repairer.repair_bfs(spec, RepairData(trace, counter_traces=[], learning_type=Learning.ASSUMPTION_WEAKENING))
         new_spec_strings: list[str] = repairer.recorder.get_specs()
-        save_layered_graph(repairer._om._graph, out_test_dir_name)
+        save_layered_graph(repairer._om.export_graph(), out_test_dir_name)
         return new_spec_strings
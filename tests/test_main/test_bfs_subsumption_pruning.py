@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from main.bfs_repair_orchestrator import BFSRepairOrchestrator
+from spec_repair.components.orchestration_managers.orchestration_manager_syntactic_equivalence import \
+    OrchestrationManagerSyntacticEquivalence
+from spec_repair.components.recorders.unique_recorder import UniqueRecorder
+from spec_repair.components.repair_data import RepairData
+from spec_repair.components.subsumption_pruner import SubsumptionPruner
+from spec_repair.enums import Learning
+from spec_repair.loggers.spec_logger import SpecLogger
+from tests.test_main.test_bfs_checkpoint import FakeDiscriminator, FakeLearner, FakeMitigator, FakeOracle, FakeSpec
+
+
+class NameSubsumptionPruner(SubsumptionPruner):
+    """Once any repair is recorded, every spec weakened by "a" first is dominated."""
+
+    def add(self, repair):
+        self._indexed.add(repair.name)
+
+    def is_dominated(self, spec) -> bool:
+        return bool(self._indexed) and spec.name.startswith("sa")
+
+
+class TestBFSSubsumptionPruning(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _repair(self, pruner=None) -> BFSRepairOrchestrator:
+        repairer = BFSRepairOrchestrator(
+            {"aw": FakeLearner()}, FakeOracle(), FakeDiscriminator(), FakeMitigator(),
+            om=OrchestrationManagerSyntacticEquivalence(),
+            recorder=UniqueRecorder(), intermediate_recorder=UniqueRecorder(),
+            logger=SpecLogger(os.path.join(self.tmp, "log.txt"))
+        )
+        repairer.set_subsumption_pruner(pruner)
+        repairer.repair_bfs(FakeSpec("s"), RepairData(["trace"], counter_traces=[],
+                                                      learning_type=Learning.ASSUMPTION_WEAKENING))
+        return repairer
+
+    def test_dominated_tasks_are_not_learned_from(self):
+        unpruned = self._repair()
+        self.assertEqual({"sb", "sab", "saab"}, {spec.name for spec in unpruned.recorder.get_all_values()})
+        self.assertEqual(0, unpruned._pruned_cnt)
+
+        pruned = self._repair(NameSubsumptionPruner())
+        self.assertEqual({"sb"}, {spec.name for spec in pruned.recorder.get_all_values()})
+        self.assertEqual(1, pruned._learners["aw"].calls)
+        self.assertEqual(1, pruned._pruned_cnt)
@@ -0,0 +1,114 @@
+import re
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from main.bfs_repair_orchestrator import check_learned_specs
+from spec_repair.wrappers import spectra_toolbox
+
+
+class FakeCounterTrace:
+    def __init__(self, name: str):
+        self.name = name
+
+    def set_cs_id(self, cs_id: int):
+        self.name = re.sub(r"^counter_strat_\d+_", f"counter_strat_{cs_id}_", self.name)
+
+
+class SlowOracle:
+    """Specs ending in "ok" are valid; the others get two counter-traces. Earlier specs take longer to check."""
+
+    def __init__(self, n_specs: int):
+        self._ct_cnt = 5
+        self._n_specs = n_specs
+        self._lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def is_valid_or_counter_arguments(self, spec, data):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01 * (self._n_specs - data))
+        with self._lock:
+            self.running -= 1
+            if spec.endswith("ok"):
+                return None
+            cs_id = self._ct_cnt
+            self._ct_cnt += 1
+        return [(FakeCounterTrace(f"counter_strat_{cs_id}_{k}"), spec) for k in range(2)]
+
+    def get_counter_strategy_count(self) -> int:
+        return self._ct_cnt
+
+    def set_counter_strategy_count(self, count: int):
+        self._ct_cnt = count
+
+
+class FakeSpectraToolbox:
+    """Stands in for the JVM core search, recording how many searches overlap."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def exploreAllCores(self, args):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self._lock:
+            self.running -= 1
+        return "Final results:\nCore #1 at lines < 1 >"
+
+
+class CoreSearchingOracle(SlowOracle):
+    """Looks up the unrealisable cores of every spec it checks, like the counter-trace filter does."""
+
+    def is_valid_or_counter_arguments(self, spec, data):
+        spectra_toolbox.run_all_unrealisable_cores(spec)
+        return super().is_valid_or_counter_arguments(spec, data)
+
+
+def _names(checked_specs):
+    return [(spec, None if cts is None else [ct.name for ct, _ in cts]) for spec, _, cts in checked_specs]
+
+
+class TestCheckLearnedSpecs(unittest.TestCase):
+    SPECS = ["s0", "s1ok", "s2", "s3", "s4ok", "s5"]
+
+    def _learned_tasks(self):
+        return [(spec, i) for i, spec in enumerate(self.SPECS)]
+
+    def test_concurrent_checks_match_sequential_checks(self):
+        sequential_oracle = SlowOracle(len(self.SPECS))
+        sequential = check_learned_specs(self._learned_tasks(), sequential_oracle)
+        concurrent_oracle = SlowOracle(len(self.SPECS))
+        concurrent = check_learned_specs(self._learned_tasks(), concurrent_oracle, oracle_workers=3)
+
+        self.assertEqual(_names(sequential), _names(concurrent))
+        self.assertEqual(("s0", ["counter_strat_5_0", "counter_strat_5_1"]), _names(concurrent)[0])
+        self.assertEqual(sequential_oracle.get_counter_strategy_count(), concurrent_oracle.get_counter_strategy_count())
+
+    def test_concurrency_is_bounded_by_oracle_workers(self):
+        oracle = SlowOracle(len(self.SPECS))
+        check_learned_specs(self._learned_tasks(), oracle, oracle_workers=2)
+        self.assertEqual(2, oracle.max_running)
+        oracle = SlowOracle(len(self.SPECS))
+        check_learned_specs(self._learned_tasks(), oracle)
+        self.assertEqual(1, oracle.max_running)
+
+    @patch.object(spectra_toolbox, "realizable", return_value=False)
+    def test_concurrent_core_searches_are_serialised(self, _):
+        specs = ["guarantee -- g0\nG(a);", "guarantee -- g1\nG(b);"]
+        toolbox = FakeSpectraToolbox()
+        spectra_toolbox.clear_unrealisable_cores_memo()
+        with patch.object(spectra_toolbox, "SpectraToolbox", toolbox):
+            oracle = CoreSearchingOracle(len(specs))
+            checked_specs = check_learned_specs([(spec, i) for i, spec in enumerate(specs)], oracle, oracle_workers=2)
+        spectra_toolbox.clear_unrealisable_cores_memo()
+
+        self.assertEqual(1, toolbox.max_running)
+        self.assertEqual(2, len(checked_specs))
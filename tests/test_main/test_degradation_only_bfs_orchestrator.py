@@ -81,6 +81,6 @@ class TestBFSRepairOrchestrator(BaseTestCase):
         new_spec_strings: list[str] = [spec.to_str() for spec in repairer.recorder.get_all_values()]
         for i, new_spec in enumerate(new_spec_strings):
             write_to_file(f"{out_test_dir_name}/{case_study_name}_fix_{i}.spectra", new_spec)
-        graph = repairer._om._graph
+        graph = repairer._om.export_graph()
         save_layered_graph(graph, out_test_dir_name)
         return new_spec_strings
\ No newline at end of file
@@ -0,0 +1,33 @@
+from main.bfs_repair_orchestrator_builder import BFSRepairOrchestratorBuilder
+from spec_repair.components.repair_data import RepairData
+from spec_repair.enums import Learning
+from spec_repair.model.spectra_specification import SpectraSpecification
+from spec_repair.util.file_util import read_file_lines
+from tests.base_test_case import BaseTestCase
+
+
+class TestParallelBFSRepairOrchestrator(BaseTestCase):
+    def test_parallel_matches_sequential_arbiter_syn(self):
+        self.assert_parallel_matches_sequential('../input-files/case-studies/spectra/strengthened/arbiter')
+
+    def test_parallel_matches_sequential_traffic_single_syn(self):
+        self.assert_parallel_matches_sequential('../input-files/case-studies/spectra/strengthened/traffic_single')
+
+    def assert_parallel_matches_sequential(self, case_study_path, workers=4):
+        sequential = self.run_bfs_repair_syn(case_study_path, workers=None)
+        parallel = self.run_bfs_repair_syn(case_study_path, workers=workers)
+        self.assertEqual(sequential.recorder.get_specs(), parallel.recorder.get_specs())
+        self.assertEqual(sequential.intermediate_recorder.get_specs(), parallel.intermediate_recorder.get_specs())
+        self.assertEqual(sorted(sequential._om._graph.edges), sorted(parallel._om._graph.edges))
+        self.assertEqual(sequential._oracle.get_counter_strategy_count(), parallel._oracle.get_counter_strategy_count())
+
+    @staticmethod
+    def run_bfs_repair_syn(case_study_path, workers):
+        spec: SpectraSpecification = SpectraSpecification.from_file(f"{case_study_path}/strong.spectra")
+        trace: list[str] = read_file_lines(f"{case_study_path}/violation_trace.txt")
+        builder = BFSRepairOrchestratorBuilder.syntactic().enabling("INCLUDE_NEXT", "INCLUDE_PREV")
+        if workers is not None:
+            builder.with_workers(workers)
+        repairer = builder.build()
+        repairer.repair_bfs(spec, RepairData(trace, counter_traces=[], learning_type=Learning.ASSUMPTION_WEAKENING))
+        return repairer
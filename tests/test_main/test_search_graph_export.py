@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from main.bfs_repair_orchestrator import BFSRepairOrchestrator
+from spec_repair.components.orchestration_managers.orchestration_manager_syntactic_equivalence import \
+    OrchestrationManagerSyntacticEquivalence
+from spec_repair.components.recorders.unique_recorder import UniqueRecorder
+from spec_repair.components.repair_data import RepairData
+from spec_repair.enums import Learning
+from spec_repair.loggers.spec_logger import SpecLogger
+from tests.test_main.test_bfs_checkpoint import FakeDiscriminator, FakeLearner, FakeMitigator, FakeOracle, FakeSpec
+
+
+class TestSearchGraphExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.repairer = BFSRepairOrchestrator(
+            {"aw": FakeLearner()}, FakeOracle(), FakeDiscriminator(), FakeMitigator(),
+            om=OrchestrationManagerSyntacticEquivalence(),
+            recorder=UniqueRecorder(), intermediate_recorder=UniqueRecorder(),
+            logger=SpecLogger(os.path.join(self.tmp, "log.txt"))
+        )
+        self.repairer.repair_bfs(FakeSpec("s"), RepairData(["trace"], counter_traces=[],
+                                                           learning_type=Learning.ASSUMPTION_WEAKENING))
+        self.om = self.repairer._om
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_graph_holds_ids_and_interns_each_spec_once(self):
+        for _, attrs in self.om._graph.nodes(data=True):
+            self.assertIsInstance(attrs["spec"], int)
+        for _, _, attrs in self.om._graph.edges(data=True):
+            self.assertIsInstance(attrs["last_adaptation"], int)
+            if "failed_spec" in attrs:
+                self.assertIsInstance(attrs["failed_spec"], int)
+        # A task's spec is also the failed spec of the edge into it
+        spec_texts = self.om._specs._values
+        self.assertTrue(all(isinstance(text, str) for text in spec_texts))
+        self.assertEqual(len(set(spec_texts)), len(spec_texts))
+
+    def test_export_renders_every_attribute(self):
+        graph = self.om.export_graph()
+        self.assertEqual(list(self.om._graph.edges), list(graph.edges))
+        self.assertEqual("s", graph.nodes[0]["spec"])
+        self.assertEqual(([], str(Learning.ASSUMPTION_WEAKENING)), graph.nodes[0]["data"])
+        self.assertEqual(["ct_sa"], graph.nodes[1]["data"][0])
+        edge = graph.get_edge_data(0, 1)[0]
+        self.assertEqual("sa", edge["failed_spec"])
+        self.assertEqual(["a(s)"], edge["last_adaptation"])
+        leaves = {attrs["spec"] for node, attrs in graph.nodes(data=True) if str(node).startswith("#")}
+        self.assertEqual({spec.name for spec in self.repairer.recorder.get_all_values()}, leaves)
+
+    def test_export_shows_specs_as_they_were_added(self):
+        spec = FakeSpec("t")
+        self.om.enqueue_new_tasks(spec, RepairData(["trace"], counter_traces=[],
+                                                   learning_type=Learning.ASSUMPTION_WEAKENING), prev=None)
+        spec.name = "changed"
+        self.assertIn("t", {attrs["spec"] for _, attrs in self.om.export_graph().nodes(data=True)})
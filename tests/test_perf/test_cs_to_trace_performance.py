@@ -1,11 +1,8 @@
-import sys
-
 import pytest
 import time
 
-sys.path.append("/Users/tg4018/Documents/PhD/SpectraASPTranslators")
-
-from spec_repair.model.counter_trace import extract_trace
+from spec_repair.helpers.parsers.spectra_cs_parser import SpectraCSParser
+from spec_repair.model.counter_trace import cs_to_named_cs_traces
 
 # List all files in the current directory with full paths
 cs_lines: list = [
@@ -19,13 +16,36 @@ cs_lines: list = [
 ]
 
 
-def run_this_counter_strat_to_trace_version(lines: list[str]):
-    start = "INI"
-    output = ""
-    trace_name_dict: dict[str, str] = {}
-    # TODO: ASK TITUS what is the relationship between low caps "ini" and "ini_S" infinite traces?
-    extract_trace(lines, output, start, 0, "ini", trace_name_dict)
-    print(trace_name_dict)
+def ladder_cs_lines(depth: int, choices: int) -> list[str]:
+    """
+    `choices` system moves from every state to the next one, so
+    choices^(depth + 1) paths of length depth + 1, all sharing their prefixes.
+    """
+    states = ["INI"] + [f"S{i}" for i in range(depth)] + ["DEAD"]
+    return [f"{src} -> {dst} {{highwater:{'true' if i % 2 else 'false'}, methane:false}} / "
+            f"{{pump:{'true' if c % 2 else 'false'}, alarm:{'true' if c // 2 else 'false'}}};"
+            for i, (src, dst) in enumerate(zip(states, states[1:])) for c in range(choices)]
+
+
+def chain_cs_lines(length: int) -> list[str]:
+    """One long path ending in a loop back to its middle."""
+    states = ["INI"] + [f"S{i}" for i in range(length)]
+    lines = [f"{src} -> {dst} {{highwater:false, methane:{'true' if i % 3 else 'false'}}} / {{pump:false}};"
+             for i, (src, dst) in enumerate(zip(states, states[1:]))]
+    return lines + [f"{states[-1]} -> S{length // 2} {{highwater:true, methane:true}} / {{pump:true}};"]
+
+
+large_cs_lines: dict = {
+    "ladder_10x2": ladder_cs_lines(10, 2),
+    "ladder_6x4": ladder_cs_lines(6, 4),
+    # Deeper than the default recursion limit, which the recursive extraction hit
+    "chain_2000": chain_cs_lines(2000),
+}
+
+
+def run_this_counter_strat_to_trace_version(lines: list[str], max_paths=None):
+    cs = SpectraCSParser.from_lines(lines)
+    return cs_to_named_cs_traces(cs, max_paths)
 
 
 @pytest.mark.parametrize("cs_line", cs_lines)
@@ -39,5 +59,28 @@ def test_cs_to_trace_performance(benchmark, cs_line):
     benchmark(run_this_counter_strat_to_trace_version, cs_line)
 
 
+@pytest.mark.parametrize("cs_name", large_cs_lines)
+@pytest.mark.benchmark(
+    max_time=1.0,
+    min_rounds=3,
+    timer=time.time,
+    warmup=False
+)
+def test_large_cs_to_trace_performance(benchmark, cs_name):
+    traces = benchmark(run_this_counter_strat_to_trace_version, large_cs_lines[cs_name])
+    assert len(traces) == {"ladder_10x2": 2 ** 11, "ladder_6x4": 4 ** 7, "chain_2000": 1}[cs_name]
+
+
+@pytest.mark.benchmark(
+    max_time=0.1,
+    min_rounds=10,
+    timer=time.time,
+    warmup=True
+)
+def test_limited_cs_to_trace_performance(benchmark):
+    traces = benchmark(run_this_counter_strat_to_trace_version, ladder_cs_lines(20, 2), 16)
+    assert len(traces) == 16
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,131 @@
+import os
+import pickle
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase
+from unittest.mock import patch
+
+from spec_repair import config
+from spec_repair.util import disk_cache
+from spec_repair.util.disk_cache import DiskCache, enable_disk_cache, get_disk_cache, make_key
+
+
+def _write_entries(path, start, count):
+    cache = DiskCache(path)
+    for i in range(start, start + count):
+        cache.set(f"key_{i}", i)
+    cache.close()
+
+
+class TestDiskCache(TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "cache.sqlite")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_set_get_round_trip(self):
+        cache = DiskCache(self.path)
+        value = {"realizable": False, "output": "Result: Specification is unrealizable"}
+        cache.set("k", value)
+        self.assertEqual(value, cache.get("k"))
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual({"hits": 1, "misses": 1, "entries": 1}, {k: v for k, v in cache.stats().items() if k != "bytes"})
+
+    def test_persists_across_instances(self):
+        DiskCache(self.path).set("k", "v")
+        self.assertEqual("v", DiskCache(self.path).get("k"))
+
+    def test_get_or_compute_skips_unstored_values(self):
+        cache = DiskCache(self.path)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return None
+
+        cache.get_or_compute("k", compute, should_store=lambda value: value is not None)
+        cache.get_or_compute("k", compute, should_store=lambda value: value is not None)
+        self.assertEqual(2, len(calls))
+        self.assertEqual(3, cache.get_or_compute("k2", lambda: 3))
+        self.assertEqual(3, cache.get_or_compute("k2", lambda: 4))
+
+    def test_entries_expire_after_ttl(self):
+        cache = DiskCache(self.path)
+        cache.set("short", "v", ttl=0.05)
+        cache.set("forever", "v")
+        self.assertIn("short", cache)
+        time.sleep(0.1)
+        self.assertNotIn("short", cache)
+        self.assertIsNone(cache.get("short"))
+        self.assertEqual("v", cache.get("forever"))
+        self.assertEqual(1, len(cache))
+
+    def test_upgrades_cache_files_without_expiry(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE entries ("
+                     "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)")
+        blob = pickle.dumps("old")
+        conn.execute("INSERT INTO entries VALUES (?, ?, ?, ?)", ("k", blob, len(blob), 0.0))
+        conn.commit()
+        conn.close()
+        cache = DiskCache(self.path)
+        self.assertEqual("old", cache.get("k"))
+        cache.set("k2", "new", ttl=60)
+        self.assertEqual("new", cache.get("k2"))
+
+    def test_evicts_least_recently_used(self):
+        entry_size = len(pickle.dumps("x" * 100, protocol=pickle.HIGHEST_PROTOCOL))
+        cache = DiskCache(self.path, max_bytes=3 * entry_size)
+        for key in ["a", "b", "c"]:
+            cache.set(key, "x" * 100)
+        cache.get("a")
+        cache.set("d", "x" * 100)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertIn("d", cache)
+        self.assertLessEqual(cache.size_bytes(), 3 * entry_size)
+
+    def test_concurrent_writers(self):
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            list(executor.map(_write_entries, [self.path] * 4, range(0, 400, 100), [100] * 4))
+        cache = DiskCache(self.path)
+        self.assertEqual(400, len(cache))
+        self.assertEqual(250, cache.get("key_250"))
+
+    def test_survives_pickling(self):
+        cache = DiskCache(self.path)
+        cache.set("k", "v")
+        self.assertEqual("v", pickle.loads(pickle.dumps(cache)).get("k"))
+
+    def test_make_key_separates_parts(self):
+        self.assertNotEqual(make_key("ab", "c"), make_key("a", "bc"))
+        self.assertEqual(make_key("--jtlv", "spec"), make_key("--jtlv", "spec"))
+
+
+class TestNamedDiskCaches(TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        patches = [
+            patch.object(config, "CACHE_DIR", ""),
+            patch.object(config, "DISK_CACHE_ENABLED", False),
+            patch.dict(os.environ),
+            patch.dict(disk_cache._named_caches, clear=True),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_caching_is_off_until_enabled(self):
+        self.assertIsNone(get_disk_cache("results"))
+        enable_disk_cache(self._dir.name)
+        cache = get_disk_cache("results")
+        self.assertEqual(os.path.join(self._dir.name, "results.sqlite"), cache.path)
+        self.assertIs(cache, get_disk_cache("results"))
+        # Processes started from here on cache in the same directory
+        self.assertEqual(self._dir.name, os.environ["SPEC_REPAIR_CACHE_DIR"])
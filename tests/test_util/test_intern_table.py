@@ -0,0 +1,41 @@
+import pickle
+from unittest import TestCase
+
+from spec_repair.util.intern_table import InternTable
+
+
+class Value:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class TestInternTable(TestCase):
+    def test_equal_values_share_an_id(self):
+        table = InternTable()
+        self.assertEqual(0, table.intern("a"))
+        self.assertEqual(1, table.intern("b"))
+        self.assertEqual(0, table.intern("a"))
+        self.assertEqual(2, len(table))
+        self.assertEqual("b", table[1])
+
+    def test_identity_key_keeps_distinct_objects_apart(self):
+        table = InternTable(key=id)
+        first, second = Value("a"), Value("a")
+        self.assertEqual(table.intern(first), table.intern(first))
+        self.assertNotEqual(table.intern(first), table.intern(second))
+
+    def test_render_renders_each_value_once(self):
+        table = InternTable()
+        table.intern("a")
+        table.intern("b")
+        calls = []
+        render = table.render(lambda value: calls.append(value) or value.upper())
+        self.assertEqual(["A", "B", "A"], [render(0), render(1), render(0)])
+        self.assertEqual(["a", "b"], calls)
+
+    def test_identity_keys_are_rebuilt_after_unpickling(self):
+        table = InternTable(key=id)
+        table.intern(Value("a"))
+        restored = pickle.loads(pickle.dumps(table))
+        self.assertEqual(0, restored.intern(restored[0]))
+        self.assertEqual(1, restored.intern(Value("a")))
@@ -0,0 +1,46 @@
+from copy import deepcopy
+from unittest import TestCase
+
+from spec_repair.model.spectra_specification import SpectraSpecification
+from spec_repair.util.semantic_spec_index import SemanticSpecIndex, formula_fingerprint
+from tests.base_test_case import BaseTestCase
+
+
+class TestFormulaFingerprint(TestCase):
+    def test_equivalent_formulas_share_fingerprint(self):
+        self.assertEqual(formula_fingerprint("G(a -> X b)"), formula_fingerprint("G(!a | X(b))"))
+        self.assertEqual(formula_fingerprint("GF(a) & GF(b)"), formula_fingerprint("G(F(b)) & G(F(a))"))
+        self.assertEqual(formula_fingerprint("!(a U b)"), formula_fingerprint("(!a) R (!b)"))
+
+    def test_inequivalent_formulas_are_told_apart(self):
+        self.assertNotEqual(formula_fingerprint("G(a -> X b)"), formula_fingerprint("G(a -> b)"))
+        self.assertNotEqual(formula_fingerprint("GF(a)"), formula_fingerprint("FG(a)"))
+        self.assertNotEqual(formula_fingerprint("a U b"), formula_fingerprint("a W b"))
+
+
+class TestSemanticSpecIndex(BaseTestCase):
+    def setUp(self):
+        self.spec = SpectraSpecification.from_file('./test_files/minepump_strong.spectra')
+        self.other_spec = SpectraSpecification.from_file('./test_files/arbiter_aw_ev.spectra')
+
+    def test_setdefault_returns_first_value_for_equal_spec(self):
+        index = SemanticSpecIndex()
+        self.assertEqual(0, index.setdefault(self.spec, 0))
+        self.assertEqual(1, index.setdefault(self.other_spec, 1))
+        self.assertEqual(0, index.setdefault(deepcopy(self.spec), 2))
+        self.assertEqual(2, len(index))
+
+    def test_extra_must_match(self):
+        index = SemanticSpecIndex()
+        index.setdefault(self.spec, 0, extra=(["trace"], "AW"))
+        self.assertEqual(0, index.get(self.spec, extra=(["trace"], "AW")))
+        self.assertIsNone(index.get(self.spec, extra=([], "AW")))
+
+    def test_agrees_with_spec_equality(self):
+        index = SemanticSpecIndex()
+        specs = [self.spec, self.other_spec, deepcopy(self.other_spec)]
+        for i, spec in enumerate(specs):
+            index.setdefault(spec, i)
+        for spec in specs:
+            expected = next(i for i, past_spec in enumerate(specs) if past_spec == spec)
+            self.assertEqual(expected, index.get(spec))
@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from spec_repair.util import spot_cache
+
+
+class TestSpotCache(TestCase):
+    def setUp(self):
+        spot_cache.clear()
+
+    def test_equivalence(self):
+        self.assertTrue(spot_cache.are_equivalent("G(a -> X b)", "G(!a | X(b))"))
+        self.assertFalse(spot_cache.are_equivalent("G(a -> X b)", "G(a -> b)"))
+
+    def test_implication(self):
+        self.assertTrue(spot_cache.implies("G(a & b)", "G(a)"))
+        self.assertFalse(spot_cache.implies("G(a)", "G(a & b)"))
+
+    def test_repeated_checks_translate_once(self):
+        for _ in range(3):
+            spot_cache.are_equivalent("G(a)", "G(a & b)")
+            spot_cache.are_equivalent("G(a & b)", "G(a)")
+        self.assertEqual(2, spot_cache.get_automaton.cache_info().currsize)
+        self.assertEqual(2, spot_cache.get_negated_automaton.cache_info().currsize)
+        self.assertEqual(1, spot_cache._are_equivalent.cache_info().misses)
+
+    def test_batched_implication_matches_pairwise(self):
+        formulas = ["G(a)", "G(a & b)", "G(a | b)", "GF(a)", "G(a -> X b)"]
+        for formula in formulas:
+            self.assertEqual([spot_cache.implies(formula, other) for other in formulas],
+                             spot_cache.implies_many(formula, formulas))
+            self.assertEqual([spot_cache.implies(other, formula) for other in formulas],
+                             spot_cache.implied_by_many(formulas, formula))
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+import time
+from unittest import TestCase
+
+from spec_repair.util.subprocess_util import stream_subprocess
+
+
+def _python(script: str):
+    return [sys.executable, "-u", "-c", script]
+
+
+class TestStreamSubprocess(TestCase):
+    def test_lines_arrive_before_the_command_exits(self):
+        lines = stream_subprocess(_python("import time\nprint('first')\ntime.sleep(2)\nprint('second')"))
+        start = time.monotonic()
+        self.assertEqual("first", next(lines))
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertEqual(["second"], list(lines))
+
+    def test_timeout_is_raised_after_the_lines_printed_before_it(self):
+        read = []
+        with self.assertRaises(subprocess.TimeoutExpired):
+            for line in stream_subprocess(_python("import time\nprint('first')\ntime.sleep(30)"), timeout=0.5):
+                read.append(line)
+        self.assertEqual(["first"], read)
+
+    def test_closing_the_stream_kills_the_command(self):
+        lines = stream_subprocess(_python("import time\nprint('first')\ntime.sleep(30)"))
+        start = time.monotonic()
+        next(lines)
+        lines.close()
+        self.assertLess(time.monotonic() - start, 5)
@@ -1,6 +1,15 @@
+import os
+import subprocess
+import tempfile
+import time
 from unittest import TestCase
+from unittest.mock import patch
 
-from spec_repair.wrappers.asp_wrappers import edit_pylasp_for_min_score, edit_pylasp_for_max_score
+from spec_repair import config
+from spec_repair.util.disk_cache import DiskCache
+from spec_repair.wrappers import asp_wrappers
+from spec_repair.wrappers.asp_wrappers import edit_pylasp_for_min_score, edit_pylasp_for_max_score, \
+    get_pylasp_driver_file, run_ILASP, stream_ILASP
 
 ORIGINAL_PYLASP_CODE = """\
 #ilasp_script
@@ -211,3 +220,84 @@ class Test(TestCase):
     def test_edit_pylasp_for_max_score(self):
         out_pylasp_code = edit_pylasp_for_max_score(ORIGINAL_PYLASP_CODE, 10)
         self.assertEqual(EDITED_PYLASP_CODE_MAX_SCORE, out_pylasp_code)
+
+    def test_pylasp_driver_is_generated_once_and_reused(self):
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch.object(config, "CACHE_DIR", cache_dir), \
+                patch.object(config, "DISK_CACHE_ENABLED", True), \
+                patch.dict(asp_wrappers._pylasp_driver_files, clear=True), \
+                patch.object(asp_wrappers, "generate_pylasp_script", return_value=ORIGINAL_PYLASP_CODE) as generate:
+            first = get_pylasp_driver_file("first_task.las", 10, "max_score")
+            second = get_pylasp_driver_file("second_task.las", 10, "max_score")
+            self.assertEqual(first, second)
+            self.assertTrue(first.startswith(cache_dir))
+            generate.assert_called_once_with("first_task.las")
+            with open(first) as driver:
+                self.assertEqual(EDITED_PYLASP_CODE_MAX_SCORE, driver.read())
+
+            # A new process finds the driver on disk without asking ILASP again
+            asp_wrappers._pylasp_driver_files.clear()
+            self.assertEqual(first, get_pylasp_driver_file("third_task.las", 10, "max_score"))
+            generate.assert_called_once()
+
+            self.assertNotEqual(first, get_pylasp_driver_file("third_task.las", 5, "max_score"))
+            self.assertEqual(2, len(os.listdir(os.path.dirname(first))))
+
+
+class TestILASPResultCache(TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        cache = DiskCache(os.path.join(self._dir.name, "ilasp_results.sqlite"))
+        patches = [
+            patch.object(asp_wrappers, "get_disk_cache", return_value=cache),
+            patch.object(asp_wrappers, "get_pylasp_driver_file", return_value="driver.las"),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(self._dir.cleanup)
+
+    def test_same_task_is_solved_once(self):
+        with patch.object(asp_wrappers, "run_subprocess", return_value="%% Solution 1 (score 1)\n") as solve:
+            first = run_ILASP("% encoded from spec A\nassumption(a).\n\nguarantee(g).\n")
+            second = run_ILASP("% encoded from spec B\nassumption(a).   \nguarantee(g).")
+            run_ILASP("assumption(b).\nguarantee(g).\n")
+        self.assertEqual(first, second)
+        self.assertEqual(2, solve.call_count)
+
+    def test_timeouts_are_remembered(self):
+        timeout = subprocess.TimeoutExpired(["ILASP"], 60)
+        with patch.object(asp_wrappers, "run_subprocess", side_effect=timeout) as solve:
+            for _ in range(2):
+                with self.assertRaises(subprocess.TimeoutExpired):
+                    run_ILASP("assumption(a).\n")
+        self.assertEqual(1, solve.call_count)
+
+    def test_timeout_under_shorter_deadline_is_retried_with_more_time(self):
+        timeout = subprocess.TimeoutExpired(["ILASP"], 1)
+        with patch.object(asp_wrappers, "run_subprocess", side_effect=[timeout, "UNSATISFIABLE\n"]) as solve:
+            with self.assertRaises(subprocess.TimeoutExpired):
+                run_ILASP("assumption(a).\n", deadline=time.monotonic() + 1)
+            self.assertEqual("UNSATISFIABLE\n", run_ILASP("assumption(a).\n"))
+        self.assertEqual(2, solve.call_count)
+
+    def test_streamed_output_is_cached_once_complete(self):
+        printed = ["%% Solution 1 (score 1)", "ev_temp_op(a).", ""]
+        with patch.object(asp_wrappers, "stream_subprocess", return_value=iter(printed)) as solve:
+            self.assertEqual(printed, list(stream_ILASP("assumption(a).\n")))
+            self.assertEqual(printed, list(stream_ILASP("assumption(a).\n")))
+            self.assertEqual("\n".join(printed), run_ILASP("assumption(a).\n"))
+        self.assertEqual(1, solve.call_count)
+
+    def test_streamed_error_is_raised_before_the_line_is_yielded(self):
+        printed = ["Error: syntax error on line 3", "%% Solution 1 (score 1)", "ev_temp_op(a)."]
+        with patch.object(asp_wrappers, "stream_subprocess", return_value=iter(printed)) as solve:
+            lines = []
+            with self.assertRaises(ModuleNotFoundError):
+                for line in stream_ILASP("assumption(a).\n"):
+                    lines.append(line)
+            self.assertEqual([], lines)
+            # The failed run is not cached
+            solve.return_value = iter(["UNSATISFIABLE"])
+            self.assertEqual(["UNSATISFIABLE"], list(stream_ILASP("assumption(a).\n")))
+        self.assertEqual(2, solve.call_count)
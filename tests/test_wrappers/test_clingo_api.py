@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import patch
+
+from spec_repair import config
+from spec_repair.util.file_util import read_file_lines
+from spec_repair.wrappers.clingo_api import clingo, is_clingo_api_enabled, solve_clingo_program
+from tests.base_test_case import BaseTestCase
+
+
+class TestClingoApiSwitch(unittest.TestCase):
+    def test_switch_is_read_at_call_time(self):
+        with patch.object(config, "USE_CLINGO_API", False):
+            self.assertFalse(is_clingo_api_enabled())
+        with patch.object(config, "USE_CLINGO_API", True):
+            self.assertEqual(clingo is not None, is_clingo_api_enabled())
+
+
+@unittest.skipIf(clingo is None, "clingo Python package not installed")
+class TestClingoApi(BaseTestCase):
+    def test_renders_models_like_cli(self):
+        output = solve_clingo_program("a. b :- a. c :- not a.")
+        self.assertEqual("Solving...\nAnswer: 1\na b\nSATISFIABLE\n", output)
+
+    def test_all_models(self):
+        output = solve_clingo_program("1 { p; q } 1.", n_models=0)
+        self.assertEqual(2, output.count("Answer:"))
+        self.assertIn("Answer: 2\n", output)
+        self.assertTrue(output.endswith("SATISFIABLE\n"))
+
+    def test_unsatisfiable(self):
+        self.assertIn("UNSATISFIABLE", solve_clingo_program("a. :- a."))
+
+    def test_optimisation(self):
+        output = solve_clingo_program("1 { p; q } 1. #minimize { 1: p }.", n_models=0)
+        self.assertIn("\nq\nOptimization: 0\nOPTIMUM FOUND\n", output)
+
+    def test_file_and_text_agree(self):
+        asp = ''.join(read_file_lines("../files/test_og.lp"))
+        from_file = solve_clingo_program(filename="../files/test_og.lp")
+        from_text = solve_clingo_program(asp)
+        self.assertEqual(from_file, from_text)
+        self.assertIn("violation_holds(guarantee1_1,1,counter_strat_0_0)", from_file)
+
+    def test_grounding_error_raises(self):
+        with self.assertRaises(RuntimeError):
+            solve_clingo_program("a :- b(.")
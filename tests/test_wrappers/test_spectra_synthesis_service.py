@@ -0,0 +1,71 @@
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from spec_repair.components.oracles.spectra_gr1_oracle import SpectraGR1Oracle
+from spec_repair.model.spectra_specification import SpectraSpecification
+from spec_repair.wrappers.spectra_synthesis_service import SpectraSynthesisService, SynthesisResult
+from tests.base_test_case import BaseTestCase
+
+
+class TestSpectraSynthesisService(BaseTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.service = SpectraSynthesisService(workers=2)
+        cls.unrealizable = SpectraSpecification.from_file('./test_files/minepump_aw_pump.spectra')
+        cls.realizable = SpectraSpecification.from_file('./test_files/arbiter_aw_ev.spectra')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.close()
+        super().tearDownClass()
+
+    def test_matches_in_process_oracle(self):
+        result: SynthesisResult = self.service.synthesise(self.unrealizable.to_str(is_to_compile=True))
+        self.assertFalse(result.realizable)
+        self.assertEqual(SpectraGR1Oracle()._synthesise_and_check(self.unrealizable), result.counter_strategy)
+        self.assertGreater(result.seconds, 0)
+
+    def test_realizable_has_no_counter_strategy(self):
+        result = self.service.synthesise(self.realizable.to_str(is_to_compile=True))
+        self.assertTrue(result.realizable)
+        self.assertIsNone(result.counter_strategy)
+
+    def test_realisability_only(self):
+        result = self.service.synthesise(self.unrealizable.to_str(is_to_compile=True), counter_strategy=False)
+        self.assertFalse(result.realizable)
+        self.assertIsNone(result.counter_strategy)
+
+    def test_concurrent_requests_from_threads(self):
+        specs = [self.unrealizable, self.realizable] * 4
+        with ThreadPoolExecutor(max_workers=len(specs)) as executor:
+            results = list(executor.map(lambda s: self.service.synthesise(s.to_str(is_to_compile=True)), specs))
+        self.assertEqual([False, True] * 4, [result.realizable for result in results])
+
+    def test_oracle_uses_service(self):
+        oracle = SpectraGR1Oracle(synthesis_service=self.service)
+        self.assertEqual(SpectraGR1Oracle()._synthesise_and_check(self.unrealizable),
+                         oracle._synthesise_and_check(self.unrealizable))
+        self.assertIsNone(oracle._synthesise_and_check(self.realizable))
+
+    def test_unpickled_service_synthesises_in_process(self):
+        copy = pickle.loads(pickle.dumps(self.service))
+        self.assertFalse(copy.synthesise(self.unrealizable.to_str(is_to_compile=True)).realizable)
+
+    def test_unpickled_service_synthesises_one_at_a_time(self):
+        copy = pickle.loads(pickle.dumps(self.service))
+        specs = [self.unrealizable, self.realizable] * 2
+        with ThreadPoolExecutor(max_workers=len(specs)) as executor:
+            results = list(executor.map(lambda s: copy.synthesise(s.to_str(is_to_compile=True)), specs))
+        self.assertEqual([False, True] * 2, [result.realizable for result in results])
+
+    def test_closed_service_refuses_requests(self):
+        service = SpectraSynthesisService(workers=1)
+        service.close()
+        with self.assertRaises(RuntimeError):
+            service.submit(self.realizable.to_str(is_to_compile=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from spec_repair.util.disk_cache import DiskCache
+from spec_repair.wrappers import spectra_toolbox
+from spec_repair.wrappers.spectra_toolbox import clear_unrealisable_cores_memo, run_all_unrealisable_cores, \
+    unrealisable_cores_stats
+
+
+class UnrealisableCoresMemoTests(unittest.TestCase):
+    """run_all_unrealisable_cores memoisation, with the JVM core search mocked out."""
+
+    def setUp(self):
+        clear_unrealisable_cores_memo()
+        self._dir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(os.path.join(self._dir.name, "cores.sqlite"))
+
+    def tearDown(self):
+        clear_unrealisable_cores_memo()
+        self._dir.cleanup()
+
+    def test_same_spec_searched_once_per_process(self):
+        with patch.object(spectra_toolbox, "get_disk_cache", return_value=None), \
+                patch.object(spectra_toolbox, "_compute_all_unrealisable_cores",
+                             return_value=[{"a1", "g1"}]) as search:
+            self.assertEqual([{"a1", "g1"}], run_all_unrealisable_cores("spec"))
+            self.assertEqual([{"a1", "g1"}], run_all_unrealisable_cores("spec"))
+            run_all_unrealisable_cores("other spec")
+        self.assertEqual(2, search.call_count)
+        self.assertEqual({"hits": 1, "disk_hits": 0, "misses": 2}, unrealisable_cores_stats)
+
+    def test_returned_cores_are_copies(self):
+        with patch.object(spectra_toolbox, "get_disk_cache", return_value=None), \
+                patch.object(spectra_toolbox, "_compute_all_unrealisable_cores", return_value=[{"g1"}]):
+            run_all_unrealisable_cores("spec")[0].add("g2")
+            self.assertEqual([{"g1"}], run_all_unrealisable_cores("spec"))
+
+    def test_memo_keeps_most_recently_used_specs(self):
+        with patch.object(spectra_toolbox, "UNREALISABLE_CORES_CACHE_SIZE", 2), \
+                patch.object(spectra_toolbox, "get_disk_cache", return_value=None), \
+                patch.object(spectra_toolbox, "_compute_all_unrealisable_cores", return_value=[{"g1"}]) as search:
+            run_all_unrealisable_cores("spec 1")
+            run_all_unrealisable_cores("spec 2")
+            run_all_unrealisable_cores("spec 1")
+            run_all_unrealisable_cores("spec 3")
+            self.assertEqual(3, search.call_count)
+            # spec 2 was the least recently used, so it is searched again
+            run_all_unrealisable_cores("spec 1")
+            run_all_unrealisable_cores("spec 2")
+        self.assertEqual(4, search.call_count)
+
+    def test_disk_cache_shared_across_processes(self):
+        with patch.object(spectra_toolbox, "get_disk_cache", return_value=self.cache), \
+                patch.object(spectra_toolbox, "_compute_all_unrealisable_cores", return_value=[{"g1"}]) as search:
+            run_all_unrealisable_cores("spec")
+            # Simulate a new process: the in-memory memo is gone, the disk cache is not
+            clear_unrealisable_cores_memo()
+            self.assertEqual([{"g1"}], run_all_unrealisable_cores("spec"))
+        self.assertEqual(1, search.call_count)
+        self.assertEqual({"hits": 0, "disk_hits": 1, "misses": 0}, unrealisable_cores_stats)
+
+
+if __name__ == "__main__":
+    unittest.main()